@@ -0,0 +1,97 @@
+"""Command line tools for the restaurant API.
+
+Usage (from the FinalProject directory):
+    python -m api.cli migrate [--to VERSION]
+    python -m api.cli schema-version
+    python -m api.cli archive [--older-than-days DAYS] [--batch-size N]
+    python -m api.cli import-menu FILE [--format csv|ndjson]
+    python -m api.cli adjust-prices CATEGORY_ID PERCENT
+    python -m api.cli sweep-promotions
+"""
+import argparse
+import logging
+from .dependencies.database import engine, SessionLocal
+from . import migrations
+from .controllers import order_archive, order_events, menu, menu_import, promotions
+from .schemas.dishes import PriceAdjustment
+
+
+def migrate(args):
+    migrations.upgrade(engine, target=args.to)
+    print(f"Schema version {migrations.current_version(engine)}")
+
+
+def schema_version(args):
+    version = migrations.current_version(engine)
+    print(f"Schema version {version} (latest {migrations.LATEST_VERSION})")
+    for migration in migrations.pending(engine):
+        print(f"Pending {migration.version}: {migration.description}")
+
+
+def archive(args):
+    with SessionLocal() as db:
+        moved = order_archive.archive_orders(db, older_than_days=args.older_than_days, batch_size=args.batch_size)
+        pruned = order_events.prune_order_events(db)
+    print(f"Archived {moved} orders, pruned {pruned} order events")
+
+
+def import_menu(args):
+    format = args.format or ("ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv")
+    with open(args.file, encoding="utf-8-sig", newline="") as stream, SessionLocal() as db:
+        result = menu_import.import_menu(db, stream, format)
+    print(f"Created {result.created}, updated {result.updated}, failed {result.failed}")
+    for error in result.errors:
+        print(f"Line {error.line}: {error.error}")
+
+
+def adjust_prices(args):
+    with SessionLocal() as db:
+        result = menu.adjust_category_prices(db, args.category_id, PriceAdjustment(percent=args.percent))
+    print(f"Updated {result.updated} dish prices by {result.percent:+g}%")
+
+
+def sweep_promotions(args):
+    with SessionLocal() as db:
+        deactivated = promotions.sweep_promotions(db)
+    print(f"Deactivated {deactivated} expired or used-up promotions")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m api.cli", description="Restaurant API tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="apply pending schema migrations")
+    migrate_parser.add_argument("--to", type=int, default=None, help="stop after this version")
+    migrate_parser.set_defaults(handler=migrate)
+
+    version_parser = commands.add_parser("schema-version", help="show applied and pending migrations")
+    version_parser.set_defaults(handler=schema_version)
+
+    archive_parser = commands.add_parser("archive", help="move old delivered/cancelled orders to the archive tables "
+                                                        "and delete order events past retention")
+    archive_parser.add_argument("--older-than-days", type=int, default=None,
+                                help="archive orders placed more than this many days ago (default: conf.archive_after_days)")
+    archive_parser.add_argument("--batch-size", type=int, default=None, help="orders moved per transaction")
+    archive_parser.set_defaults(handler=archive)
+
+    import_parser = commands.add_parser("import-menu", help="create or update dishes from a CSV or NDJSON file")
+    import_parser.add_argument("file", help="CSV with a header line, or NDJSON (one dish object per line)")
+    import_parser.add_argument("--format", choices=menu_import.IMPORT_FORMATS, default=None,
+                               help="default: ndjson for .ndjson/.jsonl files, csv otherwise")
+    import_parser.set_defaults(handler=import_menu)
+
+    prices_parser = commands.add_parser("adjust-prices", help="change every active dish price in a category")
+    prices_parser.add_argument("category_id", type=int)
+    prices_parser.add_argument("percent", type=float, help="e.g. 5 for +5%%, -10 for -10%%")
+    prices_parser.set_defaults(handler=adjust_prices)
+
+    sweep_parser = commands.add_parser("sweep-promotions", help="deactivate expired and used-up promotion codes")
+    sweep_parser.set_defaults(handler=sweep_promotions)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
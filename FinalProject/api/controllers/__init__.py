@@ -1 +1,2 @@
 from . import orders, order_details, menu, resources, reviews, promotions, analytics
+from . import order_assembly, order_archive, inventory, async_orders, async_menu, async_analytics
@@ -5,6 +5,7 @@ from ..models.orders import Order, OrderStatus
 from ..models.dishes import Dish
 from ..models.reviews import Review
 from ..models.promotions import Promotion
+from .order_archive import order_history, order_detail_history
 
 
 def get_sales_analytics(db: Session, days: int = 30):
@@ -12,11 +13,12 @@ def get_sales_analytics(db: Session, days: int = 30):
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
     
-    # Get orders in date range
-    orders = db.query(Order).filter(
+    # Get orders in date range, live and archived
+    history = order_history("status", "total_cents", "order_date")
+    orders = db.query(history.c.status, history.c.total_cents).filter(
         and_(
-            Order.order_date >= start_date,
-            Order.order_date <= end_date
+            history.c.order_date >= start_date,
+            history.c.order_date <= end_date
         )
     ).all()
     
@@ -43,17 +45,17 @@ def get_sales_analytics(db: Session, days: int = 30):
 
 def get_popular_dishes(db: Session, limit: int = 10):
     """Get most popular dishes based on order frequency"""
-    from ..models.order_details import OrderDetail
-    
+    details = order_detail_history("order_id", "dish_id", "qty")
+
     dish_orders = db.query(
         Dish.id,
         Dish.name,
-        func.sum(OrderDetail.qty).label('total_quantity'),
-        func.count(OrderDetail.order_id.distinct()).label('order_count')
-    ).join(OrderDetail).filter(
+        func.sum(details.c.qty).label('total_quantity'),
+        func.count(details.c.order_id.distinct()).label('order_count')
+    ).join(details, Dish.id == details.c.dish_id).filter(
         Dish.is_active == True
     ).group_by(Dish.id, Dish.name).order_by(
-        func.sum(OrderDetail.qty).desc()
+        func.sum(details.c.qty).desc()
     ).limit(limit).all()
     
     return [
@@ -70,18 +72,19 @@ def get_popular_dishes(db: Session, limit: int = 10):
 
 def get_revenue_by_category(db: Session):
     """Get revenue breakdown by dish category"""
-    from ..models.order_details import OrderDetail
     from ..models.categories import Category
-    
+
+    details = order_detail_history("dish_id", "line_total_cents")
+
     category_revenue = db.query(
         Category.id,
         Category.name,
-        func.sum(OrderDetail.line_total_cents).label('total_revenue')
-    ).select_from(Category).join(Dish, Category.id == Dish.category_id).join(OrderDetail, Dish.id == OrderDetail.dish_id).filter(
+        func.sum(details.c.line_total_cents).label('total_revenue')
+    ).select_from(Category).join(Dish, Category.id == Dish.category_id).join(details, Dish.id == details.c.dish_id).filter(
         Category.is_active == True,
         Dish.is_active == True
     ).group_by(Category.id, Category.name).order_by(
-        func.sum(OrderDetail.line_total_cents).desc()
+        func.sum(details.c.line_total_cents).desc()
     ).all()
     
     return [
@@ -97,16 +100,18 @@ def get_revenue_by_category(db: Session):
 
 def get_customer_analytics(db: Session):
     """Get customer behavior analytics"""
+    history = order_history("id", "customer_name", "is_delivery")
+
     # Total unique customers
-    unique_customers = db.query(func.count(func.distinct(Order.customer_name))).scalar()
+    unique_customers = db.query(func.count(func.distinct(history.c.customer_name))).scalar()
     
     # Average orders per customer
-    total_orders = db.query(func.count(Order.id)).scalar()
+    total_orders = db.query(func.count(history.c.id)).scalar()
     avg_orders_per_customer = total_orders / unique_customers if unique_customers > 0 else 0
     
     # Delivery vs takeout ratio
-    delivery_orders = db.query(func.count(Order.id)).filter(Order.is_delivery == True).scalar()
-    takeout_orders = db.query(func.count(Order.id)).filter(Order.is_delivery == False).scalar()
+    delivery_orders = db.query(func.count(history.c.id)).filter(history.c.is_delivery == True).scalar()
+    takeout_orders = db.query(func.count(history.c.id)).filter(history.c.is_delivery == False).scalar()
     
     return {
         "unique_customers": unique_customers,
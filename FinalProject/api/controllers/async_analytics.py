@@ -0,0 +1,173 @@
+from sqlalchemy import select, func, and_, case
+from datetime import datetime, timedelta
+from ..models.orders import Order, OrderStatus
+from ..models.dishes import Dish
+from ..models.categories import Category
+from ..models.promotions import Promotion
+from ..models.resources import Resource
+from .order_archive import order_history, order_detail_history
+
+
+async def get_sales_analytics(db, days: int = 30):
+    """Get sales analytics for the specified number of days"""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+
+    history = order_history("status", "total_cents", "order_date")
+    statement = select(history.c.status, history.c.total_cents).where(
+        and_(
+            history.c.order_date >= start_date,
+            history.c.order_date <= end_date
+        )
+    )
+    orders = (await db.execute(statement)).all()
+
+    total_orders = len(orders)
+    total_revenue = sum(order.total_cents for order in orders)
+    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
+
+    # Orders by status
+    status_counts = {status.value: 0 for status in OrderStatus}
+    for order in orders:
+        status_counts[order.status.value] += 1
+
+    return {
+        "period_days": days,
+        "total_orders": total_orders,
+        "total_revenue_cents": total_revenue,
+        "total_revenue_dollars": total_revenue / 100,
+        "average_order_value_cents": avg_order_value,
+        "average_order_value_dollars": avg_order_value / 100,
+        "orders_by_status": status_counts
+    }
+
+
+async def get_popular_dishes(db, limit: int = 10):
+    """Get most popular dishes based on order frequency"""
+    details = order_detail_history("order_id", "dish_id", "qty")
+    statement = select(
+        Dish.id,
+        Dish.name,
+        func.sum(details.c.qty).label('total_quantity'),
+        func.count(details.c.order_id.distinct()).label('order_count')
+    ).join(details, Dish.id == details.c.dish_id).where(
+        Dish.is_active == True
+    ).group_by(Dish.id, Dish.name).order_by(
+        func.sum(details.c.qty).desc()
+    ).limit(limit)
+    dish_orders = (await db.execute(statement)).all()
+
+    return [
+        {
+            "dish_id": dish.id,
+            "dish_name": dish.name,
+            "total_quantity": int(dish.total_quantity),
+            "order_count": int(dish.order_count),
+            "average_quantity": round(dish.total_quantity / dish.order_count, 2) if dish.order_count > 0 else 0
+        }
+        for dish in dish_orders
+    ]
+
+
+async def get_revenue_by_category(db):
+    """Get revenue breakdown by dish category"""
+    details = order_detail_history("dish_id", "line_total_cents")
+    statement = select(
+        Category.id,
+        Category.name,
+        func.sum(details.c.line_total_cents).label('total_revenue')
+    ).select_from(Category).join(Dish, Category.id == Dish.category_id).join(details, Dish.id == details.c.dish_id).where(
+        Category.is_active == True,
+        Dish.is_active == True
+    ).group_by(Category.id, Category.name).order_by(
+        func.sum(details.c.line_total_cents).desc()
+    )
+    category_revenue = (await db.execute(statement)).all()
+
+    return [
+        {
+            "category_id": cat.id,
+            "category_name": cat.name,
+            "total_revenue_cents": int(cat.total_revenue),
+            "total_revenue_dollars": round(cat.total_revenue / 100, 2)
+        }
+        for cat in category_revenue
+    ]
+
+
+def _customer_totals():
+    """Customer, order and delivery counts in one pass. CASE rather than an aggregate
+    FILTER clause, which MySQL does not support."""
+    history = order_history("id", "customer_name", "is_delivery")
+    return select(
+        func.count(func.distinct(history.c.customer_name)).label('unique_customers'),
+        func.count(history.c.id).label('total_orders'),
+        func.count(case((history.c.is_delivery == True, history.c.id))).label('delivery_orders')
+    )
+
+
+async def get_customer_analytics(db):
+    """Get customer behavior analytics"""
+    totals = (await db.execute(_customer_totals())).one()
+
+    unique_customers = totals.unique_customers
+    total_orders = totals.total_orders
+    delivery_orders = totals.delivery_orders
+    takeout_orders = total_orders - delivery_orders
+    avg_orders_per_customer = total_orders / unique_customers if unique_customers > 0 else 0
+
+    return {
+        "unique_customers": unique_customers,
+        "total_orders": total_orders,
+        "average_orders_per_customer": round(avg_orders_per_customer, 2),
+        "delivery_orders": delivery_orders,
+        "takeout_orders": takeout_orders,
+        "delivery_percentage": round((delivery_orders / total_orders) * 100, 2) if total_orders > 0 else 0
+    }
+
+
+async def get_promotion_analytics(db):
+    """Get promotion usage analytics"""
+    statement = select(Promotion).where(Promotion.is_active == True)
+    active_promotions = (await db.execute(statement)).scalars().all()
+
+    total_promotions = len(active_promotions)
+    total_usage = sum(promo.times_used for promo in active_promotions)
+
+    return {
+        "active_promotions": total_promotions,
+        "total_usage": total_usage,
+        "average_usage_per_promotion": round(total_usage / total_promotions, 2) if total_promotions > 0 else 0,
+        "promotions": [
+            {
+                "code": promo.code,
+                "description": promo.description,
+                "times_used": promo.times_used,
+                "usage_limit": promo.usage_limit
+            }
+            for promo in active_promotions
+        ]
+    }
+
+
+async def get_inventory_analytics(db):
+    """Get inventory analytics"""
+    statement = select(Resource).where(Resource.is_active == True)
+    resources = (await db.execute(statement)).scalars().all()
+
+    total_resources = len(resources)
+    low_stock_resources = [r for r in resources if r.amount <= 10]
+
+    return {
+        "total_resources": total_resources,
+        "low_stock_items": len(low_stock_resources),
+        "low_stock_percentage": round((len(low_stock_resources) / total_resources) * 100, 2) if total_resources > 0 else 0,
+        "low_stock_items": [
+            {
+                "name": resource.name,
+                "current_amount": resource.amount,
+                "unit": resource.unit
+            }
+            for resource in low_stock_resources
+        ]
+    }
@@ -0,0 +1,22 @@
+from fastapi import HTTPException
+from .menu import menu_catalog, filter_dishes, MENU_CATALOG
+from ..schemas.dishes import DishOut
+
+
+async def get_categories(db, skip: int = 0, limit: int = 100):
+    return (await menu_catalog.aget(db)).categories[skip:skip + limit]
+
+
+async def get_dishes(db, skip: int = 0, limit: int = 100, category_id: int = None, cursor: str = None):
+    return filter_dishes(await menu_catalog.aget(db), skip, limit, category_id, cursor)
+
+
+async def get_dish(db, dish_id: int) -> DishOut:
+    dish = (await menu_catalog.aget(db)).dishes_by_id.get(dish_id)
+    if dish is None:
+        raise HTTPException(status_code=404, detail="Dish not found")
+    return dish
+
+
+async def get_full_menu(db, if_none_match: str = None, accept_encoding: str = None):
+    return (await menu_catalog.aget(db)).snapshot().response(if_none_match, accept_encoding)
@@ -0,0 +1,97 @@
+from sqlalchemy import select, insert
+from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException
+from datetime import datetime
+from ..models import orders as model
+from ..models.order_details import OrderDetail as OrderDetailModel
+from ..schemas.orders import GuestOrderCreate, OrderOut
+from ..dependencies.pagination import decode_cursor, keyset
+from .order_assembly import build_order_out
+from ..models.order_events import OrderEvent
+from ..models.order_archive import ArchivedOrder
+from .menu import menu_catalog
+from ..dependencies.order_numbers import lease_worker_id
+from .orders import _price_items, _guest_order_row, _created_event_row, VALID_ORDER_STATUSES, order_cache
+
+
+async def _bulk_insert(db, model_class, rows: list) -> list:
+    if not rows:
+        return []
+    if db.get_bind().dialect.insert_executemany_returning:
+        statement = insert(model_class).returning(model_class.id)
+        return sorted((await db.execute(statement, rows)).scalars().all())
+
+    items = [model_class(**row) for row in rows]
+    db.add_all(items)
+    await db.flush()
+    return [item.id for item in items]
+
+
+async def _load_orders(db, statement, details=model.Order.order_details) -> list:
+    result = await db.execute(statement.options(selectinload(details)))
+    return [
+        build_order_out(order, sorted(order.order_details, key=lambda detail: detail.id))
+        for order in result.scalars().all()
+    ]
+
+
+async def create_guest_order(db, payload: GuestOrderCreate) -> OrderOut:
+    await db.run_sync(lease_worker_id)
+    prices = (await menu_catalog.aget(db)).prices
+    detail_rows, total_cents = _price_items(payload.items, prices)
+    order_row = _guest_order_row(payload, total_cents)
+
+    try:
+        order_id = (await db.execute(insert(model.Order.__table__), order_row)).inserted_primary_key[0]
+        for row in detail_rows:
+            row["order_id"] = order_id
+        detail_ids = await _bulk_insert(db, OrderDetailModel, detail_rows)
+        await db.execute(insert(OrderEvent.__table__), _created_event_row(order_row))
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        error = str(e.__dict__['orig'])
+        raise HTTPException(status_code=400, detail=error)
+
+    return build_order_out(
+        model.Order(id=order_id, **order_row),
+        [OrderDetailModel(id=detail_id, **row) for detail_id, row in zip(detail_ids, detail_rows)]
+    )
+
+
+async def get_order_by_number(db, order_number: str):
+    statement = select(model.Order).where(model.Order.order_number == order_number).limit(1)
+    orders = await _load_orders(db, statement)
+    if not orders:
+        statement = select(ArchivedOrder).where(ArchivedOrder.order_number == order_number).limit(1)
+        orders = await _load_orders(db, statement, ArchivedOrder.order_details)
+    if not orders:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return orders[0]
+
+
+async def get_order_json(db, order_number: str) -> bytes:
+    body = order_cache.get(order_number)
+    if body is None:
+        generation = order_cache.generation
+        body = (await get_order_by_number(db, order_number)).model_dump_json().encode()
+        order_cache.put(order_number, body, generation)
+    return body
+
+
+async def get_orders_by_status(db, status: str = None, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Get orders filtered by status for staff dashboard, oldest first"""
+    statement = select(model.Order)
+
+    if status:
+        if status not in VALID_ORDER_STATUSES:
+            raise HTTPException(status_code=400, detail="Invalid status")
+        statement = statement.where(model.Order.status == model.OrderStatus(status))
+
+    after = decode_cursor(cursor, datetime.fromisoformat, int) if cursor else None
+    if after:
+        skip = 0
+
+    statement = keyset(statement, [model.Order.order_date, model.Order.id], after)
+    return await _load_orders(db, statement.offset(skip).limit(limit))
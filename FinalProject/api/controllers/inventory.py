@@ -0,0 +1,100 @@
+from collections import defaultdict
+from sqlalchemy import select, delete, insert, update, case, func
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from ..dependencies.config import conf
+from ..dependencies.cache import VersionedCache, bump_version
+from ..models.dishes import Dish
+from ..models.order_details import OrderDetail
+from ..models.recipes import Recipe
+from ..models.resources import Resource
+from ..schemas.recipes import DishRecipe, DishRecipeItem, DishRecipeOut
+from .resources import RESOURCES_CATALOG
+
+RECIPES_CATALOG = "recipes"
+
+
+def _load_recipes(db: Session) -> dict:
+    """Per-dish requirement vectors ({dish_id: {resource_id: amount}}) loaded with one query"""
+    rows = db.execute(
+        select(Recipe.dish_id, Recipe.resource_id, Recipe.amount).where(Recipe.dish_id.is_not(None))
+    ).all()
+    vectors = defaultdict(dict)
+    for row in rows:
+        vectors[row.dish_id][row.resource_id] = vectors[row.dish_id].get(row.resource_id, 0) + row.amount
+    return dict(vectors)
+
+
+# Reloaded whenever set_dish_recipe bumps the recipes version, in any worker
+recipe_book = VersionedCache(RECIPES_CATALOG, _load_recipes, conf.recipe_version_check_seconds)
+
+
+def get_dish_recipe(db: Session, dish_id: int) -> DishRecipeOut:
+    rows = db.execute(
+        select(Recipe.resource_id, Recipe.amount).where(Recipe.dish_id == dish_id).order_by(Recipe.resource_id)
+    ).all()
+    return DishRecipeOut(
+        dish_id=dish_id,
+        items=[DishRecipeItem(resource_id=row.resource_id, amount=row.amount) for row in rows]
+    )
+
+
+def set_dish_recipe(db: Session, dish_id: int, recipe: DishRecipe) -> DishRecipeOut:
+    """Replace the resources one serving of a dish consumes"""
+    if db.get(Dish, dish_id) is None:
+        raise HTTPException(status_code=404, detail="Dish not found")
+    resource_ids = {item.resource_id for item in recipe.items}
+    found = set(db.execute(select(Resource.id).where(Resource.id.in_(resource_ids))).scalars())
+    if found != resource_ids:
+        raise HTTPException(status_code=404, detail=f"Resources not found: {sorted(resource_ids - found)}")
+
+    db.execute(delete(Recipe.__table__).where(Recipe.dish_id == dish_id))
+    if recipe.items:
+        db.execute(insert(Recipe.__table__), [
+            {"dish_id": dish_id, "resource_id": item.resource_id, "amount": item.amount} for item in recipe.items
+        ])
+    bump_version(db, RECIPES_CATALOG)
+    db.commit()
+    recipe_book.invalidate()
+    return get_dish_recipe(db, dish_id)
+
+
+def order_requirements(db: Session, order_ids: list) -> dict:
+    """Total {resource_id: amount} needed by the line items of the given orders"""
+    vectors = recipe_book.get(db)
+    if not vectors:
+        return {}
+    lines = db.execute(
+        select(OrderDetail.dish_id, func.sum(OrderDetail.qty))
+        .where(OrderDetail.order_id.in_(order_ids))
+        .group_by(OrderDetail.dish_id)
+    ).all()
+    totals = defaultdict(int)
+    for dish_id, qty in lines:
+        for resource_id, amount in vectors.get(dish_id, {}).items():
+            totals[resource_id] += amount * qty
+    return dict(totals)
+
+
+def consume_stock(db: Session, order_ids: list):
+    """Deduct the stock the given orders need with one UPDATE, inside the caller's transaction.
+
+    Every resource row is decremented only if it holds enough, so when any
+    resource falls short the UPDATE touches fewer rows than required and a
+    409 is raised; the caller rolls back and nothing is written.
+    """
+    totals = order_requirements(db, order_ids) if order_ids else {}
+    if not totals:
+        return
+    needed = case(totals, value=Resource.id)
+    result = db.execute(
+        update(Resource.__table__)
+        .where(Resource.id.in_(totals), Resource.amount >= needed)
+        .values(amount=Resource.amount - needed)
+    )
+    if result.rowcount != len(totals):
+        short = db.execute(
+            select(Resource.name).where(Resource.id.in_(totals), Resource.amount < needed).order_by(Resource.name)
+        ).scalars().all()
+        raise HTTPException(status_code=409, detail=f"Insufficient stock: {', '.join(short)}")
+    bump_version(db, RESOURCES_CATALOG)
@@ -1,10 +1,118 @@
+import gzip
+import hashlib
+from bisect import bisect_right
+from operator import attrgetter
+from sqlalchemy import update, func, cast, Integer
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from ..models.categories import Category
 from ..models.dishes import Dish
-from ..schemas.categories import CategoryCreate, CategoryUpdate, CategoryOut
-from ..schemas.dishes import DishCreate, DishUpdate, DishOut
+from ..dependencies.cache import VersionedCache, bump_version
+from ..dependencies.conditional import etag_matches
+from ..dependencies.config import conf
+from ..dependencies.pagination import decode_cursor
+from ..schemas.categories import CategoryCreate, CategoryUpdate, CategoryOut, MenuCategoryOut, FullMenuOut
+from ..schemas.dishes import DishCreate, DishUpdate, DishOut, PriceAdjustment, PriceAdjustmentResult
+from .menu_search import index_dishes, matching_dish_ids
+
+MENU_CATALOG = "menu"
+
+
+class MenuCatalog:
+    """Active categories and dishes as response models, each list ordered by id"""
+
+    def __init__(self, categories: list, dishes: list):
+        self.categories = categories
+        self.dishes = dishes
+        self.dishes_by_id = {dish.id: dish for dish in dishes}
+        self.dishes_by_category = {}
+        for dish in dishes:
+            self.dishes_by_category.setdefault(dish.category_id, []).append(dish)
+        self.prices = {dish.id: dish.price_cents for dish in dishes}
+        self._snapshot = None
+
+    def snapshot(self) -> "MenuSnapshot":
+        """The full menu document, rendered on first use and then shared by every request"""
+        if self._snapshot is None:
+            self._snapshot = MenuSnapshot(FullMenuOut(categories=[
+                MenuCategoryOut(**category.model_dump(), dishes=self.dishes_by_category.get(category.id, []))
+                for category in self.categories
+            ]).model_dump_json().encode())
+        return self._snapshot
+
+
+class MenuSnapshot:
+    """Encoded full menu plus its gzipped form and content-derived ETags, identical on every worker.
+
+    The two content-codings are different representations, so each gets its
+    own strong ETag; the gzipped one carries a `-gz` suffix.
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+
+    def matches(self, if_none_match: str = None) -> bool:
+        """Either tag means the client holds this menu, whichever coding it was sent in"""
+        return etag_matches(self.etag, if_none_match) or etag_matches(self.gzip_etag, if_none_match)
+
+    def response(self, if_none_match: str = None, accept_encoding: str = None) -> Response:
+        gzipped = accepts_gzip(accept_encoding)
+        headers = {"ETag": self.gzip_etag if gzipped else self.etag, "Cache-Control": "no-cache",
+                   "Vary": "Accept-Encoding"}
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzipped, media_type="application/json", headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def accepts_gzip(accept_encoding: str = None) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _load_catalog(db: Session) -> MenuCatalog:
+    categories = db.query(Category).filter(Category.is_active == True).order_by(Category.id).all()
+    dishes = db.query(Dish).filter(Dish.is_active == True).order_by(Dish.id).all()
+    return MenuCatalog(
+        [CategoryOut.model_validate(category.__dict__) for category in categories],
+        [DishOut.model_validate(dish.__dict__) for dish in dishes]
+    )
+
+
+menu_catalog = VersionedCache(MENU_CATALOG, _load_catalog, conf.menu_version_check_seconds)
+
+
+def _commit_menu_change(db: Session, dishes: list = None, category_id: int = None):
+    """Commit a menu write together with the search rows of the dishes it touched and a
+    catalog version bump, then drop this worker's copy"""
+    db.flush()
+    if dishes:
+        index_dishes(db, dish_ids=[dish.id for dish in dishes])
+    if category_id is not None:
+        index_dishes(db, category_id=category_id)
+    bump_version(db, MENU_CATALOG)
+    db.commit()
+    menu_catalog.invalidate()
+
+
+def active_dish_prices(db: Session) -> dict:
+    """{dish_id: price_cents} of every active dish, from the menu catalog"""
+    return menu_catalog.get(db).prices
+
+
+def get_full_menu(db: Session, if_none_match: str = None, accept_encoding: str = None) -> Response:
+    """Every active category with its active dishes as one pre-encoded JSON document"""
+    return menu_catalog.get(db).snapshot().response(if_none_match, accept_encoding)
 
 
 def create_category(db: Session, category: CategoryCreate) -> CategoryOut:
@@ -14,7 +122,7 @@ def create_category(db: Session, category: CategoryCreate) -> CategoryOut:
     )
     try:
         db.add(db_category)
-        db.commit()
+        _commit_menu_change(db)
         db.refresh(db_category)
         return CategoryOut.model_validate(db_category.__dict__)
     except IntegrityError:
@@ -23,7 +131,7 @@ def create_category(db: Session, category: CategoryCreate) -> CategoryOut:
 
 
 def get_categories(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Category).filter(Category.is_active == True).offset(skip).limit(limit).all()
+    return menu_catalog.get(db).categories[skip:skip + limit]
 
 
 def get_category(db: Session, category_id: int) -> Category:
@@ -44,7 +152,7 @@ def update_category(db: Session, category_id: int, category: CategoryUpdate) ->
         db_category.is_active = category.is_active
     
     try:
-        db.commit()
+        _commit_menu_change(db, category_id=category_id)
         db.refresh(db_category)
         return CategoryOut.model_validate(db_category.__dict__)
     except IntegrityError:
@@ -55,10 +163,23 @@ def update_category(db: Session, category_id: int, category: CategoryUpdate) ->
 def delete_category(db: Session, category_id: int):
     db_category = get_category(db, category_id)
     db_category.is_active = False
-    db.commit()
+    _commit_menu_change(db, category_id=category_id)
     return {"message": "Category deleted"}
 
 
+def adjust_category_prices(db: Session, category_id: int, adjustment: PriceAdjustment) -> PriceAdjustmentResult:
+    """Scale the price of every active dish in a category by a percentage with one UPDATE"""
+    get_category(db, category_id)
+    factor = 1 + adjustment.percent / 100
+    result = db.execute(
+        update(Dish.__table__)
+        .where(Dish.category_id == category_id, Dish.is_active == True)
+        .values(price_cents=cast(func.round(Dish.price_cents * factor), Integer))
+    )
+    _commit_menu_change(db)
+    return PriceAdjustmentResult(category_id=category_id, percent=adjustment.percent, updated=result.rowcount)
+
+
 def create_dish(db: Session, dish: DishCreate) -> DishOut:
     # Verify category exists
     category = db.query(Category).filter(Category.id == dish.category_id).first()
@@ -73,16 +194,25 @@ def create_dish(db: Session, dish: DishCreate) -> DishOut:
         is_active=dish.is_active
     )
     db.add(db_dish)
-    db.commit()
+    _commit_menu_change(db, dishes=[db_dish])
     db.refresh(db_dish)
     return DishOut.model_validate(db_dish.__dict__)
 
 
-def get_dishes(db: Session, skip: int = 0, limit: int = 100, category_id: int = None):
-    query = db.query(Dish).filter(Dish.is_active == True)
-    if category_id:
-        query = query.filter(Dish.category_id == category_id)
-    return query.offset(skip).limit(limit).all()
+def filter_dishes(catalog: MenuCatalog, skip: int = 0, limit: int = 100, category_id: int = None, cursor: str = None):
+    """One page of the catalog's dishes, with the same cursor semantics as a keyset query on Dish.id"""
+    dishes = catalog.dishes_by_category.get(category_id, []) if category_id else catalog.dishes
+    after = decode_cursor(cursor, int) if cursor else None
+    start = 0
+    if after:
+        start = bisect_right(dishes, after[0], key=attrgetter("id"))
+        skip = 0
+    start += skip
+    return dishes[start:start + limit]
+
+
+def get_dishes(db: Session, skip: int = 0, limit: int = 100, category_id: int = None, cursor: str = None):
+    return filter_dishes(menu_catalog.get(db), skip, limit, category_id, cursor)
 
 
 def get_dish(db: Session, dish_id: int) -> Dish:
@@ -92,6 +222,19 @@ def get_dish(db: Session, dish_id: int) -> Dish:
     return dish
 
 
+def get_menu_dish(db: Session, dish_id: int) -> DishOut:
+    dish = menu_catalog.get(db).dishes_by_id.get(dish_id)
+    if dish is None:
+        raise HTTPException(status_code=404, detail="Dish not found")
+    return dish
+
+
+def search_dishes(db: Session, q: str, limit: int = 20) -> list:
+    """Active dishes whose name, description or category name match `q`, best match first"""
+    dishes_by_id = menu_catalog.get(db).dishes_by_id
+    return [dishes_by_id[dish_id] for dish_id in matching_dish_ids(db, q, limit) if dish_id in dishes_by_id]
+
+
 def update_dish(db: Session, dish_id: int, dish: DishUpdate) -> DishOut:
     db_dish = get_dish(db, dish_id)
     
@@ -110,7 +253,7 @@ def update_dish(db: Session, dish_id: int, dish: DishUpdate) -> DishOut:
     if dish.is_active is not None:
         db_dish.is_active = dish.is_active
     
-    db.commit()
+    _commit_menu_change(db, dishes=[db_dish])
     db.refresh(db_dish)
     return DishOut.model_validate(db_dish.__dict__)
 
@@ -118,5 +261,5 @@ def update_dish(db: Session, dish_id: int, dish: DishUpdate) -> DishOut:
 def delete_dish(db: Session, dish_id: int):
     db_dish = get_dish(db, dish_id)
     db_dish.is_active = False
-    db.commit()
+    _commit_menu_change(db, dishes=[db_dish])
     return {"message": "Dish deleted"}
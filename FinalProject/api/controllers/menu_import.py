@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+import tempfile
+from itertools import islice
+from sqlalchemy import select, insert, update, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException
+from pydantic import ValidationError
+from ..models.categories import Category
+from ..models.dishes import Dish
+from ..dependencies.config import conf
+from ..schemas.dishes import DishImportRow, MenuImportError, MenuImportResult
+from .menu import _commit_menu_change
+from .menu_search import index_dishes
+
+IMPORT_FORMATS = ("csv", "ndjson")
+SPOOL_MAX_MEMORY = 1024 * 1024  # request bodies larger than this are buffered on disk
+
+
+async def spool_body(chunks) -> io.TextIOWrapper:
+    """Buffer an uploaded body as it arrives and hand it back as a text stream for import_menu"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+    return io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+
+
+def _read_rows(stream, format: str):
+    """Yield (line number, row dict or error message) from a text stream, one line at a time"""
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # Empty cells fall back to the field defaults
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, "")}
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, "Invalid JSON"
+            continue
+        yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+def _upsert_chunk(db: Session, rows: list) -> tuple:
+    """Insert or update one chunk of (category_id, DishImportRow) with one SELECT and at most
+    one executemany INSERT and one bulk UPDATE; returns (created, updated)"""
+    latest = {(category_id, row.name): row for category_id, row in rows}  # a later duplicate line wins
+    existing = {
+        (category_id, name): dish_id
+        for dish_id, category_id, name in db.execute(
+            select(Dish.id, Dish.category_id, Dish.name)
+            .where(tuple_(Dish.category_id, Dish.name).in_(list(latest)))
+            .order_by(Dish.id)
+        )
+    }
+    inserts, updates = [], []
+    for (category_id, name), row in latest.items():
+        values = {"name": name, "description": row.description, "price_cents": row.price_cents,
+                  "category_id": category_id, "is_active": row.is_active}
+        if (category_id, name) in existing:
+            updates.append({"id": existing[(category_id, name)], **values})
+        else:
+            inserts.append(values)
+    if inserts:
+        db.execute(insert(Dish.__table__), inserts)
+    if updates:
+        db.execute(update(Dish), updates)  # ORM bulk UPDATE by primary key
+    return len(inserts), len(updates)
+
+
+def import_menu(db: Session, stream, format: str = "csv", chunk_size: int = None) -> MenuImportResult:
+    """Upsert dishes from a CSV (with a header line) or NDJSON text stream in one transaction.
+
+    Columns/keys are those of DishImportRow. Categories are resolved by name
+    with one query up front; rows are read lazily and written `chunk_size` at
+    a time. A row that fails validation is reported with its line number and
+    skipped, while the rest of the import still commits.
+    """
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format {format!r}")
+    chunk_size = chunk_size or conf.menu_import_chunk_size
+    categories = dict(db.execute(select(Category.name, Category.id).where(Category.is_active == True)).all())
+
+    errors = []
+    failed = created = updated = 0
+    touched_categories = set()
+
+    def report(line: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < conf.menu_import_max_errors:
+            errors.append(MenuImportError(line=line, error=message))
+
+    def valid_rows():
+        for line, row in _read_rows(stream, format):
+            if isinstance(row, str):
+                report(line, row)
+                continue
+            try:
+                dish = DishImportRow.model_validate(row)
+            except ValidationError as e:
+                report(line, _validation_message(e))
+                continue
+            category_id = categories.get(dish.category)
+            if category_id is None:
+                report(line, f"Category {dish.category!r} not found")
+                continue
+            yield category_id, dish
+
+    rows = valid_rows()
+    try:
+        while chunk := list(islice(rows, chunk_size)):
+            chunk_created, chunk_updated = _upsert_chunk(db, chunk)
+            created += chunk_created
+            updated += chunk_updated
+            touched_categories.update(category_id for category_id, _ in chunk)
+        for category_id in touched_categories:
+            index_dishes(db, category_id=category_id)
+        _commit_menu_change(db)
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get('orig', e))
+        raise HTTPException(status_code=400, detail=error)
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Unreadable import file: {e}")
+    return MenuImportResult(created=created, updated=updated, failed=failed, errors=errors)
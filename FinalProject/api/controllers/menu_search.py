@@ -0,0 +1,61 @@
+import re
+from sqlalchemy import select, insert, delete, func, text, desc
+from ..models.categories import Category
+from ..models.dishes import Dish
+from ..models.dish_search import dish_search_table
+
+TERM = re.compile(r"\w+")
+MAX_TERMS = 8
+# bm25 column weights for name, description, category: a hit in the name counts most
+SQLITE_RANK = "bm25(dish_search, 10.0, 1.0, 4.0)"
+MYSQL_MATCH = "MATCH (name, description, category) AGAINST (:query IN BOOLEAN MODE)"
+
+
+def _dialect_name(db) -> str:
+    # Sessions from the controllers, bare connections from the migration backfill
+    return db.dialect.name if hasattr(db, "dialect") else db.get_bind().dialect.name
+
+
+def index_dishes(db, dish_ids: list = None, category_id: int = None):
+    """Rewrite the search rows of the given dishes, of every dish in a category, or of all dishes.
+
+    Runs inside the caller's transaction, so the index commits together with
+    the menu write; inactive dishes and the dishes of inactive categories are
+    dropped from it.
+    """
+    search = dish_search_table(_dialect_name(db))
+    search_id = list(search.c)[0]
+    dishes = select(Dish.id)
+    if dish_ids is not None:
+        dishes = dishes.where(Dish.id.in_(dish_ids))
+    if category_id is not None:
+        dishes = dishes.where(Dish.category_id == category_id)
+
+    db.execute(delete(search).where(search_id.in_(dishes)))
+    db.execute(insert(search).from_select(
+        [search_id.name, "name", "description", "category"],
+        select(Dish.id, Dish.name, func.coalesce(Dish.description, ""), Category.name)
+        .join(Category, Dish.category_id == Category.id)
+        .where(Dish.is_active == True, Category.is_active == True, Dish.id.in_(dishes))
+    ))
+
+
+def matching_dish_ids(db, q: str, limit: int) -> list:
+    """Ids of the dishes matching every word of `q`, each as a prefix, best match first"""
+    terms = TERM.findall(q.lower())[:MAX_TERMS]
+    if not terms:
+        return []
+    dialect_name = _dialect_name(db)
+    search = dish_search_table(dialect_name)
+    search_id = list(search.c)[0]
+    if dialect_name == "mysql":
+        match = text(MYSQL_MATCH).bindparams(query=" ".join(f"+{term}*" for term in terms))
+        statement = select(search_id).where(match).order_by(desc(match), search_id)
+    else:
+        query = " ".join(f'"{term}"*' for term in terms)
+        statement = (
+            select(search_id)
+            .where(text("dish_search MATCH :query").bindparams(query=query))
+            .order_by(text(SQLITE_RANK), search_id)
+        )
+    return db.execute(statement.limit(limit)).scalars().all()
@@ -0,0 +1,113 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update, delete, union_all, literal, exists, func, tuple_
+from sqlalchemy.orm import Session
+from ..dependencies.config import conf
+from ..models.orders import Order, OrderStatus
+from ..models.order_details import OrderDetail
+from ..models.order_archive import ArchivedOrder, ArchivedOrderDetail, ArchivedStatusCount
+from ..models.reviews import Review
+from .order_assembly import load_order
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = [OrderStatus.DELIVERED, OrderStatus.CANCELLED]
+ORDER_COLUMNS = [column.name for column in Order.__table__.columns]
+DETAIL_COLUMNS = [column.name for column in OrderDetail.__table__.columns]
+
+
+def archive_orders(db: Session, older_than_days: int = None, batch_size: int = None) -> int:
+    """Move finished orders older than `older_than_days` and their details into the archive tables.
+
+    Each batch is copied with INSERT ... SELECT and removed from the live tables
+    in its own transaction, so the job can be stopped and resumed at any point
+    and never holds write locks for long. Orders with a review stay live, as
+    reviews reference orders.order_number. Returns the number of orders moved.
+    """
+    older_than_days = older_than_days if older_than_days is not None else conf.archive_after_days
+    batch_size = batch_size or conf.archive_batch_size
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+
+    newest_id = select(func.max(Order.id)).correlate(None).scalar_subquery()
+    # The same holds for order_details, whose newest row can belong to an older order when a
+    # detail is added later; that order waits until a newer detail exists
+    newest_detail_order_id = func.coalesce(select(OrderDetail.order_id).where(
+        OrderDetail.id == select(func.max(OrderDetail.id)).scalar_subquery()
+    ).correlate(None).scalar_subquery(), 0)
+
+    moved = 0
+    for status in FINISHED_STATUSES:
+        after = None
+        while True:
+            # Walk ix_orders_status_order_date_id forward from the previous batch, so each
+            # batch reads only its own rows and needs no sort
+            candidates = select(Order.id, Order.order_date).where(
+                Order.status == status,
+                Order.order_date < cutoff,
+                ~exists().where(Review.order_number == Order.order_number),
+                # SQLite hands the highest rowid out again once its row is deleted; keeping the
+                # newest order live means archived ids are never reused by new orders
+                Order.id < newest_id,
+                Order.id != newest_detail_order_id
+            )
+            if after is not None:
+                candidates = candidates.where(tuple_(Order.order_date, Order.id) > after)
+            rows = db.execute(candidates.order_by(Order.order_date, Order.id).limit(batch_size)).all()
+            if not rows:
+                break
+            after = tuple(rows[-1])
+            moved += _archive_batch(db, [row.id for row in rows], status)
+            logger.info("Archived %s orders", moved)
+    return moved
+
+
+def _archive_batch(db: Session, ids: list, status: OrderStatus) -> int:
+    db.execute(insert(ArchivedOrder.__table__).from_select(
+        ORDER_COLUMNS + ["archived_at"],
+        select(*[Order.__table__.c[name] for name in ORDER_COLUMNS], literal(datetime.now())).where(Order.id.in_(ids))
+    ))
+    db.execute(insert(ArchivedOrderDetail.__table__).from_select(
+        DETAIL_COLUMNS,
+        select(*[OrderDetail.__table__.c[name] for name in DETAIL_COLUMNS]).where(OrderDetail.order_id.in_(ids))
+    ))
+    db.execute(delete(OrderDetail.__table__).where(OrderDetail.order_id.in_(ids)))
+    db.execute(delete(Order.__table__).where(Order.id.in_(ids)))
+    count_archived(db, status, len(ids))
+    db.commit()
+    return len(ids)
+
+
+def count_archived(db: Session, status: OrderStatus, orders: int):
+    """Add `orders` to the archived count of `status`, inside the caller's transaction"""
+    table = ArchivedStatusCount.__table__
+    counted = db.execute(
+        update(table).where(table.c.status == status).values(orders=table.c.orders + orders)
+    ).rowcount
+    if not counted:
+        db.execute(insert(table).values(status=status, orders=orders))
+
+
+def order_history(*names):
+    """Live and archived orders as one subquery with the given columns (default: all)"""
+    names = names or ORDER_COLUMNS
+    return union_all(
+        select(*[Order.__table__.c[name] for name in names]),
+        select(*[ArchivedOrder.__table__.c[name] for name in names])
+    ).subquery("order_history")
+
+
+def order_detail_history(*names):
+    """Live and archived order details as one subquery with the given columns (default: all)"""
+    names = names or DETAIL_COLUMNS
+    return union_all(
+        select(*[OrderDetail.__table__.c[name] for name in names]),
+        select(*[ArchivedOrderDetail.__table__.c[name] for name in names])
+    ).subquery("order_detail_history")
+
+
+def get_archived_order(db: Session, order_number: str):
+    """OrderOut for an archived order, or None"""
+    return load_order(
+        db.query(ArchivedOrder).filter(ArchivedOrder.order_number == order_number),
+        ArchivedOrder.order_details
+    )
@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Query, selectinload
+from ..models import orders as model
+from ..schemas.orders import OrderOut
+from ..schemas.order_details import OrderDetail
+
+
+def build_order_out(order, details) -> OrderOut:
+    """Build the OrderOut response from an order and its detail rows"""
+    return OrderOut(
+        order_number=order.order_number,
+        id=order.id,
+        status=order.status.value,
+        total_cents=order.total_cents,
+        payment_method=order.payment_method,
+        payment_status=order.payment_status,
+        items=[OrderDetail(
+            id=detail.id,
+            order_id=detail.order_id,
+            dish_id=detail.dish_id,
+            qty=detail.qty,
+            unit_price_cents=detail.unit_price_cents,
+            line_total_cents=detail.line_total_cents
+        ) for detail in details],
+        created_at=order.order_date,
+        is_delivery=order.is_delivery
+    )
+
+
+def load_orders(query: Query, details=model.Order.order_details) -> list:
+    """Load a page of orders together with all of their details.
+
+    The details for the whole page come from one extra SELECT ... WHERE order_id IN (...),
+    so a page always costs two queries no matter how many orders it holds. Pass
+    `details=ArchivedOrder.order_details` for queries on the archive.
+    """
+    orders = query.options(selectinload(details)).all()
+    return [build_order_out(order, sorted(order.order_details, key=lambda detail: detail.id)) for order in orders]
+
+
+def load_order(query: Query, details=model.Order.order_details):
+    """Load a single order with its details, or None when the query matches nothing"""
+    orders = load_orders(query.limit(1), details)
+    return orders[0] if orders else None
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response, Depends
 from ..models import order_details as model
+from .orders import invalidate_order_id
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -19,6 +20,7 @@ def create(db: Session, request):
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
+    invalidate_order_id(db, new_item.order_id)
     return new_item
 
 
@@ -45,25 +47,33 @@ def read_one(db: Session, item_id):
 def update(db: Session, item_id, request):
     try:
         item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id)
-        if not item.first():
+        existing = item.first()
+        if not existing:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        order_id = existing.order_id
         update_data = request.dict(exclude_unset=True)
         item.update(update_data, synchronize_session=False)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    updated = item.first()
+    for affected_order_id in {order_id, updated.order_id}:
+        invalidate_order_id(db, affected_order_id)
+    return updated
 
 
 def delete(db: Session, item_id):
     try:
         item = db.query(model.OrderDetail).filter(model.OrderDetail.id == item_id)
-        if not item.first():
+        existing = item.first()
+        if not existing:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        order_id = existing.order_id
         item.delete(synchronize_session=False)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    invalidate_order_id(db, order_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
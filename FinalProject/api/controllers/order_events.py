@@ -0,0 +1,34 @@
+from sqlalchemy import insert, delete
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from ..dependencies.config import conf
+from ..models.order_events import OrderEvent
+
+
+def order_event_row(order_number: str, event_type: str, status: str, payment_status: str) -> dict:
+    return {
+        "order_number": order_number,
+        "event_type": event_type,
+        "status": status,
+        "payment_status": payment_status,
+        "created_at": datetime.now()
+    }
+
+
+def record_order_events(db: Session, rows: list):
+    """Queue order events in the caller's transaction so they commit (or roll back) with the change"""
+    if rows:
+        db.execute(insert(OrderEvent.__table__), rows)
+
+
+def prune_order_events(db: Session, older_than_seconds: int = None) -> int:
+    """Delete events older than the retention window (default: order_event_retention_seconds).
+
+    Runs from the app lifespan and the archive command, never from the
+    stream poller, so the log is bounded whether or not anyone is listening.
+    """
+    retention = older_than_seconds if older_than_seconds is not None else conf.order_event_retention_seconds
+    cutoff = datetime.now() - timedelta(seconds=retention)
+    deleted = db.execute(delete(OrderEvent.__table__).where(OrderEvent.created_at < cutoff)).rowcount
+    db.commit()
+    return deleted
@@ -1,16 +1,53 @@
+from sqlalchemy import select, insert, update as sql_update, func, union_all
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Response, Depends
+from datetime import datetime
 from ..models import orders as model
-from ..models.dishes import Dish
-from ..schemas.orders import GuestOrderCreate, OrderOut, OrderStatusUpdate, PaymentUpdate
-from ..schemas.order_details import OrderDetail
+from ..models.order_details import OrderDetail as OrderDetailModel
+from ..models.order_archive import ArchivedStatusCount
+from ..schemas.orders import (
+    GuestOrderCreate, GuestOrderBatchCreate, GuestOrderBatchItemResult, GuestOrderBatchOut,
+    OrderOut, OrderStatusUpdate, PaymentUpdate, OrderStatusBatchUpdate, OrderStatusBatchOut, OrderStatusConflict
+)
+from ..dependencies.pagination import decode_cursor, keyset
+from ..dependencies.order_numbers import next_order_number, lease_worker_id
+from ..dependencies.cache import LRUCache
+from ..dependencies.config import conf
+from ..dependencies import group_commit
+from .order_assembly import build_order_out, load_order, load_orders
+from .order_events import order_event_row, record_order_events
+from .order_archive import get_archived_order
+from .inventory import consume_stock
+from .menu import active_dish_prices
 from sqlalchemy.exc import SQLAlchemyError
-import uuid
+
+VALID_ORDER_STATUSES = [order_status.value for order_status in model.OrderStatus]
+
+# Order lifecycle: the statuses each status may move to. Delivered and cancelled are final.
+ORDER_TRANSITIONS = {
+    model.OrderStatus.PENDING: {model.OrderStatus.CONFIRMED, model.OrderStatus.CANCELLED},
+    model.OrderStatus.CONFIRMED: {model.OrderStatus.PREPARING, model.OrderStatus.CANCELLED},
+    model.OrderStatus.PREPARING: {model.OrderStatus.READY, model.OrderStatus.CANCELLED},
+    model.OrderStatus.READY: {model.OrderStatus.OUT_FOR_DELIVERY, model.OrderStatus.DELIVERED},
+    model.OrderStatus.OUT_FOR_DELIVERY: {model.OrderStatus.DELIVERED},
+    model.OrderStatus.DELIVERED: set(),
+    model.OrderStatus.CANCELLED: set(),
+}
+
+# The same table inverted: for each target status, the statuses an order may be in to move there
+ALLOWED_SOURCES = {
+    target: [source for source, targets in ORDER_TRANSITIONS.items() if target in targets]
+    for target in model.OrderStatus
+}
+
+# Serialized OrderOut JSON by order number, for customers refreshing their tracking page
+order_cache = LRUCache(conf.order_cache_size, conf.order_cache_ttl_seconds)
 
 
 def create(db: Session, request):
     # Generate unique order number
-    order_number = uuid.uuid4().hex[:12]
+    lease_worker_id(db)
+    order_number = next_order_number()
     
     new_item = model.Order(
         order_number=order_number,
@@ -24,6 +61,7 @@ def create(db: Session, request):
 
     try:
         db.add(new_item)
+        record_order_events(db, [order_event_row(order_number, "created", "pending", "pending")])
         db.commit()
         db.refresh(new_item)
     except SQLAlchemyError as e:
@@ -33,9 +71,22 @@ def create(db: Session, request):
     return new_item
 
 
-def read_all(db: Session):
+def read_all(db: Session, status: str = None, skip: int = 0, limit: int = None, cursor: str = None):
+    """Orders oldest first; every order unless a limit is given, then one keyset page"""
+    query = db.query(model.Order)
+    if status:
+        if status not in VALID_ORDER_STATUSES:
+            raise HTTPException(status_code=400, detail="Invalid status")
+        query = query.filter(model.Order.status == model.OrderStatus(status))
+
+    after = decode_cursor(cursor, datetime.fromisoformat, int) if cursor else None
+    if after:
+        skip = 0
+    query = keyset(query, [model.Order.order_date, model.Order.id], after).offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
     try:
-        result = db.query(model.Order).all()
+        result = query.all()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
@@ -56,163 +107,318 @@ def read_one(db: Session, item_id):
 def update(db: Session, item_id, request):
     try:
         item = db.query(model.Order).filter(model.Order.id == item_id)
-        if not item.first():
+        existing = item.first()
+        if not existing:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        order_number = existing.order_number
         update_data = request.dict(exclude_unset=True)
         item.update(update_data, synchronize_session=False)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-    return item.first()
+    updated = item.first()
+    order_cache.invalidate(order_number, updated.order_number)
+    return updated
 
 
 def delete(db: Session, item_id):
     try:
         item = db.query(model.Order).filter(model.Order.id == item_id)
-        if not item.first():
+        existing = item.first()
+        if not existing:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Id not found!")
+        order_number = existing.order_number
         item.delete(synchronize_session=False)
         db.commit()
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    order_cache.invalidate(order_number)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-def create_guest_order(db: Session, payload: GuestOrderCreate) -> OrderOut:
-    # Validate each dish exists and qty >= 1
-    dishes = {}
-    total_cents = 0
-    
-    for item in payload.items:
+def _price_items(items, prices: dict):
+    """Validate cart lines against the dish price map and build order detail rows"""
+    for item in items:
         if item.qty < 1:
             raise HTTPException(status_code=422, detail=f"Quantity must be at least 1 for dish {item.dish_id}")
-        
-        dish = db.query(Dish).filter(Dish.id == item.dish_id, Dish.is_active == True).first()
-        if not dish:
+
+    detail_rows = []
+    total_cents = 0
+    for item in items:
+        unit_price_cents = prices.get(item.dish_id)
+        if unit_price_cents is None:
             raise HTTPException(status_code=404, detail=f"Dish {item.dish_id} not found")
-        
-        dishes[item.dish_id] = dish
-        total_cents += dish.price_cents * item.qty
-    
-    # Generate unique order number
-    order_number = uuid.uuid4().hex[:12]
-    
-    # Create order
-    new_order = model.Order(
-        order_number=order_number,
-        customer_name=payload.customer_name,
-        customer_phone=payload.customer_phone,
-        customer_address=payload.customer_address,
-        is_delivery=payload.is_delivery,
-        payment_method=payload.payment_method,
-        total_cents=total_cents
-    )
-    
+
+        line_total_cents = unit_price_cents * item.qty
+        detail_rows.append({
+            "dish_id": item.dish_id,
+            "qty": item.qty,
+            "unit_price_cents": unit_price_cents,
+            "line_total_cents": line_total_cents
+        })
+        total_cents += line_total_cents
+
+    return detail_rows, total_cents
+
+
+def _bulk_insert(db: Session, model_class, rows: list) -> list:
+    """executemany-style insert that returns the new primary keys in row order"""
+    if not rows:
+        return []
+    if db.get_bind().dialect.insert_executemany_returning:
+        # Keys handed out by one multi-row INSERT ascend in VALUES order, so sorting
+        # them restores row order without the per-row "ordered" insertmanyvalues mode
+        statement = insert(model_class).returning(model_class.id)
+        return sorted(db.execute(statement, rows).scalars().all())
+
+    # MySQL has no INSERT ... RETURNING, so let the ORM collect the keys per row
+    items = [model_class(**row) for row in rows]
+    db.add_all(items)
+    db.flush()
+    return [item.id for item in items]
+
+
+def _guest_order_row(payload: GuestOrderCreate, total_cents: int) -> dict:
+    return {
+        "order_number": next_order_number(),
+        "customer_name": payload.customer_name,
+        "customer_phone": payload.customer_phone,
+        "customer_address": payload.customer_address,
+        "is_delivery": payload.is_delivery,
+        "payment_method": payload.payment_method,
+        "payment_status": "pending",
+        "status": model.OrderStatus.PENDING,
+        "total_cents": total_cents,
+        "order_date": datetime.now()
+    }
+
+
+def _created_event_row(order_row: dict) -> dict:
+    return order_event_row(order_row["order_number"], "created", order_row["status"].value, order_row["payment_status"])
+
+
+def _commit(db: Session, work):
+    """Run `work(session)` and commit it: batched with other requests' writes when group
+    commit is enabled, otherwise on `db` right away"""
+    if group_commit.writer is not None:
+        # Nothing has been written on `db`; hand its pooled connection back before waiting,
+        # so requests queued on the writer cannot starve it of connections
+        db.rollback()
+        return group_commit.writer.submit(work)
     try:
-        db.add(new_order)
+        result = work(db)
         db.commit()
-        db.refresh(new_order)
-        
-        # Create order details
-        from ..models.order_details import OrderDetail
-        order_details = []
-        
-        for item in payload.items:
-            dish = dishes[item.dish_id]
-            line_total_cents = dish.price_cents * item.qty
-            
-            order_detail = OrderDetail(
-                order_id=new_order.id,
-                dish_id=item.dish_id,
-                qty=item.qty,
-                unit_price_cents=dish.price_cents,
-                line_total_cents=line_total_cents
-            )
-            db.add(order_detail)
-            order_details.append(order_detail)
-        
-        db.commit()
-        
-        # Return order with details
-        from ..schemas.order_details import OrderDetail as OrderDetailSchema
-        
-        order_data = {
-                "order_number": new_order.order_number,
-                "id": new_order.id,
-                "status": new_order.status.value,
-                "total_cents": total_cents,
-                "payment_method": new_order.payment_method,
-                "payment_status": new_order.payment_status,
-                "items": [OrderDetailSchema(
-                    id=detail.id,
-                    order_id=detail.order_id,
-                    dish_id=detail.dish_id,
-                    qty=detail.qty,
-                    unit_price_cents=detail.unit_price_cents,
-                    line_total_cents=detail.line_total_cents
-                ) for detail in order_details],
-                "created_at": new_order.order_date,
-                "is_delivery": new_order.is_delivery
-            }
-        return OrderOut.model_validate(order_data)
-        
+    except HTTPException:
+        db.rollback()
+        raise
     except SQLAlchemyError as e:
         db.rollback()
         error = str(e.__dict__['orig'])
         raise HTTPException(status_code=400, detail=error)
+    return result
 
 
-def get_order_by_number(db: Session, order_number: str):
-    order = db.query(model.Order).filter(model.Order.order_number == order_number).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Get order details
-    from ..models.order_details import OrderDetail
-    order_details = db.query(OrderDetail).filter(OrderDetail.order_id == order.id).all()
-    
-    from ..schemas.order_details import OrderDetail as OrderDetailSchema
-    
-    return OrderOut(
-        order_number=order.order_number,
-        id=order.id,
-        status=order.status.value,
-        total_cents=order.total_cents,
-        payment_method=order.payment_method,
-        payment_status=order.payment_status,
-        items=[OrderDetailSchema(
-            id=detail.id,
-            order_id=detail.order_id,
-            dish_id=detail.dish_id,
-            qty=detail.qty,
-            unit_price_cents=detail.unit_price_cents,
-            line_total_cents=detail.line_total_cents
-        ) for detail in order_details],
-        created_at=order.order_date,
-        is_delivery=order.is_delivery
+def _write_guest_order(db: Session, order_row: dict, detail_rows: list) -> OrderOut:
+    """Insert an order and its line items without committing: a single-row insert for
+    the order, then one executemany insert for all of its details"""
+    order_id = db.execute(insert(model.Order.__table__), order_row).inserted_primary_key[0]
+    for row in detail_rows:
+        row["order_id"] = order_id
+    detail_ids = _bulk_insert(db, OrderDetailModel, detail_rows)
+    record_order_events(db, [_created_event_row(order_row)])
+
+    # Everything in the response is already known, so no rows are read back
+    return build_order_out(
+        model.Order(id=order_id, **order_row),
+        [OrderDetailModel(id=detail_id, **row) for detail_id, row in zip(detail_ids, detail_rows)]
     )
 
 
-def update_order_status(db: Session, order_number: str, status_update: OrderStatusUpdate):
-    """Update order status for real-time tracking"""
-    order = db.query(model.Order).filter(model.Order.order_number == order_number).first()
+def create_guest_order(db: Session, payload: GuestOrderCreate) -> OrderOut:
+    lease_worker_id(db)
+    prices = active_dish_prices(db)
+    detail_rows, total_cents = _price_items(payload.items, prices)
+    order_row = _guest_order_row(payload, total_cents)
+    return _commit(db, lambda session: _write_guest_order(session, order_row, detail_rows))
+
+
+def create_guest_orders_batch(db: Session, payload: GuestOrderBatchCreate) -> GuestOrderBatchOut:
+    """Place many guest orders at once, reporting success or failure per order.
+
+    Dishes for the whole batch are priced from the menu catalog, then all valid
+    orders and all of their details are written with two executemany inserts
+    inside a single transaction.
+    """
+    lease_worker_id(db)
+    prices = active_dish_prices(db)
+
+    results = [None] * len(payload.orders)
+    accepted = []
+    for index, order in enumerate(payload.orders):
+        try:
+            detail_rows, total_cents = _price_items(order.items, prices)
+        except HTTPException as e:
+            results[index] = GuestOrderBatchItemResult(
+                index=index, success=False, status_code=e.status_code, error=e.detail
+            )
+            continue
+        accepted.append((index, _guest_order_row(order, total_cents), detail_rows))
+
+    created = 0
+    if accepted:
+        try:
+            order_ids = _bulk_insert(db, model.Order, [order_row for _, order_row, _ in accepted])
+            all_detail_rows = []
+            for order_id, (_, _, detail_rows) in zip(order_ids, accepted):
+                for row in detail_rows:
+                    row["order_id"] = order_id
+                all_detail_rows.extend(detail_rows)
+            detail_ids = iter(_bulk_insert(db, OrderDetailModel, all_detail_rows))
+            record_order_events(db, [_created_event_row(order_row) for _, order_row, _ in accepted])
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            error = str(e.__dict__['orig'])
+            for index, _, _ in accepted:
+                results[index] = GuestOrderBatchItemResult(index=index, success=False, status_code=400, error=error)
+        else:
+            for order_id, (index, order_row, detail_rows) in zip(order_ids, accepted):
+                order = build_order_out(
+                    model.Order(id=order_id, **order_row),
+                    [OrderDetailModel(id=next(detail_ids), **row) for row in detail_rows]
+                )
+                results[index] = GuestOrderBatchItemResult(index=index, success=True, order=order)
+            created = len(accepted)
+
+    return GuestOrderBatchOut(created=created, failed=len(results) - created, results=results)
+
+
+def get_order_by_number(db: Session, order_number: str):
+    order = load_order(db.query(model.Order).filter(model.Order.order_number == order_number))
+    if not order:
+        order = get_archived_order(db, order_number)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Validate status
-    valid_statuses = ["pending", "confirmed", "preparing", "ready", "out_for_delivery", "delivered", "cancelled"]
-    if status_update.status not in valid_statuses:
+    return order
+
+
+def get_order_json(db: Session, order_number: str) -> bytes:
+    """Serialized OrderOut for an order number, served from order_cache when possible"""
+    body = order_cache.get(order_number)
+    if body is None:
+        generation = order_cache.generation
+        body = get_order_by_number(db, order_number).model_dump_json().encode()
+        order_cache.put(order_number, body, generation)
+    return body
+
+
+def invalidate_order_id(db: Session, order_id: int):
+    """Drop the cached order owning `order_id`, e.g. after its line items change"""
+    order_number = db.execute(select(model.Order.order_number).where(model.Order.id == order_id)).scalar()
+    if order_number is not None:
+        order_cache.invalidate(order_number)
+
+
+def _parse_status(value: str) -> model.OrderStatus:
+    try:
+        return model.OrderStatus(value)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid status")
-    
-    order.status = model.OrderStatus(status_update.status)
-    db.commit()
-    db.refresh(order)
-    
+
+
+def _transition_orders(db: Session, order_numbers: list, target: model.OrderStatus,
+                       expected: model.OrderStatus = None) -> dict:
+    """Move orders to `target` with one conditional UPDATE and record their events.
+
+    Only rows whose current status may move to `target` (and equals
+    `expected`, when given) are touched, so two tablets racing on the same
+    ticket cannot overwrite each other: the loser's UPDATE matches nothing.
+    Confirming orders also deducts their ingredients (see inventory.consume_stock)
+    and raises 409 when stock is short. Returns {order_number: payment_status}
+    for the orders that moved; the caller commits.
+    """
+    sources = ALLOWED_SOURCES[target]
+    if expected is not None:
+        sources = [expected] if expected in sources else []
+    if not sources:
+        return {}
+
+    condition = [model.Order.order_number.in_(order_numbers), model.Order.status.in_(sources)]
+    statement = sql_update(model.Order).where(*condition).values(status=target)
+    statement = statement.execution_options(synchronize_session=False)
+    returned = (model.Order.id, model.Order.order_number, model.Order.payment_status)
+    if db.get_bind().dialect.update_returning:
+        rows = db.execute(statement.returning(*returned)).all()
+    else:
+        # No UPDATE ... RETURNING (MySQL): lock the matching rows first so the UPDATE hits exactly them
+        rows = db.execute(select(*returned).where(*condition).with_for_update()).all()
+        if rows:
+            db.execute(statement)
+    if target == model.OrderStatus.CONFIRMED:
+        # Confirming commits the kitchen to the order: take its ingredients out of stock
+        consume_stock(db, [row.id for row in rows])
+    moved = {row.order_number: row.payment_status for row in rows}
+    record_order_events(db, [
+        order_event_row(order_number, "status", target.value, payment_status)
+        for order_number, payment_status in moved.items()
+    ])
+    return moved
+
+
+def _current_statuses(db: Session, order_numbers: list) -> dict:
+    rows = db.execute(
+        select(model.Order.order_number, model.Order.status).where(model.Order.order_number.in_(order_numbers))
+    ).all()
+    return {row.order_number: row.status.value for row in rows}
+
+
+def update_order_status(db: Session, order_number: str, status_update: OrderStatusUpdate):
+    """Update order status for real-time tracking, following ORDER_TRANSITIONS"""
+    target = _parse_status(status_update.status)
+    expected = _parse_status(status_update.expected_status) if status_update.expected_status else None
+
+    moved = _commit(db, lambda session: _transition_orders(session, [order_number], target, expected))
+
+    if not moved:
+        # Nothing matched: one lookup on the failure path tells a missing order from a conflict.
+        # RETURNING (SQLite) only sees the new row, so the UPDATE cannot report the status it lost to
+        current = _current_statuses(db, [order_number]).get(order_number)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Cannot move order from {current} to {target.value}"
+        )
+
+    order_cache.invalidate(order_number)
     return {"message": f"Order status updated to {status_update.status}", "order_number": order_number}
 
 
+def update_order_statuses(db: Session, payload: OrderStatusBatchUpdate) -> OrderStatusBatchOut:
+    """Move many orders to one status at once; each order moves only if its transition is allowed"""
+    target = _parse_status(payload.status)
+    expected = _parse_status(payload.expected_status) if payload.expected_status else None
+    order_numbers = list(dict.fromkeys(payload.order_numbers))
+
+    moved = _commit(db, lambda session: _transition_orders(session, order_numbers, target, expected))
+
+    missed = [order_number for order_number in order_numbers if order_number not in moved]
+    current = _current_statuses(db, missed) if missed else {}
+    if moved:
+        order_cache.invalidate(*moved)
+    return OrderStatusBatchOut(
+        status=target.value,
+        updated=[order_number for order_number in order_numbers if order_number in moved],
+        conflicts=[
+            OrderStatusConflict(order_number=order_number, status=current[order_number])
+            for order_number in missed if order_number in current
+        ],
+        not_found=[order_number for order_number in missed if order_number not in current]
+    )
+
+
 def update_payment_status(db: Session, order_number: str, payment_update: PaymentUpdate):
     """Update payment status and method"""
     order = db.query(model.Order).filter(model.Order.order_number == order_number).first()
@@ -227,51 +433,58 @@ def update_payment_status(db: Session, order_number: str, payment_update: Paymen
     order.payment_status = payment_update.payment_status
     if payment_update.payment_method:
         order.payment_method = payment_update.payment_method
-    
+
+    record_order_events(db, [order_event_row(order_number, "payment", order.status.value, order.payment_status)])
     db.commit()
+    order_cache.invalidate(order_number)
     db.refresh(order)
     
     return {"message": f"Payment status updated to {payment_update.payment_status}", "order_number": order_number}
 
 
-def get_orders_by_status(db: Session, status: str = None, skip: int = 0, limit: int = 100):
-    """Get orders filtered by status for staff dashboard"""
+def get_orders_by_status(db: Session, status: str = None, skip: int = 0, limit: int = 100, cursor: str = None):
+    """Get orders filtered by status for staff dashboard, oldest first"""
     query = db.query(model.Order)
     
     if status:
-        valid_statuses = ["pending", "confirmed", "preparing", "ready", "out_for_delivery", "delivered", "cancelled"]
-        if status not in valid_statuses:
+        if status not in VALID_ORDER_STATUSES:
             raise HTTPException(status_code=400, detail="Invalid status")
         query = query.filter(model.Order.status == model.OrderStatus(status))
     
-    orders = query.offset(skip).limit(limit).all()
-    
-    # Convert to OrderOut format
-    from ..models.order_details import OrderDetail
-    from ..schemas.order_details import OrderDetail as OrderDetailSchema
-    
-    result = []
-    for order in orders:
-        order_details = db.query(OrderDetail).filter(OrderDetail.order_id == order.id).all()
-        
-        order_data = {
-            "order_number": order.order_number,
-            "id": order.id,
-            "status": order.status.value,
-            "total_cents": order.total_cents,
-            "payment_method": order.payment_method,
-            "payment_status": order.payment_status,
-            "items": [OrderDetailSchema(
-                id=detail.id,
-                order_id=detail.order_id,
-                dish_id=detail.dish_id,
-                qty=detail.qty,
-                unit_price_cents=detail.unit_price_cents,
-                line_total_cents=detail.line_total_cents
-            ) for detail in order_details],
-            "created_at": order.order_date,
-            "is_delivery": order.is_delivery
-        }
-        result.append(OrderOut.model_validate(order_data))
-    
-    return result
+    after = decode_cursor(cursor, datetime.fromisoformat, int) if cursor else None
+    if after:
+        skip = 0
+
+    query = keyset(query, [model.Order.order_date, model.Order.id], after)
+    return load_orders(query.offset(skip).limit(limit))
+
+
+def get_status_counts(db: Session) -> dict:
+    """Number of orders in every status, live and archived, in one statement.
+
+    Live orders are counted with a GROUP BY that reads only the status index;
+    the archive is never scanned, its per-status counts are kept by the
+    archive job.
+    """
+    archived = ArchivedStatusCount.__table__
+    rows = db.execute(union_all(
+        select(model.Order.status, func.count()).group_by(model.Order.status),
+        select(archived.c.status, archived.c.orders)
+    )).all()
+    counts = {order_status.value: 0 for order_status in model.OrderStatus}
+    for order_status, count in rows:
+        counts[order_status.value] += count
+    return counts
+
+
+def get_orders_summary(db: Session) -> dict:
+    counts = get_status_counts(db)
+    return {
+        "pending_orders": counts["pending"],
+        "preparing_orders": counts["preparing"],
+        "ready_orders": counts["ready"],
+        "delivered_orders": counts["delivered"],
+        # Pending, preparing and ready, as the dashboard has always reported it
+        "total_active_orders": counts["pending"] + counts["preparing"] + counts["ready"],
+        "orders_by_status": counts
+    }
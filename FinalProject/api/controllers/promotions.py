@@ -1,9 +1,170 @@
+from sqlalchemy import select, update, or_
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from fastapi import HTTPException
+import threading
+from bisect import bisect_right
 from datetime import datetime
+from heapq import heappop, heappush
 from ..models.promotions import Promotion
-from ..schemas.promotions import PromotionCreate, PromotionUpdate, PromotionOut, PromotionApply
+from ..dependencies.pagination import decode_cursor, keyset
+from ..dependencies.cache import VersionedCache, bump_version
+from ..dependencies.config import conf
+from ..dependencies.rate_limit import TokenBucketLimiter
+from .menu import active_dish_prices
+from .orders import _price_items
+from ..schemas.promotions import (
+    PromotionCreate, PromotionUpdate, PromotionOut, PromotionApply, PromotionCart, PromotionQuote, BestPromotionOut
+)
+
+PROMOTIONS_CATALOG = "promotions"
+
+
+class PromotionCatalog:
+    """Active promotions keyed by their upper-case code. Expiry is checked against the cached
+    expires_at at use time, so a code expiring needs no reload."""
+
+    def __init__(self, promotions: list):
+        self.by_code = {promotion.code.upper(): promotion for promotion in promotions}
+        # Rule table for cart evaluation, one group per discount percent (at most 100). Members
+        # are sorted by minimum order amount, so the ones a total qualifies for are a prefix
+        # found by bisection; a sparse table over their caps answers "largest cap in a range",
+        # and the discount within a percent only grows with the cap.
+        # {discount_percent: (thresholds, caps, [(expires_at, code, is limited)], sparse table)}
+        grouped = {}
+        for promotion in sorted(promotions, key=lambda promotion: (promotion.min_order_amount_cents, promotion.code)):
+            grouped.setdefault(promotion.discount_percent, []).append(promotion)
+        self.rules = {}
+        for percent, group in grouped.items():
+            caps = [promotion.max_discount_cents or float("inf") for promotion in group]
+            self.rules[percent] = (
+                [promotion.min_order_amount_cents for promotion in group],
+                caps,
+                [(promotion.expires_at or datetime.max, promotion.code, bool(promotion.usage_limit)) for promotion in group],
+                _max_cap_table(caps),
+            )
+
+    def rank(self, total: int, now: datetime, limit: int, exclude=frozenset()) -> list:
+        """Top `limit` (discount_cents, discount_percent, code, is limited) for an order total, best first.
+
+        Each percent offers its largest-cap qualifying code to a heap; popping a code
+        splits its range in two and offers the best of each half, so a call costs
+        O((percents + limit) log codes) however many distinct caps there are.
+        """
+        heap = []
+
+        def offer(percent, lo, hi):
+            thresholds, caps, members, table = self.rules[percent]
+            index = _max_cap(table, caps, lo, hi)
+            discount = min(total * percent // 100, caps[index])
+            heappush(heap, (-discount, -percent, index, lo, hi))
+
+        for percent, (thresholds, _, _, _) in self.rules.items():
+            end = bisect_right(thresholds, total)
+            if end:
+                offer(percent, 0, end)
+
+        quotes = []
+        while heap and len(quotes) < limit:
+            discount, percent, index, lo, hi = heappop(heap)
+            expires_at, code, limited = self.rules[-percent][2][index]
+            if expires_at > now and code not in exclude:
+                quotes.append((-discount, -percent, code, limited))
+            if lo < index:
+                offer(-percent, lo, index)
+            if index + 1 < hi:
+                offer(-percent, index + 1, hi)
+        return quotes
+
+
+def _max_cap_table(caps: list) -> list:
+    """Sparse table: level k holds, for each start, the index of the largest cap in caps[start:start + 2**k]"""
+    table = [list(range(len(caps)))]
+    span = 1
+    while span * 2 <= len(caps):
+        previous = table[-1]
+        table.append([
+            _larger_cap(caps, previous[start], previous[start + span])
+            for start in range(len(caps) - span * 2 + 1)
+        ])
+        span *= 2
+    return table
+
+
+def _max_cap(table: list, caps: list, lo: int, hi: int) -> int:
+    """Index of the largest cap in caps[lo:hi], the earliest on ties"""
+    level = (hi - lo).bit_length() - 1
+    return _larger_cap(caps, table[level][lo], table[level][hi - (1 << level)])
+
+
+def _larger_cap(caps: list, a: int, b: int) -> int:
+    if caps[a] == caps[b]:
+        return min(a, b)
+    return a if caps[a] > caps[b] else b
+
+
+def _load_promotions(db: Session) -> PromotionCatalog:
+    now = datetime.now()
+    promotions = db.query(Promotion).filter(
+        Promotion.is_active == True,
+        (Promotion.expires_at == None) | (Promotion.expires_at > now)
+    ).all()
+    return PromotionCatalog([PromotionOut.model_validate(promotion.__dict__) for promotion in promotions])
+
+
+promotion_catalog = VersionedCache(PROMOTIONS_CATALOG, _load_promotions, conf.promotion_version_check_seconds)
+
+
+class PromotionProbeStats:
+    """Outcome counters for code validations, to tell code enumeration apart from real checkouts"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.valid = 0
+        self.unknown = 0  # answered from the promotion index alone
+        self.spent = 0  # a known code that has expired or used up its limit
+
+    def record(self, outcome: str):
+        with self.lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"valid": self.valid, "unknown": self.unknown, "spent": self.spent}
+
+
+probe_stats = PromotionProbeStats()
+validate_limiter = TokenBucketLimiter(conf.promotion_validate_rate, conf.promotion_validate_burst)
+
+
+def _commit_promotion_change(db: Session):
+    """Commit a promotion write with a version bump, then drop this worker's promotion index"""
+    bump_version(db, PROMOTIONS_CATALOG)
+    db.commit()
+    promotion_catalog.invalidate()
+
+
+def sweep_promotions(db: Session) -> int:
+    """Deactivate every active promotion that has expired or used up its usage limit, with one UPDATE.
+
+    Returns how many were deactivated; only a sweep that changed something
+    bumps the promotion catalog.
+    """
+    now = datetime.now()
+    result = db.execute(
+        update(Promotion)
+        .where(
+            Promotion.is_active == True,
+            or_(Promotion.expires_at < now, Promotion.times_used >= Promotion.usage_limit)
+        )
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        _commit_promotion_change(db)
+    else:
+        db.rollback()
+    return result.rowcount
 
 
 def create_promotion(db: Session, promotion: PromotionCreate) -> PromotionOut:
@@ -19,7 +180,7 @@ def create_promotion(db: Session, promotion: PromotionCreate) -> PromotionOut:
     
     try:
         db.add(db_promotion)
-        db.commit()
+        _commit_promotion_change(db)
         db.refresh(db_promotion)
         return PromotionOut.model_validate(db_promotion.__dict__)
     except IntegrityError:
@@ -27,11 +188,19 @@ def create_promotion(db: Session, promotion: PromotionCreate) -> PromotionOut:
         raise HTTPException(status_code=400, detail="Promotion code already exists")
 
 
-def get_promotions(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True):
+def get_promotions(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True, cursor: str = None):
     query = db.query(Promotion)
     if active_only:
         query = query.filter(Promotion.is_active == True)
-    return query.offset(skip).limit(limit).all()
+    after = decode_cursor(cursor, int) if cursor else None
+    if after:
+        skip = 0
+    return keyset(query, [Promotion.id], after).offset(skip).limit(limit).all()
+
+
+def usage_tag(promotions: list) -> str:
+    """The part of PromotionOut that redemptions change without a catalog bump, for ETags"""
+    return ",".join(f"{promotion.id}:{promotion.times_used}" for promotion in promotions)
 
 
 def get_promotion(db: Session, promotion_id: int) -> Promotion:
@@ -59,7 +228,7 @@ def update_promotion(db: Session, promotion_id: int, promotion: PromotionUpdate)
     if promotion.usage_limit is not None:
         db_promotion.usage_limit = promotion.usage_limit
     
-    db.commit()
+    _commit_promotion_change(db)
     db.refresh(db_promotion)
     return PromotionOut.model_validate(db_promotion.__dict__)
 
@@ -67,16 +236,26 @@ def update_promotion(db: Session, promotion_id: int, promotion: PromotionUpdate)
 def delete_promotion(db: Session, promotion_id: int):
     db_promotion = get_promotion(db, promotion_id)
     db_promotion.is_active = False
-    db.commit()
+    _commit_promotion_change(db)
     return {"message": "Promotion deactivated"}
 
 
-def apply_promotion(db: Session, promo_apply: PromotionApply) -> dict:
-    """Apply promotion code to order and calculate discount"""
-    promotion = db.query(Promotion).filter(
-        Promotion.code == promo_apply.code.upper(),
-        Promotion.is_active == True
-    ).first()
+def resolve_promotion(db: Session, code: str):
+    """The active promotion for a code, any case, from the promotion catalog; None if unknown"""
+    return promotion_catalog.get(db).by_code.get(code.upper())
+
+
+def _usage_limit_reached(db: Session, promotion: PromotionOut) -> bool:
+    if not promotion.usage_limit:
+        return False
+    # Redemptions move times_used without a catalog bump, so limited codes read it live
+    times_used = db.execute(select(Promotion.times_used).where(Promotion.id == promotion.id)).scalar()
+    return times_used is None or times_used >= promotion.usage_limit
+
+
+def _eligible_promotion(db: Session, promo_apply: PromotionApply) -> PromotionOut:
+    """The promotion for a code if it can be used on an order of this total, else the reason as an HTTP error"""
+    promotion = resolve_promotion(db, promo_apply.code)
     
     if not promotion:
         raise HTTPException(status_code=404, detail="Promotion code not found")
@@ -86,7 +265,7 @@ def apply_promotion(db: Session, promo_apply: PromotionApply) -> dict:
         raise HTTPException(status_code=400, detail="Promotion code has expired")
     
     # Check usage limit
-    if promotion.usage_limit and promotion.times_used >= promotion.usage_limit:
+    if _usage_limit_reached(db, promotion):
         raise HTTPException(status_code=400, detail="Promotion code usage limit reached")
     
     # Check minimum order amount
@@ -95,42 +274,121 @@ def apply_promotion(db: Session, promo_apply: PromotionApply) -> dict:
             status_code=400, 
             detail=f"Minimum order amount not met. Required: ${promotion.min_order_amount_cents/100:.2f}"
         )
-    
+    return promotion
+
+
+def _discount(promotion: PromotionOut, order_total_cents: int) -> dict:
     # Calculate discount
-    discount_amount = (promo_apply.order_total_cents * promotion.discount_percent) // 100
+    discount_amount = (order_total_cents * promotion.discount_percent) // 100
     
     # Apply maximum discount limit if set
     if promotion.max_discount_cents:
         discount_amount = min(discount_amount, promotion.max_discount_cents)
     
-    final_total = promo_apply.order_total_cents - discount_amount
+    final_total = order_total_cents - discount_amount
     
     return {
         "promotion_code": promotion.code,
         "discount_percent": promotion.discount_percent,
         "discount_amount_cents": discount_amount,
-        "original_total_cents": promo_apply.order_total_cents,
+        "original_total_cents": order_total_cents,
         "final_total_cents": final_total,
         "savings_cents": discount_amount
     }
 
 
+def apply_promotion(db: Session, promo_apply: PromotionApply) -> dict:
+    """Apply promotion code to order and calculate discount"""
+    promotion = _eligible_promotion(db, promo_apply)
+    return _discount(promotion, promo_apply.order_total_cents)
+
+
+def redeem_promotion(db: Session, promo_apply: PromotionApply) -> dict:
+    """Apply a promotion and use it up once.
+
+    The use is reserved by a single conditional UPDATE that only increments
+    times_used while the code is active, unexpired and under its limit, so
+    concurrent redemptions of a limited code can never exceed usage_limit.
+    """
+    promotion = _eligible_promotion(db, promo_apply)
+    now = datetime.now()
+    try:
+        result = db.execute(
+            update(Promotion.__table__)
+            .where(
+                Promotion.id == promotion.id,
+                Promotion.is_active == True,
+                or_(Promotion.usage_limit == None, Promotion.times_used < Promotion.usage_limit),
+                or_(Promotion.expires_at == None, Promotion.expires_at >= now)
+            )
+            .values(times_used=Promotion.times_used + 1)
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            if promotion.usage_limit:
+                raise HTTPException(status_code=400, detail="Promotion code usage limit reached")
+            raise HTTPException(status_code=400, detail="Promotion code is no longer active")
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        error = str(e.__dict__.get('orig', e))
+        raise HTTPException(status_code=400, detail=error)
+    return _discount(promotion, promo_apply.order_total_cents)
+
+
+def best_promotions(db: Session, cart: PromotionCart) -> BestPromotionOut:
+    """Every promotion the cart qualifies for, evaluated in memory, ranked by discount.
+
+    Only limited codes that make the ranking have their usage read live, in one
+    query per pass; a pass that finds some used up ranks again without them.
+    """
+    total = cart.order_total_cents
+    if total is None:
+        _, total = _price_items(cart.items, active_dish_prices(db))
+
+    catalog = promotion_catalog.get(db)
+    now = datetime.now()
+    checked, used_up = set(), set()
+    while True:
+        quotes = catalog.rank(total, now, cart.limit, used_up)
+        unchecked = [code for _, _, code, limited in quotes if limited and code not in checked]
+        if not unchecked:
+            break
+        checked.update(unchecked)
+        used_up.update(db.execute(
+            select(Promotion.code).where(Promotion.code.in_(unchecked), Promotion.times_used >= Promotion.usage_limit)
+        ).scalars())
+
+    ranked = [
+        PromotionQuote(code=code, discount_percent=percent, discount_amount_cents=discount,
+                       final_total_cents=total - discount)
+        for discount, percent, code, _ in quotes
+    ]
+    return BestPromotionOut(order_total_cents=total, best=ranked[0] if ranked else None, ranked=ranked)
+
+
 def validate_promotion_code(db: Session, code: str) -> bool:
-    """Validate if promotion code is valid and can be used"""
-    promotion = db.query(Promotion).filter(
-        Promotion.code == code.upper(),
-        Promotion.is_active == True
-    ).first()
+    """Validate if promotion code is valid and can be used.
+
+    Unknown codes, which is what enumeration mostly sends, are answered from
+    the set of active codes in the promotion index without touching the
+    promotions table.
+    """
+    promotion = resolve_promotion(db, code)
     
     if not promotion:
+        probe_stats.record("unknown")
         return False
     
     # Check if expired
     if promotion.expires_at and promotion.expires_at < datetime.now():
+        probe_stats.record("spent")
         return False
     
     # Check usage limit
-    if promotion.usage_limit and promotion.times_used >= promotion.usage_limit:
+    if _usage_limit_reached(db, promotion):
+        probe_stats.record("spent")
         return False
     
+    probe_stats.record("valid")
     return True
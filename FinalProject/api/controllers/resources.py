@@ -2,8 +2,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from ..models.resources import Resource
+from ..dependencies.pagination import decode_cursor, keyset
+from ..dependencies.cache import bump_version
 from ..schemas.resources import ResourceCreate, ResourceUpdate, ResourceOut
 
+RESOURCES_CATALOG = "resources"
+
 
 def create_resource(db: Session, resource: ResourceCreate) -> ResourceOut:
     db_resource = Resource(
@@ -15,6 +19,7 @@ def create_resource(db: Session, resource: ResourceCreate) -> ResourceOut:
     )
     try:
         db.add(db_resource)
+        bump_version(db, RESOURCES_CATALOG)
         db.commit()
         db.refresh(db_resource)
         return ResourceOut.model_validate(db_resource.__dict__)
@@ -23,8 +28,12 @@ def create_resource(db: Session, resource: ResourceCreate) -> ResourceOut:
         raise HTTPException(status_code=400, detail="Resource name already exists")
 
 
-def get_resources(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Resource).filter(Resource.is_active == True).offset(skip).limit(limit).all()
+def get_resources(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    query = db.query(Resource).filter(Resource.is_active == True)
+    after = decode_cursor(cursor, int) if cursor else None
+    if after:
+        skip = 0
+    return keyset(query, [Resource.id], after).offset(skip).limit(limit).all()
 
 
 def get_resource(db: Session, resource_id: int) -> Resource:
@@ -49,6 +58,7 @@ def update_resource(db: Session, resource_id: int, resource: ResourceUpdate) ->
         db_resource.is_active = resource.is_active
     
     try:
+        bump_version(db, RESOURCES_CATALOG)
         db.commit()
         db.refresh(db_resource)
         return ResourceOut.model_validate(db_resource.__dict__)
@@ -60,6 +70,7 @@ def update_resource(db: Session, resource_id: int, resource: ResourceUpdate) ->
 def delete_resource(db: Session, resource_id: int):
     db_resource = get_resource(db, resource_id)
     db_resource.is_active = False
+    bump_version(db, RESOURCES_CATALOG)
     db.commit()
     return {"message": "Resource deleted"}
 
@@ -72,6 +83,7 @@ def update_resource_amount(db: Session, resource_id: int, amount_change: int):
     if db_resource.amount < 0:
         raise HTTPException(status_code=400, detail="Insufficient inventory")
     
+    bump_version(db, RESOURCES_CATALOG)
     db.commit()
     db.refresh(db_resource)
     return ResourceOut.model_validate(db_resource.__dict__)
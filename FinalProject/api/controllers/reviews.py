@@ -4,8 +4,12 @@ from fastapi import HTTPException
 from datetime import datetime
 from ..models.reviews import Review
 from ..models.orders import Order
+from ..dependencies.pagination import decode_cursor, keyset
+from ..dependencies.cache import bump_version
 from ..schemas.reviews import ReviewCreate, ReviewUpdate, ReviewOut, ReviewStats
 
+REVIEWS_CATALOG = "reviews"
+
 
 def create_review(db: Session, review: ReviewCreate) -> ReviewOut:
     # Verify order exists
@@ -27,6 +31,7 @@ def create_review(db: Session, review: ReviewCreate) -> ReviewOut:
     
     try:
         db.add(db_review)
+        bump_version(db, REVIEWS_CATALOG)
         db.commit()
         db.refresh(db_review)
         return ReviewOut.model_validate(db_review.__dict__)
@@ -35,11 +40,14 @@ def create_review(db: Session, review: ReviewCreate) -> ReviewOut:
         raise HTTPException(status_code=400, detail="Review creation failed")
 
 
-def get_reviews(db: Session, skip: int = 0, limit: int = 100, approved_only: bool = True):
+def get_reviews(db: Session, skip: int = 0, limit: int = 100, approved_only: bool = True, cursor: str = None):
     query = db.query(Review)
     if approved_only:
         query = query.filter(Review.is_approved == True)
-    return query.offset(skip).limit(limit).all()
+    after = decode_cursor(cursor, int) if cursor else None
+    if after:
+        skip = 0
+    return keyset(query, [Review.id], after).offset(skip).limit(limit).all()
 
 
 def get_review(db: Session, review_id: int) -> Review:
@@ -55,6 +63,7 @@ def update_review(db: Session, review_id: int, review: ReviewUpdate) -> ReviewOu
     if review.is_approved is not None:
         db_review.is_approved = review.is_approved
     
+    bump_version(db, REVIEWS_CATALOG)
     db.commit()
     db.refresh(db_review)
     return ReviewOut.model_validate(db_review.__dict__)
@@ -63,6 +72,7 @@ def update_review(db: Session, review_id: int, review: ReviewUpdate) -> ReviewOu
 def delete_review(db: Session, review_id: int):
     db_review = get_review(db, review_id)
     db.delete(db_review)
+    bump_version(db, REVIEWS_CATALOG)
     db.commit()
     return {"message": "Review deleted"}
 
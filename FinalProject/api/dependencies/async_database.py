@@ -0,0 +1,37 @@
+from .config import conf
+from .database import USE_MYSQL, use_sqlite_wal
+from urllib.parse import quote_plus
+import os
+
+# Async mode serves the orders, menu and analytics reads through an AsyncEngine.
+# Set USE_ASYNC_DB environment variable to "true" to enable it; the driver
+# (aiosqlite, or asyncmy with USE_MYSQL) is only imported when it is on.
+USE_ASYNC_DB = os.getenv("USE_ASYNC_DB", "false").lower() == "true"
+
+if USE_MYSQL:
+    ASYNC_DATABASE_URL = f"mysql+asyncmy://{conf.db_user}:{quote_plus(conf.db_password)}@{conf.db_host}:{conf.db_port}/{conf.db_name}?charset=utf8mb4"
+else:
+    ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./restaurant_app.db"
+
+async_engine = None
+AsyncSessionLocal = None
+
+
+def create_async_session_factory(url: str = ASYNC_DATABASE_URL):
+    """Build an AsyncEngine and its session factory for `url`"""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    engine = create_async_engine(url)
+    if url.startswith("sqlite") and conf.sqlite_wal:
+        use_sqlite_wal(engine.sync_engine)
+
+    return engine, async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+if USE_ASYNC_DB:
+    async_engine, AsyncSessionLocal = create_async_session_factory()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
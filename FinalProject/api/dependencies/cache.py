@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, insert, update
+from ..models.catalog_versions import CatalogVersion
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with an optional TTL and hit/miss/eviction counters.
+
+    Readers that load a value after a miss pass the `generation` they saw
+    before loading to `put`; if any key was invalidated in the meantime the
+    value may predate that write and is not stored.
+    """
+
+    def __init__(self, max_entries: int, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (value, expires_at or None)
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, generation: Optional[int] = None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        with self.lock:
+            self.generation += 1
+            for key in keys:
+                if self.entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# VersionedCache instances by catalog name, so version reads made elsewhere can refresh them
+versioned_caches = {}
+
+
+def read_version(db, name: str) -> int:
+    return db.execute(select(CatalogVersion.version).where(CatalogVersion.name == name)).scalar() or 0
+
+
+def read_versions(db, names) -> dict:
+    """{name: (version, updated_at)} for the given catalogs; ones never bumped are (0, None)"""
+    rows = db.execute(
+        select(CatalogVersion.name, CatalogVersion.version, CatalogVersion.updated_at)
+        .where(CatalogVersion.name.in_(names))
+    ).all()
+    versions = {name: (0, None) for name in names}
+    versions.update({row.name: (row.version, row.updated_at) for row in rows})
+    return versions
+
+
+def bump_version(db, name: str):
+    """Advance a catalog's version inside the caller's transaction; commit it together with the write"""
+    table = CatalogVersion.__table__
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    result = db.execute(
+        update(table).where(table.c.name == name).values(version=table.c.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(table).values(name=name, version=1, updated_at=now))
+
+
+class VersionedCache:
+    """One in-process value (a whole catalog) reloaded whenever its catalog_versions row moves.
+
+    `get` reads the version row, a primary-key lookup, at most once every
+    `check_interval` seconds and calls `loader(db)` only when the version
+    differs from the one the cached value was loaded at. Writers call
+    `bump_version` before committing and `invalidate` after, so their own
+    worker sees the change immediately and every other worker on its next check.
+    """
+
+    def __init__(self, name: str, loader, check_interval: float = 0):
+        self.name = name
+        self.loader = loader
+        self.check_interval = check_interval
+        self.value = None
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.reloads = 0
+        self.invalidations = 0
+        versioned_caches[name] = self
+
+    def get(self, db):
+        now = time.monotonic()
+        with self.lock:
+            if self.value is not None and now - self.checked_at < self.check_interval:
+                self.hits += 1
+                return self.value
+        version = read_version(db, self.name)
+        with self.lock:
+            if self.value is not None and version == self.version:
+                self.checked_at = now
+                self.hits += 1
+                return self.value
+        # Loaded after the version was read, so the value is at least as new as `version`
+        value = self.loader(db)
+        with self.lock:
+            self.value, self.version, self.checked_at = value, version, now
+            self.reloads += 1
+        return value
+
+    async def aget(self, db):
+        """`get` for an AsyncSession"""
+        return await db.run_sync(self.get)
+
+    def observe(self, version: int):
+        """Take a version read by someone else as this cache's check: keep the value if it is
+        current, otherwise drop it so the next `get` reloads"""
+        with self.lock:
+            if self.value is None:
+                return
+            if version == self.version:
+                self.checked_at = time.monotonic()
+            else:
+                self.value = None
+                self.invalidations += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.value = None
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "version": self.version,
+                "loaded": self.value is not None,
+                "hits": self.hits,
+                "reloads": self.reloads,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,93 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from .cache import read_versions, versioned_caches
+from .database import get_db
+from .async_database import get_async_db
+
+CACHE_CONTROL = "no-cache"  # clients may keep responses but must revalidate them with us
+
+
+def etag_matches(etag: str, if_none_match: str = None) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def _not_modified_since(last_modified: datetime, if_modified_since: str = None) -> bool:
+    if last_modified is None or not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _read(db: Session, names: tuple) -> dict:
+    versions = read_versions(db, names)
+    for name, (version, _) in versions.items():
+        cache = versioned_caches.get(name)
+        if cache is not None:
+            cache.observe(version)
+    return versions
+
+
+def _validate(versions: dict, request: Request, response: Response, rows_tag: str = None):
+    tag_source = ",".join(f"{name}:{version}:{updated_at}" for name, (version, updated_at) in sorted(versions.items()))
+    if rows_tag is not None:
+        tag_source += f"|{rows_tag}"
+    headers = {"ETag": f'"{hashlib.sha256(tag_source.encode()).hexdigest()[:32]}"', "Cache-Control": CACHE_CONTROL}
+    # Row state outside the catalog versions has no timestamp, so such responses get no Last-Modified
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at is not None and rows_tag is None]
+    last_modified = max(stamps).replace(tzinfo=timezone.utc) if stamps else None
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    # If-Modified-Since only counts when the client sent no If-None-Match (RFC 9110 13.1.3)
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(headers["ETag"], if_none_match) or \
+            (not if_none_match and _not_modified_since(last_modified, request.headers.get("if-modified-since"))):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def _check(db: Session, names: tuple, request: Request, response: Response):
+    _validate(_read(db, names), request, response)
+
+
+def conditional_get(*names):
+    """Dependency for GET endpoints whose responses only change when the named catalogs'
+    versions are bumped. Sets ETag, Last-Modified and Cache-Control, and answers a
+    matching If-None-Match / If-Modified-Since with a 304 after reading only the
+    catalog_versions rows, before the endpoint loads anything.
+    """
+    def dependency(request: Request, response: Response, db: Session = Depends(get_db)):
+        _check(db, names, request, response)
+    return Depends(dependency)
+
+
+def async_conditional_get(*names):
+    """conditional_get for endpoints on the async engine"""
+    async def dependency(request: Request, response: Response, db=Depends(get_async_db)):
+        await db.run_sync(lambda session: _check(session, names, request, response))
+    return Depends(dependency)
+
+
+def conditional_rows(*names):
+    """conditional_get for responses that also carry row state no catalog version tracks
+    (e.g. counters updated on a hot path without a bump).
+
+    The versions are read before the endpoint loads anything; the endpoint
+    then calls the injected `revalidate(rows_tag)` with a string summarising
+    the volatile fields of the rows it loaded, which is folded into the ETag.
+    """
+    def dependency(request: Request, response: Response, db: Session = Depends(get_db)):
+        versions = _read(db, names)
+        return lambda rows_tag: _validate(versions, request, response, rows_tag)
+    return Depends(dependency)
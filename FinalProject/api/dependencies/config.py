@@ -5,4 +5,35 @@ class conf:
     db_user = "root"
     db_password = "rootroot"
     app_host = "localhost"
-    app_port = 8000
\ No newline at end of file
+    app_port = 8000
+    sqlite_wal = True  # WAL journal + synchronous=NORMAL for the SQLite database
+    max_guest_order_batch = 1000
+    order_stream_poll_interval = 0.5  # seconds between order_events polls while clients are subscribed
+    order_stream_keepalive = 15  # seconds of silence before a keep-alive comment is sent
+    order_stream_queue_size = 100  # buffered events per subscriber before events are dropped
+    order_stream_reread_ids = 200  # ids behind the newest one seen that each poll reads again, for late commits
+    order_event_retention_seconds = 3600
+    order_event_prune_interval_seconds = 300  # how often each worker deletes events past retention; 0 turns it off
+    idempotency_store = "memory"  # "memory" (per process) or "database" (idempotency_keys table, shared by workers)
+    idempotency_ttl_seconds = 86400
+    idempotency_max_entries = 10000  # per-process bound for the memory store
+    order_number_scheme = "time"  # "time" (sortable, per-worker unique) or "random" (legacy uuid4 prefix)
+    order_number_worker_id = None  # 0-1023, unique per worker; ORDER_NUMBER_WORKER_ID overrides, default is a leased id
+    order_number_lease_seconds = 600  # how long a worker id lease lasts without renewal (renewed at half of it)
+    order_cache_size = 10000  # serialized orders kept per process for GET /orders/number/{order_number}
+    order_cache_ttl_seconds = 30  # bounds how long another worker's write can go unseen
+    max_status_batch = 500  # order numbers per bulk status transition
+    archive_after_days = 30  # delivered/cancelled orders older than this move to the archive tables
+    archive_batch_size = 1000  # orders moved per archive transaction
+    recipe_version_check_seconds = 0  # how long a worker trusts its bill of materials before re-reading the version row
+    group_commit = False  # USE_GROUP_COMMIT=true: one writer thread commits order writes in batches
+    group_commit_window_ms = 5  # how long the writer keeps collecting after the first queued write
+    group_commit_max_batch = 64  # writes per group commit
+    menu_version_check_seconds = 0  # how long a worker trusts its menu catalog before re-reading the version row
+    menu_import_chunk_size = 500  # import rows upserted per pair of bulk statements
+    menu_import_max_errors = 100  # row errors listed in an import report (all are counted)
+    promotion_version_check_seconds = 1  # how long a worker trusts its promotion index before re-reading the version row
+    promotion_sweep_interval_seconds = 300  # how often each worker deactivates expired/used-up codes; 0 turns it off
+    promotion_validate_rate = 1.0  # GET /promotions/validate requests per second per client, on average
+    promotion_validate_burst = 20  # requests a client can make at once before the rate applies
+    rate_limit_max_clients = 10000  # clients tracked per limiter per process; the least recent are forgotten
@@ -1,9 +1,24 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import conf
 from urllib.parse import quote_plus
 import os
 
+
+def use_sqlite_wal(engine):
+    """Open every SQLite connection of `engine` in WAL mode.
+
+    WAL lets readers run alongside the single writer and, with synchronous=NORMAL,
+    only fsyncs at checkpoints instead of on every commit.
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
 # Use SQLite for development/testing, MySQL for production
 # Set USE_MYSQL environment variable to "true" to use MySQL
 USE_MYSQL = os.getenv("USE_MYSQL", "false").lower() == "true"
@@ -19,6 +34,9 @@ else:
         SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
     )
 
+    if conf.sqlite_wal:
+        use_sqlite_wal(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -0,0 +1,176 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from .config import conf
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+USE_GROUP_COMMIT = os.getenv("USE_GROUP_COMMIT", str(conf.group_commit)).lower() == "true"
+
+_STOP = object()
+
+
+def as_http_error(error: Exception) -> Exception:
+    """Database errors reach the client as 400s, like the controllers' own commits"""
+    if isinstance(error, SQLAlchemyError):
+        return HTTPException(status_code=400, detail=str(error.__dict__.get('orig', error)))
+    return error
+
+
+class GroupCommitMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.operations = 0
+        self.max_batch_size = 0
+        self.batch_sizes = {}  # power-of-two bucket upper bound -> batches
+        self.commit_seconds = 0.0
+        self.max_commit_seconds = 0.0
+        self.fallbacks = 0
+
+    def record(self, size: int, seconds: float):
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+        with self.lock:
+            self.batches += 1
+            self.operations += size
+            self.max_batch_size = max(self.max_batch_size, size)
+            self.batch_sizes[bucket] = self.batch_sizes.get(bucket, 0) + 1
+            self.commit_seconds += seconds
+            self.max_commit_seconds = max(self.max_commit_seconds, seconds)
+
+    def snapshot(self, queue_depth: int) -> dict:
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "operations": self.operations,
+                "average_batch_size": round(self.operations / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "batch_size_histogram": {f"<={bucket}": count for bucket, count in sorted(self.batch_sizes.items())},
+                "average_commit_ms": round(self.commit_seconds / self.batches * 1000, 3) if self.batches else 0.0,
+                "max_commit_ms": round(self.max_commit_seconds * 1000, 3),
+                "fallbacks": self.fallbacks,
+                "queue_depth": queue_depth
+            }
+
+
+class GroupCommitWriter:
+    """One writer thread that commits the writes of many requests together.
+
+    Callers hand over `work(db)`, a function that writes through the given
+    session without committing. The writer takes the first queued job, keeps
+    collecting for up to `window_ms` or `max_batch` jobs, runs them all in one
+    transaction and commits once, then resolves every caller's future.
+
+    If any job in a batch raises, the batch is rolled back and its jobs are
+    replayed one transaction each, so a bad request only fails itself.
+    """
+
+    def __init__(self, session_factory=SessionLocal, window_ms: float = None, max_batch: int = None):
+        self.session_factory = session_factory
+        self.window = (window_ms if window_ms is not None else conf.group_commit_window_ms) / 1000
+        self.max_batch = max_batch or conf.group_commit_max_batch
+        self.queue = queue.Queue()
+        self.metrics = GroupCommitMetrics()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.queue.put(_STOP)
+            thread.join()
+
+    def submit(self, work, timeout: float = None):
+        """Queue `work` and block until its batch has committed; returns what `work` returned"""
+        self.ensure_running()
+        future = Future()
+        self.queue.put((work, future))
+        return future.result(timeout)
+
+    def stats(self) -> dict:
+        return self.metrics.snapshot(self.queue.qsize())
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            batch, stopping = self._collect(item)
+            try:
+                self._commit_batch(batch)
+            except Exception as e:  # never let the writer thread die with callers waiting
+                logger.exception("Group commit failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit_batch(self, batch):
+        start = time.perf_counter()
+        with self.session_factory() as db:
+            try:
+                results = [work(db) for work, _ in batch]
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                if len(batch) == 1:
+                    batch[0][1].set_exception(as_http_error(e))
+                    return
+                failure = e
+            else:
+                failure = None
+        if failure is None:
+            self.metrics.record(len(batch), time.perf_counter() - start)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+            return
+
+        with self.metrics.lock:
+            self.metrics.fallbacks += 1
+        for work, future in batch:
+            self._commit_alone(work, future)
+
+    def _commit_alone(self, work, future):
+        start = time.perf_counter()
+        with self.session_factory() as db:
+            try:
+                result = work(db)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                future.set_exception(as_http_error(e))
+                return
+        self.metrics.record(1, time.perf_counter() - start)
+        future.set_result(result)
+
+
+writer = GroupCommitWriter() if USE_GROUP_COMMIT else None
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from .config import conf
+from .database import SessionLocal
+from ..models.idempotency_keys import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse:
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.body = body
+
+
+def _resolve(request_hash: str, stored_hash: str, stored: Optional[StoredResponse]) -> StoredResponse:
+    """Decide what a request whose key is already taken gets back"""
+    if stored_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    if stored is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    return stored
+
+
+class MemoryIdempotencyStore:
+    """Per-process LRU of first responses, each kept for at most `ttl` seconds"""
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries if max_entries is not None else conf.idempotency_max_entries
+        self.ttl = ttl if ttl is not None else conf.idempotency_ttl_seconds
+        self.entries = OrderedDict()  # key -> (request_hash, StoredResponse or None while running, expires_at)
+        self.lock = threading.Lock()
+
+    def begin(self, key: str, request_hash: str) -> Optional[StoredResponse]:
+        """Reserve `key` and return None, or return the response stored for it"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[2] <= now:
+                self.entries[key] = (request_hash, None, now + self.ttl)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                return None
+            self.entries.move_to_end(key)
+        return _resolve(request_hash, entry[0], entry[1])
+
+    def complete(self, key: str, request_hash: str, response: StoredResponse):
+        with self.lock:
+            self.entries[key] = (request_hash, response, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+
+    def release(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class DatabaseIdempotencyStore:
+    """First responses kept in the idempotency_keys table, so every worker sees every key.
+
+    The primary key on the table arbitrates concurrent first requests: only
+    one INSERT of a key can succeed. Expired rows are ignored on read and
+    deleted in batches every `prune_every` completed requests.
+    """
+
+    def __init__(self, session_factory=SessionLocal, ttl: float = None, prune_every: int = 100):
+        self.session_factory = session_factory
+        self.ttl = ttl if ttl is not None else conf.idempotency_ttl_seconds
+        self.prune_every = prune_every
+        self._completed = 0
+
+    def _cutoff(self) -> datetime:
+        return datetime.now() - timedelta(seconds=self.ttl)
+
+    def begin(self, key: str, request_hash: str) -> Optional[StoredResponse]:
+        table = IdempotencyKey.__table__
+        with self.session_factory() as db:
+            # Clear an expired entry so the key can be reserved again
+            db.execute(delete(table).where(table.c.key == key, table.c.created_at < self._cutoff()))
+            try:
+                db.execute(insert(table).values(key=key, request_hash=request_hash, created_at=datetime.now()))
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+            row = db.execute(
+                select(table.c.request_hash, table.c.status_code, table.c.response_body).where(table.c.key == key)
+            ).first()
+        if row is None:
+            # Released between our INSERT and SELECT; the other request failed, so let the client retry
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        stored = StoredResponse(row.status_code, row.response_body) if row.status_code is not None else None
+        return _resolve(request_hash, row.request_hash, stored)
+
+    def complete(self, key: str, request_hash: str, response: StoredResponse):
+        table = IdempotencyKey.__table__
+        with self.session_factory() as db:
+            db.execute(update(table).where(table.c.key == key).values(
+                status_code=response.status_code, response_body=response.body
+            ))
+            db.commit()
+        self._completed += 1
+        if self._completed % self.prune_every == 0:
+            self.prune()
+
+    def release(self, key: str):
+        table = IdempotencyKey.__table__
+        with self.session_factory() as db:
+            db.execute(delete(table).where(table.c.key == key, table.c.status_code.is_(None)))
+            db.commit()
+
+    def prune(self) -> int:
+        table = IdempotencyKey.__table__
+        with self.session_factory() as db:
+            deleted = db.execute(delete(table).where(table.c.created_at < self._cutoff())).rowcount
+            db.commit()
+        return deleted
+
+
+def build_store(kind: str):
+    if kind == "database":
+        return DatabaseIdempotencyStore()
+    if kind == "memory":
+        return MemoryIdempotencyStore()
+    raise ValueError(f"Unknown idempotency store: {kind}")
+
+
+store = build_store(conf.idempotency_store)
+
+
+def idempotency_key(
+    idempotency_key: Optional[str] = Header(None, description="Replay the first response when a request is retried")
+) -> Optional[str]:
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+    return idempotency_key
+
+
+def _prepare(key: str, scope: str, payload):
+    store_key = f"{scope} {key}"
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return store_key, hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _encode(result, response_model) -> StoredResponse:
+    if response_model is not None:
+        result = response_model.model_validate(result, from_attributes=True)
+    return StoredResponse(200, json.dumps(jsonable_encoder(result)))
+
+
+def _response(stored: StoredResponse, replayed: bool) -> Response:
+    response = Response(content=stored.body, status_code=stored.status_code, media_type="application/json")
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def run(key: Optional[str], scope: str, payload, call, response_model=None):
+    """Run `call` once per (scope, key); retries get the stored first response back.
+
+    Only successful responses are stored. When `call` raises, the key is
+    released so the client can fix the request and retry with the same key.
+    """
+    if key is None:
+        return call()
+    store_key, request_hash = _prepare(key, scope, payload)
+    stored = store.begin(store_key, request_hash)
+    if stored is not None:
+        return _response(stored, replayed=True)
+    try:
+        stored = _encode(call(), response_model)
+    except BaseException:
+        store.release(store_key)
+        raise
+    store.complete(store_key, request_hash, stored)
+    return _response(stored, replayed=False)
+
+
+async def arun(key: Optional[str], scope: str, payload, call, response_model=None):
+    """`run` for async endpoints; `call` returns an awaitable"""
+    if key is None:
+        return await call()
+    store_key, request_hash = _prepare(key, scope, payload)
+    stored = await run_in_threadpool(store.begin, store_key, request_hash)
+    if stored is not None:
+        return _response(stored, replayed=True)
+    try:
+        stored = _encode(await call(), response_model)
+    except BaseException:
+        await run_in_threadpool(store.release, store_key)
+        raise
+    await run_in_threadpool(store.complete, store_key, request_hash, stored)
+    return _response(stored, replayed=False)
@@ -0,0 +1,204 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .config import conf
+from ..models.worker_leases import WorkerLease
+
+# Crockford base32: no I, L, O or U, so numbers read back over the phone without ambiguity
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+TIMESTAMP_BITS = 41  # milliseconds since EPOCH_MS, good for ~69 years
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+EPOCH_MS = 1735689600000  # 2025-01-01T00:00:00Z
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+ENCODED_LENGTH = 13  # ceil(63 bits / 5 bits per character)
+
+
+def encode_base32(value: int, length: int = ENCODED_LENGTH) -> str:
+    chars = []
+    for _ in range(length):
+        value, remainder = divmod(value, 32)
+        chars.append(ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+class RandomOrderNumbers:
+    """The original scheme: 48 random bits, scattered across the order_number index"""
+
+    def next(self) -> str:
+        return uuid.uuid4().hex[:12]
+
+
+class TimeOrderedOrderNumbers:
+    """Snowflake-style numbers: millisecond timestamp, worker id, per-millisecond sequence.
+
+    The fixed-width base32 text sorts in generation order, so new orders are
+    appended at the right edge of the order_number index instead of splitting
+    pages all over it. Numbers are unique as long as no two live workers
+    share a worker id.
+    """
+
+    def __init__(self, worker_id: int, clock=time.time):
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self.clock = clock
+        self.last_ms = -1
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def next(self) -> str:
+        with self.lock:
+            now_ms = int(self.clock() * 1000) - EPOCH_MS
+            if now_ms > self.last_ms:
+                self.last_ms = now_ms
+                self.sequence = 0
+            elif self.sequence < MAX_SEQUENCE:
+                # Same millisecond, or the clock stepped back: stay on the last timestamp
+                self.sequence += 1
+            else:
+                # Sequence exhausted: borrow the next millisecond rather than block
+                self.last_ms += 1
+                self.sequence = 0
+            value = (self.last_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self.sequence
+        return encode_base32(value)
+
+
+class WorkerLeaseHolder:
+    """This process's claim on an order number worker id, kept in the worker_leases table.
+
+    A worker claims the lowest free (or expired) id on first use and renews
+    it once half of `ttl` has passed, always before generating another
+    number, so an id is only handed to another worker after its holder has
+    stopped using it. Hosts' clocks must agree to well within `ttl` / 2.
+    Claiming fails loudly when all 1024 ids are held.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl or conf.order_number_lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[-100:]
+        self.worker_id = None
+        self.renewed_at = 0.0
+        self.lock = threading.Lock()
+
+    def ensure(self, engine) -> int:
+        """The leased worker id, claiming or renewing the lease through `engine` when due"""
+        with self.lock:
+            if self.worker_id is not None and time.monotonic() - self.renewed_at < self.ttl / 2:
+                return self.worker_id
+            if self.worker_id is None or not self._renew(engine):
+                self.worker_id = self._claim(engine)
+            self.renewed_at = time.monotonic()
+            return self.worker_id
+
+    def release(self, engine):
+        with self.lock:
+            if self.worker_id is None:
+                return
+            with engine.begin() as connection:
+                connection.execute(delete(WorkerLease.__table__).where(
+                    WorkerLease.worker_id == self.worker_id, WorkerLease.owner == self.owner
+                ))
+            self.worker_id = None
+
+    def _expiry(self) -> datetime:
+        return datetime.now() + timedelta(seconds=self.ttl)
+
+    def _renew(self, engine) -> bool:
+        with engine.begin() as connection:
+            return connection.execute(
+                update(WorkerLease.__table__)
+                .where(WorkerLease.worker_id == self.worker_id, WorkerLease.owner == self.owner)
+                .values(expires_at=self._expiry())
+            ).rowcount == 1
+
+    def _claim(self, engine) -> int:
+        now = datetime.now()
+        with engine.connect() as connection:
+            leases = dict(connection.execute(select(WorkerLease.worker_id, WorkerLease.expires_at)).all())
+        # Expired leases first, taken over only if still expired when the UPDATE runs
+        for worker_id in sorted(worker_id for worker_id, expires_at in leases.items() if expires_at < now):
+            with engine.begin() as connection:
+                if connection.execute(
+                    update(WorkerLease.__table__)
+                    .where(WorkerLease.worker_id == worker_id, WorkerLease.expires_at < now)
+                    .values(owner=self.owner, expires_at=self._expiry())
+                ).rowcount == 1:
+                    return worker_id
+        for worker_id in range(MAX_WORKER_ID + 1):
+            if worker_id in leases:
+                continue
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(WorkerLease.__table__).values(
+                        worker_id=worker_id, owner=self.owner, expires_at=self._expiry()
+                    ))
+                return worker_id
+            except IntegrityError:
+                continue  # another worker claimed it first
+        raise RuntimeError(
+            f"All {MAX_WORKER_ID + 1} order number worker ids are leased; "
+            "stop idle workers, wait for their leases to expire or set ORDER_NUMBER_WORKER_ID"
+        )
+
+
+def configured_worker_id():
+    """ORDER_NUMBER_WORKER_ID (or conf.order_number_worker_id) when the deployment assigns ids itself"""
+    configured = os.environ.get("ORDER_NUMBER_WORKER_ID", conf.order_number_worker_id)
+    return int(configured) if configured is not None else None
+
+
+def build_generator(scheme: str, worker_id: int = None):
+    if scheme == "time":
+        return TimeOrderedOrderNumbers(worker_id) if worker_id is not None else None
+    if scheme == "random":
+        return RandomOrderNumbers()
+    raise ValueError(f"Unknown order number scheme: {scheme}")
+
+
+generator = build_generator(conf.order_number_scheme, configured_worker_id())
+lease = WorkerLeaseHolder()
+_generator_pid = os.getpid()
+
+
+def _reset_after_fork():
+    global generator, lease, _generator_pid
+    if _generator_pid != os.getpid():
+        # Forked after import (e.g. a preloading process manager): this worker needs its own id
+        generator, lease = build_generator(conf.order_number_scheme, configured_worker_id()), WorkerLeaseHolder()
+        _generator_pid = os.getpid()
+
+
+def lease_worker_id(db: Session):
+    """Make sure this worker holds a worker id before generating order numbers in a request.
+
+    Costs nothing but a clock check while the lease is fresh. Call it before
+    the session writes anything: claims and renewals commit on a connection
+    of their own.
+    """
+    global generator
+    _reset_after_fork()
+    if conf.order_number_scheme != "time" or configured_worker_id() is not None:
+        return
+    worker_id = lease.ensure(db.get_bind())
+    if generator is None or generator.worker_id != worker_id:
+        generator = TimeOrderedOrderNumbers(worker_id)
+
+
+def release_worker_id(db: Session):
+    lease.release(db.get_bind())
+
+
+def next_order_number() -> str:
+    _reset_after_fork()
+    if generator is None:
+        raise RuntimeError("No order number worker id: call lease_worker_id first or set ORDER_NUMBER_WORKER_ID")
+    return generator.next()
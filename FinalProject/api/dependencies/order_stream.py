@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from sqlalchemy import select, func
+from .config import conf
+from .database import SessionLocal
+from ..models.order_events import OrderEvent
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One stream client: its filters and the queue the broker feeds"""
+
+    def __init__(self, statuses=None, order_number: Optional[str] = None):
+        self.statuses = set(statuses) if statuses else None
+        self.order_number = order_number
+        self.queue = asyncio.Queue(maxsize=conf.order_stream_queue_size)
+        self.dropped = 0
+
+    def wants(self, event: dict) -> bool:
+        if self.order_number and event["order_number"] != self.order_number:
+            return False
+        if self.statuses and event["status"] not in self.statuses:
+            return False
+        return True
+
+
+class OrderEventBroker:
+    """Fans order events out to the stream subscribers of this worker.
+
+    The order_events table is the broker between workers: whichever worker
+    handles a write appends the event in the same transaction, and every
+    worker with subscribers tails the table with one indexed range query per
+    poll interval, no matter how many clients are listening to it.
+
+    Ids are handed out at insert but become visible at commit, which on MySQL
+    need not happen in id order. Each poll therefore reads again the last
+    `reread_ids` ids behind the newest one seen and skips the ids already
+    sent, so an event committed late is still delivered once. An event that
+    becomes visible more than `reread_ids` ids late is missed.
+    """
+
+    def __init__(self, session_factory=SessionLocal, poll_interval: float = None):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval if poll_interval is not None else conf.order_stream_poll_interval
+        self.subscriptions = set()
+        self.reread_ids = conf.order_stream_reread_ids
+        self.last_id = None
+        self.sent_ids = set()
+        self._task = None
+
+    def subscribe(self, statuses=None, order_number: Optional[str] = None) -> Subscription:
+        subscription = Subscription(statuses=statuses, order_number=order_number)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    def dispatch(self, events: list):
+        for event in events:
+            for subscription in self.subscriptions:
+                if not subscription.wants(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # A stalled client loses events rather than holding memory for everyone
+                    subscription.dropped += 1
+
+    def fetch(self, db) -> list:
+        """Read the events committed since the previous fetch"""
+        if self.last_id is None:
+            # Start from the tail: subscribers only see changes made after they connect
+            self.last_id = db.execute(select(func.max(OrderEvent.id))).scalar() or 0
+            self.sent_ids = set(db.execute(
+                select(OrderEvent.id).where(OrderEvent.id > self.last_id - self.reread_ids)
+            ).scalars())
+            return []
+
+        rows = db.execute(
+            select(OrderEvent).where(OrderEvent.id > self.last_id - self.reread_ids)
+            .order_by(OrderEvent.id).limit(self.reread_ids + 500)
+        ).scalars().all()
+        events = [{
+            "id": row.id,
+            "order_number": row.order_number,
+            "event_type": row.event_type,
+            "status": row.status,
+            "payment_status": row.payment_status,
+            "created_at": row.created_at.isoformat()
+        } for row in rows if row.id not in self.sent_ids]
+        if events:
+            self.sent_ids.update(event["id"] for event in events)
+            self.last_id = max(self.last_id, events[-1]["id"])
+            floor = self.last_id - self.reread_ids
+            self.sent_ids = {event_id for event_id in self.sent_ids if event_id > floor}
+        return events
+
+    def _fetch_once(self):
+        db = self.session_factory()
+        try:
+            return self.fetch(db)
+        finally:
+            db.close()
+
+    async def _run(self):
+        while self.subscriptions:
+            try:
+                # The query runs off the event loop; queues are only touched from the loop
+                self.dispatch(await asyncio.to_thread(self._fetch_once))
+            except Exception:
+                logger.exception("Order event poll failed")
+            await asyncio.sleep(self.poll_interval)
+        self._task = None
+        self.last_id = None
+        self.sent_ids = set()
+
+    def ensure_running(self):
+        """Start tailing the event table; the loop stops by itself once nobody listens"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stream(self, statuses=None, order_number: Optional[str] = None):
+        """Server-Sent Events for one client, with keep-alive comments while idle"""
+        subscription = self.subscribe(statuses=statuses, order_number=order_number)
+        self.ensure_running()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=conf.order_stream_keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: {event['event_type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+broker = OrderEventBroker()
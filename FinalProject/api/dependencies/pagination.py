@@ -0,0 +1,53 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    """Pack the sort key of the last row on a page into an opaque cursor string"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers) -> list:
+    """Unpack a cursor produced by encode_cursor, converting each key value with its parser"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(cursor)
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(query, columns, after_values=None):
+    """Order a query by `columns` and, given a cursor's values, keep only the rows after it.
+
+    The row-value comparison lets the database seek straight into a matching
+    (col1, col2, ...) index instead of walking and discarding OFFSET rows.
+    """
+    query = query.order_by(*columns)
+    if after_values is not None:
+        if len(columns) == 1:
+            query = query.filter(columns[0] > after_values[0])
+        else:
+            query = query.filter(tuple_(*columns) > tuple(after_values))
+    return query
+
+
+def next_cursor(items: list, limit: int, *attributes) -> Optional[str]:
+    """Cursor for the page after `items`, or None when this page was the last one"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(*(getattr(last, attribute) for attribute in attributes))
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]):
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
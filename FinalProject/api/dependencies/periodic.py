@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs `work(db)` with a fresh session every `interval` seconds on the event loop of the app.
+
+    The work runs off the loop in a thread; a failure is logged and the next
+    run still happens. It is started and stopped from the app lifespan, and
+    only ever runs one at a time per worker.
+    """
+
+    def __init__(self, name: str, work, interval: float, session_factory=SessionLocal):
+        self.name = name
+        self.work = work
+        self.interval = interval
+        self.session_factory = session_factory
+        self.runs = 0
+        self.last_result = None
+        self._task = None
+
+    def run_once(self):
+        with self.session_factory() as db:
+            self.last_result = self.work(db)
+        self.runs += 1
+        return self.last_result
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                logger.exception("%s failed", self.name)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
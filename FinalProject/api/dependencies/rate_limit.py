@@ -0,0 +1,61 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Depends, HTTPException, Request
+from .config import conf
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets: `burst` requests at once, refilled at `rate` a second.
+
+    Buckets live in this process only and the least recently seen clients
+    are dropped past `max_clients`, so a forgotten client starts over with
+    a full bucket; each worker enforces the limit on its own.
+    """
+
+    def __init__(self, rate: float, burst: int, max_clients: int = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients or conf.rate_limit_max_clients
+        self.buckets = OrderedDict()  # client -> (tokens, refilled_at)
+        self.lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, client: str) -> float:
+        """Take a token for `client`; returns 0 if one was available, else seconds until there is one"""
+        now = time.monotonic()
+        with self.lock:
+            tokens, refilled_at = self.buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - refilled_at) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                self.allowed += 1
+                wait = 0.0
+            else:
+                self.limited += 1
+                wait = (1 - tokens) / self.rate
+            self.buckets[client] = (tokens, now)
+            while len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+            return wait
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"clients": len(self.buckets), "allowed": self.allowed, "limited": self.limited}
+
+
+def rate_limit(limiter: TokenBucketLimiter):
+    """Dependency answering 429 with Retry-After once the calling client's bucket is empty"""
+    def dependency(request: Request):
+        client = request.client.host if request.client else "unknown"
+        wait = limiter.acquire(client)
+        if wait:
+            raise HTTPException(status_code=429, detail="Too many requests",
+                                headers={"Retry-After": str(math.ceil(wait))})
+    return Depends(dependency)
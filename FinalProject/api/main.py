@@ -1,12 +1,44 @@
+import asyncio
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import index as indexRoute
-from .models import model_loader
 from .dependencies.config import conf
+from .dependencies.database import engine, SessionLocal
+from .dependencies import order_numbers
+from .dependencies.periodic import PeriodicTask
+from .controllers.promotions import sweep_promotions
+from .controllers.order_events import prune_order_events
+from . import migrations
 
+promotion_sweeper = PeriodicTask("promotion sweep", sweep_promotions, conf.promotion_sweep_interval_seconds)
+order_event_pruner = PeriodicTask("order event prune", prune_order_events, conf.order_event_prune_interval_seconds)
 
-app = FastAPI()
+
+def claim_worker_id():
+    # Claimed up front so a deployment with no free id fails at startup, not on its first order
+    with SessionLocal() as db:
+        order_numbers.lease_worker_id(db)
+
+
+def release_worker_id():
+    with SessionLocal() as db:
+        order_numbers.release_worker_id(db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(claim_worker_id)
+    promotion_sweeper.start()
+    order_event_pruner.start()
+    yield
+    await order_event_pruner.stop()
+    await promotion_sweeper.stop()
+    await asyncio.to_thread(release_worker_id)
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -16,9 +48,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "ETag", "Last-Modified", "Retry-After"],
 )
 
-model_loader.index()
+# Schema changes are applied with `python -m api.cli migrate`, never at startup
+migrations.check(engine)
 indexRoute.load_routes(app)
 
 
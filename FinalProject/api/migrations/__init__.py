@@ -0,0 +1,65 @@
+"""Versioned schema migrations.
+
+Each migration runs once, in order, and is recorded in the schema_version
+table. Migrations must be idempotent (create with checkfirst, look before
+dropping) so they can be applied to databases created by older releases,
+which ran create_all at import time, as well as to fresh ones.
+"""
+import logging
+from datetime import datetime
+from sqlalchemy import Table, Column, Integer, String, DATETIME, MetaData, select, insert, func
+from .versions import MIGRATIONS
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DATETIME, nullable=False)
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(engine) -> int:
+    with engine.connect() as connection:
+        if not engine.dialect.has_table(connection, schema_version.name):
+            return 0
+        return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def pending(engine) -> list:
+    version = current_version(engine)
+    return [migration for migration in MIGRATIONS if migration.version > version]
+
+
+def upgrade(engine, target: int = None) -> list:
+    """Apply every pending migration up to `target` (default: latest), each in its own transaction"""
+    schema_version.create(engine, checkfirst=True)
+    applied = []
+    for migration in pending(engine):
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as connection:
+            migration.apply(connection)
+            connection.execute(insert(schema_version).values(
+                version=migration.version,
+                description=migration.description,
+                applied_at=datetime.now()
+            ))
+        logger.info("Applied migration %s: %s", migration.version, migration.description)
+        applied.append(migration)
+    return applied
+
+
+def check(engine):
+    """Warn at startup when the database is behind; never runs DDL itself"""
+    version = current_version(engine)
+    if version < LATEST_VERSION:
+        logger.warning(
+            "Database schema is at version %s but the code expects %s; run `python -m api.cli migrate`",
+            version, LATEST_VERSION
+        )
+    return version
@@ -0,0 +1,134 @@
+from sqlalchemy import Table, Column, Integer, Index, MetaData, inspect, select, insert, func
+from sqlalchemy.schema import DropIndex, CreateColumn
+from ..dependencies.database import Base
+from .. import models  # noqa: F401 - registers every table on Base
+from ..models.orders import Order
+from ..models.order_details import OrderDetail
+from ..models.reviews import Review
+from ..models.dishes import Dish
+from ..models.promotions import Promotion
+from ..models.resources import Resource
+from ..models.idempotency_keys import IdempotencyKey
+from ..models.order_archive import ArchivedOrder, ArchivedOrderDetail, ArchivedStatusCount
+from ..models.recipes import Recipe
+from ..models.catalog_versions import CatalogVersion
+from ..models.worker_leases import WorkerLease
+from ..models.dish_search import create_dish_search
+from ..controllers.menu_search import index_dishes
+
+
+class Migration:
+    def __init__(self, version: int, description: str, apply):
+        self.version = version
+        self.description = description
+        self.apply = apply
+
+
+def create_indexes(connection, table, *names):
+    """Create the named indexes declared on a model table, skipping any that already exist"""
+    declared = {index.name: index for index in table.indexes}
+    for name in names:
+        declared[name].create(connection, checkfirst=True)
+
+
+def drop_index(connection, table_name: str, index_name: str, column_name: str):
+    existing = {index["name"] for index in inspect(connection).get_indexes(table_name)}
+    if index_name in existing:
+        table = Table(table_name, MetaData(), Column(column_name, Integer))
+        connection.execute(DropIndex(Index(index_name, table.c[column_name])))
+
+
+def add_column(connection, table, name: str):
+    """Add a column declared on a model table, unless the table already has it"""
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    if name not in existing:
+        column_spec = CreateColumn(table.c[name]).compile(dialect=connection.dialect)
+        connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_spec}")
+
+
+def baseline(connection):
+    # Tables that do not exist yet are created with all of their current indexes
+    Base.metadata.create_all(connection)
+
+
+def performance_indexes(connection):
+    create_indexes(connection, Order.__table__,
+                   "ix_orders_order_date_id", "ix_orders_status_order_date_id", "ix_orders_customer_phone")
+    create_indexes(connection, OrderDetail.__table__,
+                   "ix_order_details_order_id", "ix_order_details_dish_id")
+    create_indexes(connection, Review.__table__,
+                   "ix_reviews_order_number", "ix_reviews_is_approved_id")
+    create_indexes(connection, Dish.__table__,
+                   "ix_dishes_is_active_id", "ix_dishes_category_id_is_active_id")
+    create_indexes(connection, Promotion.__table__, "ix_promotions_is_active_id")
+    create_indexes(connection, Resource.__table__, "ix_resources_is_active_id")
+    # Nothing filters on quantity; the index only slowed down every order insert
+    drop_index(connection, "order_details", "ix_order_details_qty", "qty")
+
+
+def idempotency_keys(connection):
+    IdempotencyKey.__table__.create(connection, checkfirst=True)
+
+
+def order_archive(connection):
+    ArchivedOrder.__table__.create(connection, checkfirst=True)
+    ArchivedOrderDetail.__table__.create(connection, checkfirst=True)
+
+
+def dish_recipes(connection):
+    add_column(connection, Recipe.__table__, "dish_id")
+    create_indexes(connection, Recipe.__table__, "ix_recipes_dish_id")
+
+
+def catalog_versions(connection):
+    CatalogVersion.__table__.create(connection, checkfirst=True)
+
+
+def dish_search(connection):
+    create_dish_search(connection)
+    index_dishes(connection)
+
+
+def catalog_versions_updated_at(connection):
+    add_column(connection, CatalogVersion.__table__, "updated_at")
+
+
+def promotion_lifecycle_index(connection):
+    create_indexes(connection, Promotion.__table__, "ix_promotions_is_active_expires_at")
+
+
+def worker_leases(connection):
+    WorkerLease.__table__.create(connection, checkfirst=True)
+
+
+def archived_status_counts(connection):
+    table = ArchivedStatusCount.__table__
+    table.create(connection, checkfirst=True)
+    if connection.execute(select(func.count()).select_from(table)).scalar():
+        return
+    # One scan of the archive to start the counts; the archive job keeps them from here on
+    connection.execute(insert(table).from_select(
+        ["status", "orders"],
+        select(ArchivedOrder.status, func.count()).group_by(ArchivedOrder.status)
+    ))
+
+
+def reindex_dish_search(connection):
+    # Rebuild the rows written while dishes of deactivated categories were still indexed
+    index_dishes(connection)
+
+
+MIGRATIONS = [
+    Migration(1, "baseline tables", baseline),
+    Migration(2, "performance indexes", performance_indexes),
+    Migration(3, "idempotency keys", idempotency_keys),
+    Migration(4, "order archive tables", order_archive),
+    Migration(5, "dish recipes", dish_recipes),
+    Migration(6, "catalog versions", catalog_versions),
+    Migration(7, "dish search index", dish_search),
+    Migration(8, "catalog version timestamps", catalog_versions_updated_at),
+    Migration(9, "promotion lifecycle index", promotion_lifecycle_index),
+    Migration(10, "order number worker leases", worker_leases),
+    Migration(11, "archived order status counts", archived_status_counts),
+    Migration(12, "dish search without inactive categories", reindex_dish_search),
+]
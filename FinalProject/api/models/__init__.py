@@ -1 +1 @@
-from . import orders, order_details, recipes, sandwiches, resources, categories, dishes, reviews, promotions
+from . import orders, order_details, recipes, sandwiches, resources, categories, dishes, reviews, promotions, order_events, idempotency_keys, order_archive, catalog_versions, dish_search, worker_leases
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DATETIME
+from ..dependencies.database import Base
+
+
+class CatalogVersion(Base):
+    """Counter bumped in the same transaction as every write to a cached catalog, so workers
+    can tell whether their in-process copy is current with one primary-key read"""
+    __tablename__ = "catalog_versions"
+
+    name = Column(String(50), primary_key=True)  # "menu", "promotions", "reviews", "resources", ...
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DATETIME, nullable=True)  # UTC time of the last bump, sent as Last-Modified
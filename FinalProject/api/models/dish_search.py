@@ -0,0 +1,35 @@
+from sqlalchemy import DDL, event, table, column
+from .dishes import Dish
+
+# Full-text index over dish name, description and category name, one row per active dish.
+# Not a declarative model: SQLite needs an FTS5 virtual table (keyed by rowid) and MySQL a
+# plain InnoDB table with a FULLTEXT index, so the DDL is written out per dialect.
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS dish_search USING fts5("
+    "name, description, category, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+MYSQL_DDL = (
+    "CREATE TABLE IF NOT EXISTS dish_search ("
+    "dish_id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(100) NOT NULL, description VARCHAR(300) NOT NULL, "
+    "category VARCHAR(100) NOT NULL, FULLTEXT KEY ft_dish_search (name, description, category)"
+    ") ENGINE=InnoDB"
+)
+DROP_DDL = "DROP TABLE IF EXISTS dish_search"
+
+
+def dish_search_table(dialect_name: str):
+    """Core table construct for the dialect's layout; the dish id is `rowid` on SQLite"""
+    id_column = "dish_id" if dialect_name == "mysql" else "rowid"
+    return table("dish_search", column(id_column), column("name"), column("description"), column("category"))
+
+
+def create_dish_search(connection):
+    if connection.dialect.name == "mysql":
+        connection.exec_driver_sql(MYSQL_DDL)
+    else:
+        connection.exec_driver_sql(SQLITE_DDL)
+
+
+# The index lives and dies with the dishes table, including under create_all/drop_all
+event.listen(Dish.__table__, "after_create", lambda target, connection, **kw: create_dish_search(connection))
+event.listen(Dish.__table__, "after_drop", DDL(DROP_DDL))
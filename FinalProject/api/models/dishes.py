@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..dependencies.database import Base
 
 
 class Dish(Base):
     __tablename__ = "dishes"
+    __table_args__ = (
+        # Keyset pagination for the list endpoint
+        Index("ix_dishes_is_active_id", "is_active", "id"),
+        Index("ix_dishes_category_id_is_active_id", "category_id", "is_active", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(100), nullable=False)
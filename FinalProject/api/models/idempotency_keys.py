@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Text, DATETIME
+from datetime import datetime
+from ..dependencies.database import Base
+
+
+class IdempotencyKey(Base):
+    """Stored first response of a mutation, replayed when a client retries with the same Idempotency-Key"""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(400), primary_key=True)  # "<METHOD> <path> <client key>"
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is still running
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DATETIME, nullable=False, default=datetime.now, index=True)
@@ -1,15 +1,9 @@
-from . import orders, order_details, recipes, sandwiches, resources, categories, dishes, reviews, promotions
+from . import orders, order_details, recipes, sandwiches, resources, categories, dishes, reviews, promotions, order_events
 
 from ..dependencies.database import engine
+from .. import migrations
 
 
 def index():
-    orders.Base.metadata.create_all(engine)
-    order_details.Base.metadata.create_all(engine)
-    recipes.Base.metadata.create_all(engine)
-    sandwiches.Base.metadata.create_all(engine)
-    resources.Base.metadata.create_all(engine)
-    categories.Base.metadata.create_all(engine)
-    dishes.Base.metadata.create_all(engine)
-    reviews.Base.metadata.create_all(engine)
-    promotions.Base.metadata.create_all(engine)
+    """Bring the database schema up to date (tables, indexes) through the migrations"""
+    return migrations.upgrade(engine)
@@ -0,0 +1,51 @@
+from sqlalchemy import Column, ForeignKey, Integer, String, DATETIME, Boolean, Enum, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..dependencies.database import Base
+from .orders import OrderStatus
+
+
+class ArchivedOrder(Base):
+    """Finished orders moved out of `orders` by the archive job; same columns and ids"""
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_order_date_id", "order_date", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_number = Column(String(50), unique=True, nullable=False)
+    customer_name = Column(String(100), nullable=False)
+    customer_phone = Column(String(20), nullable=False)
+    customer_address = Column(String(300), nullable=True)
+    is_delivery = Column(Boolean, nullable=False)
+    status = Column(Enum(OrderStatus), nullable=False)
+    total_cents = Column(Integer, nullable=False)
+    payment_method = Column(String(50), nullable=True)
+    payment_status = Column(String(50), nullable=False)
+    order_date = Column(DATETIME, nullable=False)
+    description = Column(String(300))
+    archived_at = Column(DATETIME, nullable=False, default=datetime.now)
+
+    order_details = relationship("ArchivedOrderDetail", back_populates="order")
+
+
+class ArchivedOrderDetail(Base):
+    __tablename__ = "order_details_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, ForeignKey("orders_archive.id"), nullable=False, index=True)
+    dish_id = Column(Integer, index=True)
+    qty = Column(Integer, nullable=False)
+    unit_price_cents = Column(Integer, nullable=False)
+    line_total_cents = Column(Integer, nullable=False)
+
+    order = relationship("ArchivedOrder", back_populates="order_details")
+
+
+class ArchivedStatusCount(Base):
+    """Archived orders per status, kept by the archive job in the same transaction as each batch
+    it moves, so status totals add these to the live counts instead of scanning the archive"""
+    __tablename__ = "orders_archive_status_counts"
+
+    status = Column(Enum(OrderStatus), primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
@@ -7,9 +7,9 @@ class OrderDetail(Base):
     __tablename__ = "order_details"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    dish_id = Column(Integer, ForeignKey("dishes.id"))
-    qty = Column(Integer, index=True, nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    dish_id = Column(Integer, ForeignKey("dishes.id"), index=True)
+    qty = Column(Integer, nullable=False)
     unit_price_cents = Column(Integer, nullable=False)
     line_total_cents = Column(Integer, nullable=False)
 
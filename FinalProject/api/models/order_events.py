@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DATETIME
+from datetime import datetime
+from ..dependencies.database import Base
+
+
+class OrderEvent(Base):
+    """Append-only log of order changes, the cross-worker feed for the order status stream"""
+    __tablename__ = "order_events"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    order_number = Column(String(50), nullable=False)
+    event_type = Column(String(20), nullable=False)  # created, status, payment
+    status = Column(String(50), nullable=False)
+    payment_status = Column(String(50), nullable=False)
+    created_at = Column(DATETIME, nullable=False, default=datetime.now, index=True)
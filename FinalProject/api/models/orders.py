@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, DATETIME, Boolean, Enum
+from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, DATETIME, Boolean, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -17,11 +17,16 @@ class OrderStatus(enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination for the staff order listings
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        Index("ix_orders_status_order_date_id", "status", "order_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     order_number = Column(String(50), unique=True, nullable=False)
     customer_name = Column(String(100), nullable=False)
-    customer_phone = Column(String(20), nullable=False)
+    customer_phone = Column(String(20), nullable=False, index=True)
     customer_address = Column(String(300), nullable=True)
     is_delivery = Column(Boolean, default=False, nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DATETIME, DECIMAL
+from sqlalchemy import Column, ForeignKey, Integer, String, Boolean, DATETIME, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..dependencies.database import Base
@@ -6,6 +6,12 @@ from ..dependencies.database import Base
 
 class Promotion(Base):
     __tablename__ = "promotions"
+    __table_args__ = (
+        # Keyset pagination for the list endpoint
+        Index("ix_promotions_is_active_id", "is_active", "id"),
+        # Promotion index loads and the lifecycle sweep
+        Index("ix_promotions_is_active_expires_at", "is_active", "expires_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     code = Column(String(20), unique=True, nullable=False)
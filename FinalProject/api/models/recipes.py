@@ -9,8 +9,10 @@ class Recipe(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     sandwich_id = Column(Integer, ForeignKey("sandwiches.id"))
+    dish_id = Column(Integer, ForeignKey("dishes.id"), nullable=True, index=True)  # bill of materials for a dish
     resource_id = Column(Integer, ForeignKey("resources.id"))
     amount = Column(Integer, index=True, nullable=False, server_default='0.0')
 
     sandwich = relationship("Sandwich", back_populates="recipes")
+    dish = relationship("Dish")
     resource = relationship("Resource", back_populates="recipes")
\ No newline at end of file
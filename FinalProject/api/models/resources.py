@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, DATETIME, Boolean
+from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, DATETIME, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..dependencies.database import Base
@@ -6,6 +6,10 @@ from ..dependencies.database import Base
 
 class Resource(Base):
     __tablename__ = "resources"
+    __table_args__ = (
+        # Keyset pagination for the list endpoint
+        Index("ix_resources_is_active_id", "is_active", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(100), unique=True, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Text, Boolean, DATETIME
+from sqlalchemy import Column, ForeignKey, Integer, String, Text, Boolean, DATETIME, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..dependencies.database import Base
@@ -6,9 +6,13 @@ from ..dependencies.database import Base
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # Keyset pagination for the list endpoint
+        Index("ix_reviews_is_approved_id", "is_approved", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    order_number = Column(String(50), ForeignKey("orders.order_number"), nullable=False)
+    order_number = Column(String(50), ForeignKey("orders.order_number"), nullable=False, index=True)
     customer_name = Column(String(100), nullable=False)
     rating = Column(Integer, nullable=False)  # 1-5 stars
     review_text = Column(Text, nullable=True)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DATETIME
+from ..dependencies.database import Base
+
+
+class WorkerLease(Base):
+    """Order number worker ids in use: each running worker holds one row, renewed while it lives,
+    so no two live workers generate time-ordered order numbers with the same id"""
+    __tablename__ = "worker_leases"
+
+    worker_id = Column(Integer, primary_key=True, autoincrement=False)  # 0-1023
+    owner = Column(String(100), nullable=False)  # host:pid:nonce of the holder
+    expires_at = Column(DATETIME, nullable=False)
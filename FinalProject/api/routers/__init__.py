@@ -1 +1,2 @@
 from . import orders, order_details, menu, resources, dashboard, reviews, promotions, analytics
+from . import async_orders, async_menu, async_analytics
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, Query
+from ..dependencies.async_database import get_async_db
+from ..controllers.async_analytics import (
+    get_sales_analytics, get_popular_dishes, get_revenue_by_category,
+    get_customer_analytics, get_promotion_analytics, get_inventory_analytics
+)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/sales")
+async def get_sales_analytics_endpoint(
+    days: int = Query(30, description="Number of days to analyze"),
+    db=Depends(get_async_db)
+):
+    """Get sales analytics for the specified period"""
+    return await get_sales_analytics(db, days=days)
+
+
+@router.get("/popular-dishes")
+async def get_popular_dishes_endpoint(
+    limit: int = Query(10, description="Number of dishes to return"),
+    db=Depends(get_async_db)
+):
+    """Get most popular dishes based on order frequency"""
+    return await get_popular_dishes(db, limit=limit)
+
+
+@router.get("/revenue-by-category")
+async def get_revenue_by_category_endpoint(db=Depends(get_async_db)):
+    """Get revenue breakdown by dish category"""
+    return await get_revenue_by_category(db)
+
+
+@router.get("/customers")
+async def get_customer_analytics_endpoint(db=Depends(get_async_db)):
+    """Get customer behavior analytics"""
+    return await get_customer_analytics(db)
+
+
+@router.get("/promotions")
+async def get_promotion_analytics_endpoint(db=Depends(get_async_db)):
+    """Get promotion usage analytics"""
+    return await get_promotion_analytics(db)
+
+
+@router.get("/inventory")
+async def get_inventory_analytics_endpoint(db=Depends(get_async_db)):
+    """Get inventory analytics"""
+    return await get_inventory_analytics(db)
+
+
+@router.get("/dashboard")
+async def get_analytics_dashboard(db=Depends(get_async_db)):
+    """Get comprehensive analytics dashboard data"""
+    return {
+        "sales": await get_sales_analytics(db, days=30),
+        "popular_dishes": await get_popular_dishes(db, limit=5),
+        "revenue_by_category": await get_revenue_by_category(db),
+        "customers": await get_customer_analytics(db),
+        "promotions": await get_promotion_analytics(db),
+        "inventory": await get_inventory_analytics(db)
+    }
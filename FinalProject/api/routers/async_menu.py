@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Header, Query, Response
+from typing import List, Optional
+from ..controllers import async_menu as controller
+from ..dependencies.async_database import get_async_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies.conditional import async_conditional_get
+from ..schemas.categories import CategoryOut, FullMenuOut
+from ..schemas.dishes import DishOut
+
+router = APIRouter(prefix="/menu", tags=["menu"])
+
+
+@router.get("/categories", response_model=List[CategoryOut], dependencies=[async_conditional_get(controller.MENU_CATALOG)])
+async def list_categories(skip: int = 0, limit: int = 100, db=Depends(get_async_db)):
+    return await controller.get_categories(db, skip=skip, limit=limit)
+
+
+@router.get("/dishes", response_model=List[DishOut], dependencies=[async_conditional_get(controller.MENU_CATALOG)])
+async def list_dishes(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db=Depends(get_async_db)
+):
+    dishes = await controller.get_dishes(db, skip=skip, limit=limit, category_id=category_id, cursor=cursor)
+    set_next_cursor(response, next_cursor(dishes, limit, "id"))
+    return dishes
+
+
+@router.get("/dishes/{dish_id}", response_model=DishOut, dependencies=[async_conditional_get(controller.MENU_CATALOG)])
+async def get_dish_endpoint(dish_id: int, db=Depends(get_async_db)):
+    return await controller.get_dish(db, dish_id)
+
+
+@router.get("/full", response_model=FullMenuOut)
+async def get_full_menu_endpoint(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db=Depends(get_async_db)
+):
+    return await controller.get_full_menu(db, if_none_match, accept_encoding)
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Optional
+from ..controllers import async_orders as controller
+from ..schemas import orders as schema
+from ..dependencies.async_database import get_async_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies import idempotency
+
+router = APIRouter(
+    tags=['Orders'],
+    prefix="/orders"
+)
+
+dashboard_router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.post("/guest", response_model=schema.OrderOut)
+async def create_guest_order(request: schema.GuestOrderCreate, db=Depends(get_async_db),
+                             idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    return await idempotency.arun(idempotency_key, "POST /orders/guest", request,
+                                  lambda: controller.create_guest_order(db=db, payload=request), schema.OrderOut)
+
+
+@router.get("/number/{order_number}", response_model=schema.OrderOut)
+async def get_order_by_number(order_number: str, db=Depends(get_async_db)):
+    return Response(content=await controller.get_order_json(db=db, order_number=order_number),
+                    media_type="application/json")
+
+
+@dashboard_router.get("/staff/orders", response_model=List[schema.OrderOut])
+async def get_staff_orders(
+    response: Response,
+    status: Optional[str] = Query(None, description="Filter by order status"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db=Depends(get_async_db)
+):
+    """Get orders for staff dashboard with optional status filtering"""
+    orders = await controller.get_orders_by_status(db=db, status=status, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor(orders, limit, "created_at", "id"))
+    return orders
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..dependencies.database import get_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies import group_commit
 from ..controllers import orders as order_controller
 from ..controllers import menu as menu_controller
 from ..controllers import resources as resource_controller
+from ..controllers import promotions as promotion_controller
+from ..controllers import inventory as inventory_controller
 from ..schemas.orders import OrderOut
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
@@ -12,13 +16,17 @@ router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 @router.get("/staff/orders", response_model=List[OrderOut])
 def get_staff_orders(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by order status"),
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get orders for staff dashboard with optional status filtering"""
-    return order_controller.get_orders_by_status(db=db, status=status, skip=skip, limit=limit)
+    orders = order_controller.get_orders_by_status(db=db, status=status, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor(orders, limit, "created_at", "id"))
+    return orders
 
 
 @router.get("/staff/low-stock")
@@ -53,19 +61,7 @@ def get_orders_summary(
     db: Session = Depends(get_db)
 ):
     """Get orders summary for manager dashboard"""
-    # Get orders by status
-    pending_orders = order_controller.get_orders_by_status(db=db, status="pending")
-    preparing_orders = order_controller.get_orders_by_status(db=db, status="preparing")
-    ready_orders = order_controller.get_orders_by_status(db=db, status="ready")
-    delivered_orders = order_controller.get_orders_by_status(db=db, status="delivered")
-    
-    return {
-        "pending_orders": len(pending_orders),
-        "preparing_orders": len(preparing_orders),
-        "ready_orders": len(ready_orders),
-        "delivered_orders": len(delivered_orders),
-        "total_active_orders": len(pending_orders) + len(preparing_orders) + len(ready_orders)
-    }
+    return order_controller.get_orders_summary(db=db)
 
 
 @router.get("/manager/inventory-summary")
@@ -84,3 +80,31 @@ def get_inventory_summary(
         "low_stock_items": len(low_stock_resources),
         "inventory_health": "good" if len(low_stock_resources) < 3 else "warning"
     }
+
+
+@router.get("/manager/cache-stats")
+def get_cache_stats():
+    """Hit/miss/eviction counters of this worker's in-process caches"""
+    return {
+        "orders": order_controller.order_cache.stats(),
+        "menu": menu_controller.menu_catalog.stats(),
+        "promotions": promotion_controller.promotion_catalog.stats(),
+        "recipes": inventory_controller.recipe_book.stats()
+    }
+
+
+@router.get("/manager/promotion-probes")
+def get_promotion_probe_stats():
+    """Code validation outcomes and rate limiting on this worker, to spot code enumeration"""
+    return {
+        "validations": promotion_controller.probe_stats.stats(),
+        "rate_limit": promotion_controller.validate_limiter.stats()
+    }
+
+
+@router.get("/manager/write-stats")
+def get_write_stats():
+    """Batch size and commit latency of this worker's group-commit writer"""
+    if group_commit.writer is None:
+        return {"group_commit": False}
+    return {"group_commit": True, **group_commit.writer.stats()}
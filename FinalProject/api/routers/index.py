@@ -1,7 +1,12 @@
 from . import orders, order_details, menu, resources, dashboard, reviews, promotions, analytics
+from . import async_orders, async_menu, async_analytics
+from ..dependencies.async_database import USE_ASYNC_DB
 
 
 def load_routes(app):
+    if USE_ASYNC_DB:
+        # Registered first so their async endpoints win over the sync ones on the same paths
+        load_async_routes(app)
     app.include_router(orders.router)
     app.include_router(order_details.router)
     app.include_router(menu.router)
@@ -10,3 +15,10 @@ def load_routes(app):
     app.include_router(reviews.router)
     app.include_router(promotions.router)
     app.include_router(analytics.router)
+
+
+def load_async_routes(app):
+    app.include_router(async_orders.router)
+    app.include_router(async_orders.dashboard_router)
+    app.include_router(async_menu.router)
+    app.include_router(async_analytics.router)
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..dependencies.database import get_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies.conditional import conditional_get
 from ..controllers.menu import (
     create_category, get_categories, update_category, delete_category,
-    create_dish, get_dishes, get_dish, update_dish, delete_dish
+    create_dish, get_dishes, get_menu_dish, update_dish, delete_dish, get_full_menu, search_dishes,
+    adjust_category_prices, MENU_CATALOG
 )
-from ..schemas.categories import CategoryCreate, CategoryUpdate, CategoryOut
-from ..schemas.dishes import DishCreate, DishUpdate, DishOut
+from ..controllers.menu_import import import_menu, spool_body
+from ..schemas.categories import CategoryCreate, CategoryUpdate, CategoryOut, FullMenuOut
+from ..schemas.dishes import DishCreate, DishUpdate, DishOut, MenuImportResult, PriceAdjustment, PriceAdjustmentResult
+from ..schemas.recipes import DishRecipe, DishRecipeOut
+from ..controllers.inventory import get_dish_recipe, set_dish_recipe, RECIPES_CATALOG
 
 router = APIRouter(prefix="/menu", tags=["menu"])
 
@@ -18,7 +25,7 @@ def create_category_endpoint(category: CategoryCreate, db: Session = Depends(get
     return create_category(db, category)
 
 
-@router.get("/categories", response_model=List[CategoryOut])
+@router.get("/categories", response_model=List[CategoryOut], dependencies=[conditional_get(MENU_CATALOG)])
 def list_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return get_categories(db, skip=skip, limit=limit)
 
@@ -33,26 +40,69 @@ def delete_category_endpoint(category_id: int, db: Session = Depends(get_db)):
     return delete_category(db, category_id)
 
 
+@router.post("/categories/{category_id}/prices", response_model=PriceAdjustmentResult)
+def adjust_category_prices_endpoint(category_id: int, adjustment: PriceAdjustment, db: Session = Depends(get_db)):
+    """Raise or lower the price of every active dish in a category by a percentage"""
+    return adjust_category_prices(db, category_id, adjustment)
+
+
+@router.get("/full", response_model=FullMenuOut)
+def get_full_menu_endpoint(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Active categories with their active dishes; send the last ETag as If-None-Match to get a 304"""
+    return get_full_menu(db, if_none_match, accept_encoding)
+
+
+@router.get("/search", response_model=List[DishOut], dependencies=[conditional_get(MENU_CATALOG)])
+def search_menu(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in dish names, descriptions and categories"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Ranked dish search; every word must match, as a whole word or a prefix"""
+    return search_dishes(db, q, limit)
+
+
+@router.post("/import", response_model=MenuImportResult)
+async def import_menu_endpoint(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv (with a header line) or ndjson"),
+    db: Session = Depends(get_db)
+):
+    """Create or update dishes, matched on (category, name), from a CSV or NDJSON body"""
+    stream = await spool_body(request.stream())
+    try:
+        return await run_in_threadpool(import_menu, db, stream, format)
+    finally:
+        stream.close()
+
+
 # Dish endpoints
 @router.post("/dishes", response_model=DishOut)
 def create_dish_endpoint(dish: DishCreate, db: Session = Depends(get_db)):
     return create_dish(db, dish)
 
 
-@router.get("/dishes", response_model=List[DishOut])
+@router.get("/dishes", response_model=List[DishOut], dependencies=[conditional_get(MENU_CATALOG)])
 def list_dishes(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
-    return get_dishes(db, skip=skip, limit=limit, category_id=category_id)
+    dishes = get_dishes(db, skip=skip, limit=limit, category_id=category_id, cursor=cursor)
+    set_next_cursor(response, next_cursor(dishes, limit, "id"))
+    return dishes
 
 
-@router.get("/dishes/{dish_id}", response_model=DishOut)
+@router.get("/dishes/{dish_id}", response_model=DishOut, dependencies=[conditional_get(MENU_CATALOG)])
 def get_dish_endpoint(dish_id: int, db: Session = Depends(get_db)):
-    dish = get_dish(db, dish_id)
-    return DishOut.model_validate(dish.__dict__)
+    return get_menu_dish(db, dish_id)
 
 
 @router.put("/dishes/{dish_id}", response_model=DishOut)
@@ -63,3 +113,15 @@ def update_dish_endpoint(dish_id: int, dish: DishUpdate, db: Session = Depends(g
 @router.delete("/dishes/{dish_id}")
 def delete_dish_endpoint(dish_id: int, db: Session = Depends(get_db)):
     return delete_dish(db, dish_id)
+
+
+@router.get("/dishes/{dish_id}/recipe", response_model=DishRecipeOut, dependencies=[conditional_get(RECIPES_CATALOG)])
+def get_dish_recipe_endpoint(dish_id: int, db: Session = Depends(get_db)):
+    """Resources consumed by one serving of the dish"""
+    return get_dish_recipe(db, dish_id)
+
+
+@router.put("/dishes/{dish_id}/recipe", response_model=DishRecipeOut)
+def set_dish_recipe_endpoint(dish_id: int, recipe: DishRecipe, db: Session = Depends(get_db)):
+    """Replace the dish's bill of materials; confirming an order deducts it from stock"""
+    return set_dish_recipe(db, dish_id, recipe)
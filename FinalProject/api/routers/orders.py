@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, FastAPI, status, Response
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, status, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from ..controllers import orders as controller
 from ..schemas import orders as schema
 from ..dependencies.database import engine, get_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies import order_stream, idempotency
 
 router = APIRouter(
     tags=['Orders'],
@@ -12,23 +15,61 @@ router = APIRouter(
 
 
 @router.post("/", response_model=schema.Order)
-def create(request: schema.OrderCreate, db: Session = Depends(get_db)):
-    return controller.create(db=db, request=request)
+def create(request: schema.OrderCreate, db: Session = Depends(get_db),
+           idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    return idempotency.run(idempotency_key, "POST /orders", request,
+                           lambda: controller.create(db=db, request=request), schema.Order)
 
 
 @router.get("/", response_model=list[schema.Order])
-def read_all(db: Session = Depends(get_db)):
-    return controller.read_all(db)
+def read_all(
+    response: Response,
+    status: Optional[str] = Query(None, description="Filter by order status"),
+    skip: int = 0,
+    limit: Optional[int] = Query(None, description="Page size; every order when omitted"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db)
+):
+    orders = controller.read_all(db, status=status, skip=skip, limit=limit, cursor=cursor)
+    if limit is not None:
+        set_next_cursor(response, next_cursor(orders, limit, "order_date", "id"))
+    return orders
 
 
 @router.post("/guest", response_model=schema.OrderOut)
-def create_guest_order(request: schema.GuestOrderCreate, db: Session = Depends(get_db)):
-    return controller.create_guest_order(db=db, payload=request)
+def create_guest_order(request: schema.GuestOrderCreate, db: Session = Depends(get_db),
+                       idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    return idempotency.run(idempotency_key, "POST /orders/guest", request,
+                           lambda: controller.create_guest_order(db=db, payload=request), schema.OrderOut)
+
+
+@router.post("/guest/batch", response_model=schema.GuestOrderBatchOut)
+def create_guest_orders_batch(request: schema.GuestOrderBatchCreate, db: Session = Depends(get_db),
+                              idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    return idempotency.run(idempotency_key, "POST /orders/guest/batch", request,
+                           lambda: controller.create_guest_orders_batch(db=db, payload=request),
+                           schema.GuestOrderBatchOut)
 
 
 @router.get("/number/{order_number}", response_model=schema.OrderOut)
 def get_order_by_number(order_number: str, db: Session = Depends(get_db)):
-    return controller.get_order_by_number(db=db, order_number=order_number)
+    return Response(content=controller.get_order_json(db=db, order_number=order_number),
+                    media_type="application/json")
+
+
+@router.get("/stream")
+async def stream_order_events(
+    status: Optional[List[str]] = Query(None, description="Only push events that move orders into these statuses"),
+    order_number: Optional[str] = Query(None, description="Only push events for this order number")
+):
+    """Push order creations and status/payment changes as Server-Sent Events"""
+    if status and not set(status) <= set(controller.VALID_ORDER_STATUSES):
+        raise HTTPException(status_code=400, detail="Invalid status")
+    return StreamingResponse(
+        order_stream.broker.stream(statuses=status, order_number=order_number),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{item_id}", response_model=schema.Order)
@@ -46,16 +87,29 @@ def delete(item_id: int, db: Session = Depends(get_db)):
     return controller.delete(db=db, item_id=item_id)
 
 
+@router.patch("/status/batch", response_model=schema.OrderStatusBatchOut)
+def update_order_statuses(request: schema.OrderStatusBatchUpdate, db: Session = Depends(get_db),
+                          idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    """Move many kitchen tickets to one status; orders whose transition is not allowed are reported back"""
+    return idempotency.run(idempotency_key, "PATCH /orders/status/batch", request,
+                           lambda: controller.update_order_statuses(db=db, payload=request),
+                           schema.OrderStatusBatchOut)
+
+
 @router.patch("/{order_number}/status")
-def update_order_status(order_number: str, status_update: schema.OrderStatusUpdate, db: Session = Depends(get_db)):
-    return controller.update_order_status(db=db, order_number=order_number, status_update=status_update)
+def update_order_status(order_number: str, status_update: schema.OrderStatusUpdate, db: Session = Depends(get_db),
+                        idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    return idempotency.run(
+        idempotency_key, f"PATCH /orders/{order_number}/status", status_update,
+        lambda: controller.update_order_status(db=db, order_number=order_number, status_update=status_update)
+    )
 
 
 @router.patch("/{order_number}/payment")
-def update_payment_status(order_number: str, payment_update: schema.PaymentUpdate, db: Session = Depends(get_db)):
-    return controller.update_payment_status(db=db, order_number=order_number, payment_update=payment_update)
-
+def update_payment_status(order_number: str, payment_update: schema.PaymentUpdate, db: Session = Depends(get_db),
+                          idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    return idempotency.run(
+        idempotency_key, f"PATCH /orders/{order_number}/payment", payment_update,
+        lambda: controller.update_payment_status(db=db, order_number=order_number, payment_update=payment_update)
+    )
 
-@router.get("/", response_model=list[schema.OrderOut])
-def get_orders_by_status(status: Optional[str] = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return controller.get_orders_by_status(db=db, status=status, skip=skip, limit=limit)
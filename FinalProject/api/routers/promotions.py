@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..dependencies.database import get_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies.conditional import conditional_rows
+from ..dependencies.rate_limit import rate_limit
+from ..dependencies import idempotency
 from ..controllers.promotions import (
+    PROMOTIONS_CATALOG, redeem_promotion, validate_limiter, usage_tag,
     create_promotion, get_promotions, get_promotion, update_promotion,
-    delete_promotion, apply_promotion, validate_promotion_code
+    delete_promotion, apply_promotion, validate_promotion_code, best_promotions
 )
-from ..schemas.promotions import PromotionCreate, PromotionUpdate, PromotionOut, PromotionApply
+from ..schemas.promotions import PromotionCreate, PromotionUpdate, PromotionOut, PromotionApply, PromotionCart, BestPromotionOut
 
 router = APIRouter(prefix="/promotions", tags=["promotions"])
 
@@ -19,19 +24,28 @@ def create_promotion_endpoint(promotion: PromotionCreate, db: Session = Depends(
 
 @router.get("/", response_model=List[PromotionOut])
 def list_promotions(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     active_only: bool = Query(True, description="Show only active promotions"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    revalidate=conditional_rows(PROMOTIONS_CATALOG),
     db: Session = Depends(get_db)
 ):
     """Get all promotions with optional filtering"""
-    return get_promotions(db, skip=skip, limit=limit, active_only=active_only)
+    promotions = get_promotions(db, skip=skip, limit=limit, active_only=active_only, cursor=cursor)
+    revalidate(usage_tag(promotions))
+    set_next_cursor(response, next_cursor(promotions, limit, "id"))
+    return promotions
 
 
 @router.get("/{promotion_id}", response_model=PromotionOut)
-def get_promotion_endpoint(promotion_id: int, db: Session = Depends(get_db)):
+def get_promotion_endpoint(promotion_id: int, revalidate=conditional_rows(PROMOTIONS_CATALOG),
+                           db: Session = Depends(get_db)):
     """Get a specific promotion by ID"""
-    return get_promotion(db, promotion_id)
+    promotion = get_promotion(db, promotion_id)
+    revalidate(usage_tag([promotion]))
+    return promotion
 
 
 @router.put("/{promotion_id}", response_model=PromotionOut)
@@ -52,7 +66,21 @@ def apply_promotion_endpoint(promo_apply: PromotionApply, db: Session = Depends(
     return apply_promotion(db, promo_apply)
 
 
-@router.get("/validate/{code}")
+@router.post("/redeem")
+def redeem_promotion_endpoint(promo_apply: PromotionApply, db: Session = Depends(get_db),
+                              idempotency_key: Optional[str] = Depends(idempotency.idempotency_key)):
+    """Apply a promotion code and count one use of it; fails once a limited code is used up"""
+    return idempotency.run(idempotency_key, "POST /promotions/redeem", promo_apply,
+                           lambda: redeem_promotion(db, promo_apply))
+
+
+@router.post("/best", response_model=BestPromotionOut)
+def best_promotions_endpoint(cart: PromotionCart, db: Session = Depends(get_db)):
+    """Rank every active promotion a cart qualifies for by the discount it gives"""
+    return best_promotions(db, cart)
+
+
+@router.get("/validate/{code}", dependencies=[rate_limit(validate_limiter)])
 def validate_promotion_code_endpoint(code: str, db: Session = Depends(get_db)):
     """Validate if a promotion code is valid"""
     is_valid = validate_promotion_code(db, code)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..dependencies.database import get_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies.conditional import conditional_get
 from ..controllers.resources import (
+    RESOURCES_CATALOG,
     create_resource, get_resources, update_resource, delete_resource,
     get_resource, update_resource_amount, get_low_stock_resources
 )
@@ -16,12 +19,20 @@ def create_resource_endpoint(resource: ResourceCreate, db: Session = Depends(get
     return create_resource(db, resource)
 
 
-@router.get("/", response_model=List[ResourceOut])
-def list_resources(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_resources(db, skip=skip, limit=limit)
+@router.get("/", response_model=List[ResourceOut], dependencies=[conditional_get(RESOURCES_CATALOG)])
+def list_resources(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db)
+):
+    resources = get_resources(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor(resources, limit, "id"))
+    return resources
 
 
-@router.get("/{resource_id}", response_model=ResourceOut)
+@router.get("/{resource_id}", response_model=ResourceOut, dependencies=[conditional_get(RESOURCES_CATALOG)])
 def get_resource_endpoint(resource_id: int, db: Session = Depends(get_db)):
     resource = get_resource(db, resource_id)
     return ResourceOut.model_validate(resource.__dict__)
@@ -46,7 +57,7 @@ def update_resource_amount_endpoint(
     return update_resource_amount(db, resource_id, amount_change)
 
 
-@router.get("/low-stock/", response_model=List[ResourceOut])
+@router.get("/low-stock/", response_model=List[ResourceOut], dependencies=[conditional_get(RESOURCES_CATALOG)])
 def get_low_stock_resources_endpoint(
     threshold: int = Query(10, description="Stock level threshold for low stock alert"),
     db: Session = Depends(get_db)
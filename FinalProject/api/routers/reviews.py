@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..dependencies.database import get_db
+from ..dependencies.pagination import next_cursor, set_next_cursor
+from ..dependencies.conditional import conditional_get
 from ..controllers.reviews import (
+    REVIEWS_CATALOG,
     create_review, get_reviews, get_review, update_review, 
     delete_review, get_review_statistics
 )
@@ -17,18 +20,22 @@ def create_review_endpoint(review: ReviewCreate, db: Session = Depends(get_db)):
     return create_review(db, review)
 
 
-@router.get("/", response_model=List[ReviewOut])
+@router.get("/", response_model=List[ReviewOut], dependencies=[conditional_get(REVIEWS_CATALOG)])
 def list_reviews(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     approved_only: bool = Query(True, description="Show only approved reviews"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get all reviews with optional filtering"""
-    return get_reviews(db, skip=skip, limit=limit, approved_only=approved_only)
+    reviews = get_reviews(db, skip=skip, limit=limit, approved_only=approved_only, cursor=cursor)
+    set_next_cursor(response, next_cursor(reviews, limit, "id"))
+    return reviews
 
 
-@router.get("/{review_id}", response_model=ReviewOut)
+@router.get("/{review_id}", response_model=ReviewOut, dependencies=[conditional_get(REVIEWS_CATALOG)])
 def get_review_endpoint(review_id: int, db: Session = Depends(get_db)):
     """Get a specific review by ID"""
     return get_review(db, review_id)
@@ -46,7 +53,7 @@ def delete_review_endpoint(review_id: int, db: Session = Depends(get_db)):
     return delete_review(db, review_id)
 
 
-@router.get("/stats/summary", response_model=ReviewStats)
+@router.get("/stats/summary", response_model=ReviewStats, dependencies=[conditional_get(REVIEWS_CATALOG)])
 def get_review_statistics_endpoint(db: Session = Depends(get_db)):
     """Get review statistics for analytics"""
     return get_review_statistics(db)
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel
+from .dishes import DishOut
 
 
 class CategoryCreate(BaseModel):
@@ -21,3 +22,11 @@ class CategoryOut(BaseModel):
 
     class ConfigDict:
         from_attributes = True
+
+
+class MenuCategoryOut(CategoryOut):
+    dishes: List[DishOut] = []
+
+
+class FullMenuOut(BaseModel):
+    categories: List[MenuCategoryOut]
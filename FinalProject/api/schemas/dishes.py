@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Optional, List
+from pydantic import BaseModel, Field
 
 
 class DishCreate(BaseModel):
@@ -28,3 +28,34 @@ class DishOut(BaseModel):
 
     class ConfigDict:
         from_attributes = True
+
+
+class DishImportRow(BaseModel):
+    """One line of a menu import; dishes are matched on (category, name)"""
+    category: str = Field(..., min_length=1, max_length=100)
+    name: str = Field(..., min_length=1, max_length=100)
+    description: Optional[str] = Field(None, max_length=300)
+    price_cents: int = Field(..., ge=0)
+    is_active: bool = True
+
+
+class MenuImportError(BaseModel):
+    line: int
+    error: str
+
+
+class MenuImportResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: List[MenuImportError]
+
+
+class PriceAdjustment(BaseModel):
+    percent: float = Field(..., gt=-100, description="e.g. 5 raises prices by 5%, -10 lowers them by 10%")
+
+
+class PriceAdjustmentResult(BaseModel):
+    category_id: int
+    percent: float
+    updated: int
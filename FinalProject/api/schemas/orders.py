@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from .order_details import OrderDetail
+from ..dependencies.config import conf
 
 
 class OrderItemCreate(BaseModel):
@@ -18,8 +19,31 @@ class GuestOrderCreate(BaseModel):
     items: List[OrderItemCreate]
 
 
+class GuestOrderBatchCreate(BaseModel):
+    orders: List[GuestOrderCreate] = Field(..., max_length=conf.max_guest_order_batch)
+
+
 class OrderStatusUpdate(BaseModel):
     status: str  # pending, confirmed, preparing, ready, out_for_delivery, delivered, cancelled
+    expected_status: Optional[str] = None  # only apply if the order is still in this status
+
+
+class OrderStatusBatchUpdate(BaseModel):
+    order_numbers: List[str] = Field(..., min_length=1, max_length=conf.max_status_batch)
+    status: str
+    expected_status: Optional[str] = None
+
+
+class OrderStatusConflict(BaseModel):
+    order_number: str
+    status: str  # the status the order is actually in
+
+
+class OrderStatusBatchOut(BaseModel):
+    status: str
+    updated: List[str]
+    conflicts: List[OrderStatusConflict]
+    not_found: List[str]
 
 
 class PaymentUpdate(BaseModel):
@@ -63,3 +87,17 @@ class Order(OrderBase):
 
     class ConfigDict:
         from_attributes = True
+
+
+class GuestOrderBatchItemResult(BaseModel):
+    index: int  # position of the order in the submitted batch
+    success: bool
+    order: Optional[OrderOut] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class GuestOrderBatchOut(BaseModel):
+    created: int
+    failed: int
+    results: List[GuestOrderBatchItemResult]
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from .orders import OrderItemCreate
 
 
 class PromotionCreate(BaseModel):
@@ -43,3 +44,29 @@ class PromotionOut(BaseModel):
 class PromotionApply(BaseModel):
     code: str
     order_total_cents: int
+
+
+class PromotionCart(BaseModel):
+    """A cart to find promotions for: its total, or its items priced from the menu"""
+    order_total_cents: Optional[int] = Field(None, ge=0)
+    items: Optional[List[OrderItemCreate]] = None
+    limit: int = Field(10, ge=1, le=100, description="Promotions listed in the ranking")
+
+    @model_validator(mode="after")
+    def total_or_items(self):
+        if (self.order_total_cents is None) == (self.items is None):
+            raise ValueError("Send either order_total_cents or items")
+        return self
+
+
+class PromotionQuote(BaseModel):
+    code: str
+    discount_percent: int
+    discount_amount_cents: int
+    final_total_cents: int
+
+
+class BestPromotionOut(BaseModel):
+    order_total_cents: int
+    best: Optional[PromotionQuote] = None
+    ranked: List[PromotionQuote]
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import Optional, List
+from pydantic import BaseModel, Field
 from .resources import Resource
 from .sandwiches import Sandwich
 
@@ -24,4 +24,16 @@ class Recipe(RecipeBase):
     resource: Resource = None
 
     class ConfigDict:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DishRecipeItem(BaseModel):
+    resource_id: int
+    amount: int = Field(..., gt=0, description="Resource units consumed per dish")
+
+
+class DishRecipe(BaseModel):
+    items: List[DishRecipeItem]
+
+
+class DishRecipeOut(DishRecipe):
+    dish_id: int
@@ -1 +1 @@
-from . import test_orders, test_menu, test_resources, test_sprint2, test_sprint3_4
+from . import test_orders, test_menu, test_resources, test_sprint2, test_sprint3_4, test_migrations
@@ -1,8 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from ..dependencies.database import Base, get_db
+from ..dependencies.cache import bump_version
+from ..controllers.menu import MENU_CATALOG, menu_catalog
+from ..models.dishes import Dish
 from ..main import app
 
 # Test database
@@ -141,3 +145,227 @@ def test_delete_dish():
     # Verify dish is not active
     get_response = client.get(f"/menu/dishes/{dish_id}")
     assert get_response.status_code == 404
+
+
+def capture_statements(call):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        response = call()
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def create_menu(dish_count):
+    category_id = client.post("/menu/categories", json={"name": "Mains"}).json()["id"]
+    return [
+        client.post("/menu/dishes", json={"name": f"Dish {i}", "price_cents": 500 + i, "category_id": category_id}).json()["id"]
+        for i in range(dish_count)
+    ]
+
+
+def test_menu_catalog_serves_reads_from_memory():
+    dish_ids = create_menu(5)
+    client.get("/menu/dishes")
+
+    response, statements = capture_statements(lambda: client.get("/menu/dishes?limit=2"))
+    assert [dish["id"] for dish in response.json()] == dish_ids[:2]
+    # Only catalog versions are read
+    assert statements and all("catalog_versions" in statement for statement in statements)
+
+    cursor = response.headers["X-Next-Cursor"]
+    assert [dish["id"] for dish in client.get(f"/menu/dishes?limit=2&cursor={cursor}").json()] == dish_ids[2:4]
+    assert [dish["id"] for dish in client.get("/menu/dishes?skip=3").json()] == dish_ids[3:]
+
+    # This worker's own writes show up on the next read
+    client.put(f"/menu/dishes/{dish_ids[0]}", json={"price_cents": 999})
+    client.delete(f"/menu/dishes/{dish_ids[1]}")
+    dishes = client.get("/menu/dishes").json()
+    assert [dish["id"] for dish in dishes] == [dish_ids[0]] + dish_ids[2:]
+    assert dishes[0]["price_cents"] == 999
+    assert client.get(f"/menu/dishes/{dish_ids[1]}").status_code == 404
+
+
+def test_menu_catalog_reloads_after_another_worker_writes():
+    dish_id = create_menu(1)[0]
+    assert client.get(f"/menu/dishes/{dish_id}").json()["price_cents"] == 500
+
+    # A write committed elsewhere only moves the version row
+    with TestingSessionLocal() as db:
+        db.execute(update(Dish.__table__).where(Dish.id == dish_id).values(price_cents=750))
+        bump_version(db, MENU_CATALOG)
+        db.commit()
+
+    assert client.get(f"/menu/dishes/{dish_id}").json()["price_cents"] == 750
+
+
+def test_guest_order_is_priced_from_menu_catalog():
+    dish_id = create_menu(1)[0]
+    client.get("/menu/dishes")
+
+    response, statements = capture_statements(lambda: client.post("/orders/guest", json={
+        "customer_name": "Guest", "customer_phone": "555-0100", "items": [{"dish_id": dish_id, "qty": 2}]
+    }))
+    assert response.status_code == 200
+    assert response.json()["total_cents"] == 1000
+    assert not any("FROM dishes" in statement for statement in statements)
+
+
+def test_full_menu_snapshot():
+    dish_ids = create_menu(3)
+    client.delete(f"/menu/dishes/{dish_ids[1]}")
+    empty_category_id = client.post("/menu/categories", json={"name": "Specials"}).json()["id"]
+
+    response = client.get("/menu/full", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    categories = response.json()["categories"]
+    assert [category["name"] for category in categories] == ["Mains", "Specials"]
+    assert [dish["id"] for dish in categories[0]["dishes"]] == [dish_ids[0], dish_ids[2]]
+    assert categories[1]["id"] == empty_category_id and categories[1]["dishes"] == []
+
+    identity = client.get("/menu/full", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+    assert identity.json() == response.json()
+    # Each content-coding is its own representation with its own strong validator
+    etag = response.headers["ETag"]
+    assert etag.endswith('-gz"')
+    assert identity.headers["ETag"] == etag.replace("-gz", "")
+
+    # Revalidation reads only the catalog version, never categories or dishes
+    not_modified, statements = capture_statements(
+        lambda: client.get("/menu/full", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    identity_revalidated = client.get("/menu/full", headers={"If-None-Match": identity.headers["ETag"],
+                                                             "Accept-Encoding": "identity"})
+    assert identity_revalidated.status_code == 304
+    assert identity_revalidated.headers["ETag"] == identity.headers["ETag"]
+    assert not any("FROM dishes" in statement or "FROM categories" in statement for statement in statements)
+
+    client.put(f"/menu/dishes/{dish_ids[0]}", json={"price_cents": 100})
+    changed = client.get("/menu/full", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["categories"][0]["dishes"][0]["price_cents"] == 100
+
+
+def test_search_dishes():
+    pasta_id = client.post("/menu/categories", json={"name": "Pasta"}).json()["id"]
+    drinks_id = client.post("/menu/categories", json={"name": "Drinks"}).json()["id"]
+
+    def add_dish(name, description, category_id):
+        return client.post("/menu/dishes", json={
+            "name": name, "description": description, "price_cents": 900, "category_id": category_id
+        }).json()["id"]
+
+    carbonara = add_dish("Spaghetti Carbonara", "Egg, pecorino and guanciale", pasta_id)
+    lasagna = add_dish("Lasagna", "Baked with spaghetti sauce", pasta_id)
+    lemonade = add_dish("Lemonade", "Fresh lemons", drinks_id)
+
+    def search(q):
+        response = client.get("/menu/search", params={"q": q})
+        assert response.status_code == 200
+        return [dish["id"] for dish in response.json()]
+
+    # A hit in the name outranks one in the description; prefixes match
+    assert search("spaghetti") == [carbonara, lasagna]
+    assert search("spag") == [carbonara, lasagna]
+    assert search("lemon") == [lemonade]
+    # Category names are searchable and every word must match
+    assert search("drinks") == [lemonade]
+    assert search("pasta carbonara") == [carbonara]
+    assert search("pasta lemon") == []
+    assert search("?!") == []
+    assert client.get("/menu/search", params={"q": ""}).status_code == 422
+
+    # The index follows menu writes
+    client.put(f"/menu/dishes/{lemonade}", json={"name": "Iced Tea", "description": "Black tea"})
+    assert search("lemon") == []
+    assert search("tea") == [lemonade]
+    client.delete(f"/menu/dishes/{carbonara}")
+    assert search("spaghetti") == [lasagna]
+    client.put(f"/menu/categories/{drinks_id}", json={"name": "Beverages"})
+    assert search("drinks") == []
+    assert search("beverages") == [lemonade]
+    # Deactivating a category takes its dishes out of search, reactivating it brings them back
+    client.delete(f"/menu/categories/{drinks_id}")
+    assert search("tea") == []
+    client.put(f"/menu/categories/{drinks_id}", json={"is_active": True})
+    assert search("tea") == [lemonade]
+
+
+def test_import_menu_csv_and_ndjson():
+    dish_id = create_menu(1)[0]  # "Dish 0" in "Mains"
+    client.post("/menu/categories", json={"name": "Drinks"})
+
+    csv_body = (
+        "category,name,description,price_cents,is_active\n"
+        "Mains,Dish 0,Now with fries,650,\n"
+        "Mains,Steak,Sirloin,2400,true\n"
+        "Drinks,Cola,,250,\n"
+        "Desserts,Cake,,700,\n"
+        "Drinks,Tea,,free,\n"
+        "Drinks,Cola,,300,\n"
+    )
+    response = client.post("/menu/import?format=csv", content=csv_body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["updated"], result["failed"]) == (2, 1, 2)
+    assert [error["line"] for error in result["errors"]] == [5, 6]
+    assert "Desserts" in result["errors"][0]["error"]
+    assert result["errors"][1]["error"].startswith("price_cents")
+
+    dishes = {dish["name"]: dish for dish in client.get("/menu/dishes").json()}
+    assert dishes["Dish 0"]["id"] == dish_id
+    assert (dishes["Dish 0"]["price_cents"], dishes["Dish 0"]["description"]) == (650, "Now with fries")
+    assert dishes["Cola"]["price_cents"] == 300  # the later line wins
+    assert [dish["name"] for dish in client.get("/menu/search", params={"q": "sirloin"}).json()] == ["Steak"]
+
+    ndjson_body = '{"category": "Mains", "name": "Steak", "price_cents": 2600, "is_active": false}\nnot json\n'
+    result = client.post("/menu/import?format=ndjson", content=ndjson_body).json()
+    assert (result["created"], result["updated"], result["failed"]) == (0, 1, 1)
+    assert result["errors"] == [{"line": 2, "error": "Invalid JSON"}]
+    assert "Steak" not in [dish["name"] for dish in client.get("/menu/dishes").json()]
+
+
+def test_adjust_category_prices():
+    dish_ids = create_menu(2)  # 500 and 501 cents
+    other_id = client.post("/menu/categories", json={"name": "Drinks"}).json()["id"]
+    drink_id = client.post("/menu/dishes", json={"name": "Cola", "price_cents": 250, "category_id": other_id}).json()["id"]
+    category_id = client.get(f"/menu/dishes/{dish_ids[0]}").json()["category_id"]
+
+    response = client.post(f"/menu/categories/{category_id}/prices", json={"percent": 10})
+    assert response.status_code == 200
+    assert response.json()["updated"] == 2
+    assert [client.get(f"/menu/dishes/{dish_id}").json()["price_cents"] for dish_id in dish_ids] == [550, 551]
+    assert client.get(f"/menu/dishes/{drink_id}").json()["price_cents"] == 250
+
+    assert client.post(f"/menu/categories/{category_id}/prices", json={"percent": -100}).status_code == 422
+    assert client.post("/menu/categories/9999/prices", json={"percent": 5}).status_code == 404
+
+
+def test_menu_conditional_get_refreshes_catalog(monkeypatch):
+    dish_id = create_menu(1)[0]
+    # Trust the catalog for a long time; the conditional check still sees other workers' bumps
+    monkeypatch.setattr(menu_catalog, "check_interval", 3600)
+    response = client.get("/menu/dishes")
+    etag = response.headers["ETag"]
+    assert client.get("/menu/dishes", headers={"If-None-Match": etag}).status_code == 304
+
+    with TestingSessionLocal() as db:
+        db.execute(update(Dish.__table__).where(Dish.id == dish_id).values(price_cents=750))
+        bump_version(db, MENU_CATALOG)
+        db.commit()
+
+    changed = client.get("/menu/dishes", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["price_cents"] == 750
@@ -0,0 +1,53 @@
+from sqlalchemy import create_engine, inspect, text
+from .. import migrations
+
+
+def index_names(engine, table_name):
+    return {index["name"] for index in inspect(engine).get_indexes(table_name)}
+
+
+def test_upgrade_legacy_database(tmp_path):
+    """Test migrating a database laid out by the old create_all-at-import code"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE orders (id INTEGER PRIMARY KEY, order_number VARCHAR(50) NOT NULL UNIQUE, "
+            "customer_name VARCHAR(100) NOT NULL, customer_phone VARCHAR(20) NOT NULL, "
+            "customer_address VARCHAR(300), is_delivery BOOLEAN NOT NULL, status VARCHAR(16) NOT NULL, "
+            "total_cents INTEGER NOT NULL, payment_method VARCHAR(50), payment_status VARCHAR(50) NOT NULL, "
+            "order_date DATETIME NOT NULL, description VARCHAR(300))"
+        ))
+        connection.execute(text(
+            "CREATE TABLE order_details (id INTEGER PRIMARY KEY, order_id INTEGER REFERENCES orders (id), "
+            "dish_id INTEGER, qty INTEGER NOT NULL, unit_price_cents INTEGER NOT NULL, "
+            "line_total_cents INTEGER NOT NULL)"
+        ))
+        connection.execute(text("CREATE INDEX ix_order_details_qty ON order_details (qty)"))
+
+    assert migrations.current_version(engine) == 0
+
+    applied = migrations.upgrade(engine)
+    assert [migration.version for migration in applied] == list(range(1, migrations.LATEST_VERSION + 1))
+    assert migrations.current_version(engine) == migrations.LATEST_VERSION
+
+    order_detail_indexes = index_names(engine, "order_details")
+    assert "ix_order_details_qty" not in order_detail_indexes
+    assert {"ix_order_details_order_id", "ix_order_details_dish_id"} <= order_detail_indexes
+    assert {"ix_orders_status_order_date_id", "ix_orders_customer_phone"} <= index_names(engine, "orders")
+    assert "ix_reviews_order_number" in index_names(engine, "reviews")
+    assert "ix_dishes_category_id_is_active_id" in index_names(engine, "dishes")
+    assert "ix_promotions_is_active_expires_at" in index_names(engine, "promotions")
+
+    # Already up to date: nothing left to apply
+    assert migrations.upgrade(engine) == []
+
+
+def test_upgrade_fresh_database(tmp_path):
+    """Test that a fresh database gets the full schema in one upgrade"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    migrations.upgrade(engine)
+
+    tables = set(inspect(engine).get_table_names())
+    assert {"orders", "order_details", "dishes", "categories", "order_events", "schema_version", "dish_search",
+            "orders_archive_status_counts", "worker_leases"} <= tables
+    assert migrations.pending(engine) == []
@@ -3,9 +3,18 @@ from ..controllers import orders as controller
 from ..main import app
 import pytest
 from ..models import orders as model
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from ..dependencies.database import Base, get_db
+from ..dependencies import idempotency, order_numbers, group_commit
+from ..schemas import orders as schema
+from concurrent.futures import Future, ThreadPoolExecutor
+from fastapi import HTTPException
+from ..controllers import order_archive, inventory
+from ..models.order_archive import ArchivedOrder, ArchivedOrderDetail, ArchivedStatusCount
+from datetime import datetime, timedelta
+import uuid
 
 # Test database - Use SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -112,3 +121,558 @@ def test_create_guest_order():
     assert fetch_data["order_number"] == order_number
     assert fetch_data["total_cents"] == expected_total
     assert len(fetch_data["items"]) == 2
+
+
+def test_create_guest_order_unknown_dish_writes_nothing():
+    category_response = client.post("/menu/categories", json={"name": "Soups", "description": "Hot soups"})
+    category_id = category_response.json()["id"]
+    dish_response = client.post("/menu/dishes", json={
+        "name": "Tomato Soup",
+        "price_cents": 700,
+        "category_id": category_id
+    })
+    dish_id = dish_response.json()["id"]
+
+    order_data = {
+        "customer_name": "Jane Smith",
+        "customer_phone": "555-1234",
+        "items": [
+            {"dish_id": dish_id, "qty": 1},
+            {"dish_id": 9999, "qty": 1}
+        ]
+    }
+    response = client.post("/orders/guest", json=order_data)
+    assert response.status_code == 404
+
+    # The failed cart must not leave a half-written order behind
+    db = TestingSessionLocal()
+    try:
+        assert db.query(model.Order).count() == 0
+    finally:
+        db.close()
+
+
+def test_create_guest_order_repeated_dish_lines():
+    category_response = client.post("/menu/categories", json={"name": "Drinks", "description": "Cold drinks"})
+    category_id = category_response.json()["id"]
+    dish_response = client.post("/menu/dishes", json={
+        "name": "Lemonade",
+        "price_cents": 250,
+        "category_id": category_id
+    })
+    dish_id = dish_response.json()["id"]
+
+    order_data = {
+        "customer_name": "Jane Smith",
+        "customer_phone": "555-1234",
+        "items": [
+            {"dish_id": dish_id, "qty": 2},
+            {"dish_id": dish_id, "qty": 3}
+        ]
+    }
+    response = client.post("/orders/guest", json=order_data)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_cents"] == 250 * 5
+    assert [item["qty"] for item in data["items"]] == [2, 3]
+    assert data["items"][0]["id"] < data["items"][1]["id"]
+
+
+def test_staff_orders_query_count_is_constant():
+    category_response = client.post("/menu/categories", json={"name": "Bowls", "description": "Rice bowls"})
+    category_id = category_response.json()["id"]
+    dish_response = client.post("/menu/dishes", json={
+        "name": "Teriyaki Bowl",
+        "price_cents": 1100,
+        "category_id": category_id
+    })
+    dish_id = dish_response.json()["id"]
+
+    def place_orders(count):
+        for i in range(count):
+            client.post("/orders/guest", json={
+                "customer_name": f"Customer {i}",
+                "customer_phone": "555-0000",
+                "items": [{"dish_id": dish_id, "qty": 1}, {"dish_id": dish_id, "qty": 2}]
+            })
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def queries_for_staff_orders():
+        statements.clear()
+        event.listen(Engine, "before_cursor_execute", count_statement)
+        try:
+            response = client.get("/dashboard/staff/orders")
+        finally:
+            event.remove(Engine, "before_cursor_execute", count_statement)
+        assert response.status_code == 200
+        return len(response.json()), len(statements)
+
+    place_orders(2)
+    small_page, small_queries = queries_for_staff_orders()
+    place_orders(20)
+    large_page, large_queries = queries_for_staff_orders()
+
+    assert (small_page, large_page) == (2, 22)
+    assert small_queries == large_queries == 2
+
+
+def test_create_guest_orders_batch():
+    category_response = client.post("/menu/categories", json={"name": "Pizza", "description": "Italian pizza"})
+    category_id = category_response.json()["id"]
+    dish_response = client.post("/menu/dishes", json={
+        "name": "Margherita",
+        "price_cents": 1200,
+        "category_id": category_id
+    })
+    dish_id = dish_response.json()["id"]
+
+    batch = {"orders": [
+        {"customer_name": "Kiosk 1", "customer_phone": "555-0001", "items": [{"dish_id": dish_id, "qty": 1}]},
+        {"customer_name": "Kiosk 2", "customer_phone": "555-0002", "items": [{"dish_id": 9999, "qty": 1}]},
+        {"customer_name": "Kiosk 3", "customer_phone": "555-0003", "items": [{"dish_id": dish_id, "qty": 0}]},
+        {"customer_name": "Kiosk 4", "customer_phone": "555-0004", "items": [{"dish_id": dish_id, "qty": 3}]}
+    ]}
+    response = client.post("/orders/guest/batch", json=batch)
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    results = data["results"]
+    assert [result["success"] for result in results] == [True, False, False, True]
+    assert results[1]["status_code"] == 404
+    assert results[2]["status_code"] == 422
+    assert results[3]["order"]["total_cents"] == 3600
+
+    # Each accepted order is readable with its own line items
+    order_number = results[3]["order"]["order_number"]
+    fetch_data = client.get(f"/orders/number/{order_number}").json()
+    assert fetch_data["total_cents"] == 3600
+    assert [item["qty"] for item in fetch_data["items"]] == [3]
+
+
+def create_pizza_dish():
+    category_response = client.post("/menu/categories", json={"name": "Pizza", "description": "Italian pizza"})
+    dish_response = client.post("/menu/dishes", json={
+        "name": "Margherita",
+        "price_cents": 1200,
+        "category_id": category_response.json()["id"]
+    })
+    return dish_response.json()["id"]
+
+
+@pytest.mark.parametrize("store", [
+    idempotency.MemoryIdempotencyStore(),
+    idempotency.DatabaseIdempotencyStore(session_factory=TestingSessionLocal)
+], ids=["memory", "database"])
+def test_guest_order_idempotency_key(monkeypatch, store):
+    monkeypatch.setattr(idempotency, "store", store)
+    dish_id = create_pizza_dish()
+    order_data = {"customer_name": "Retry", "customer_phone": "555-0100", "items": [{"dish_id": dish_id, "qty": 2}]}
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/orders/guest", json=order_data, headers=headers)
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = client.post("/orders/guest", json=order_data, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    with TestingSessionLocal() as db:
+        assert db.query(model.Order).count() == 1
+
+    # Reusing the key for a different cart is a client error, not a replay
+    order_data["items"][0]["qty"] = 3
+    conflict = client.post("/orders/guest", json=order_data, headers=headers)
+    assert conflict.status_code == 422
+
+
+def test_idempotency_key_released_when_request_fails():
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    order_data = {"customer_name": "Retry", "customer_phone": "555-0100", "items": [{"dish_id": 9999, "qty": 1}]}
+
+    assert client.post("/orders/guest", json=order_data, headers=headers).status_code == 404
+
+    # Once the dish exists the same request succeeds under the same key
+    order_data["items"][0]["dish_id"] = create_pizza_dish()
+    response = client.post("/orders/guest", json=order_data, headers=headers)
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_memory_idempotency_store_is_bounded():
+    store = idempotency.MemoryIdempotencyStore(max_entries=2, ttl=60)
+    stored = idempotency.StoredResponse(200, "{}")
+    for key in ("a", "b", "c"):
+        assert store.begin(key, "hash") is None
+        store.complete(key, "hash", stored)
+
+    assert list(store.entries) == ["b", "c"]
+    assert store.begin("c", "hash") is stored
+    assert store.begin("a", "hash") is None
+
+
+def test_time_ordered_order_numbers():
+    ticks = iter([1.0, 1.0, 1.0, 0.5, 2.0])  # the clock steps back once
+    generator = order_numbers.TimeOrderedOrderNumbers(worker_id=7, clock=lambda: 1767225600 + next(ticks))
+    numbers = [generator.next() for _ in range(5)]
+
+    assert len(set(numbers)) == 5
+    assert numbers == sorted(numbers)
+    assert all(len(number) == order_numbers.ENCODED_LENGTH for number in numbers)
+
+    # Distinct workers never collide within the same millisecond
+    other = order_numbers.TimeOrderedOrderNumbers(worker_id=8, clock=lambda: 1767225601.0)
+    assert other.next() not in numbers
+
+
+def test_worker_id_leases_are_unique():
+    """Test that concurrent workers lease distinct ids, expired leases are reused and exhaustion fails loudly"""
+    from ..models.worker_leases import WorkerLease
+
+    holders = [order_numbers.WorkerLeaseHolder(ttl=60) for _ in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        worker_ids = list(pool.map(lambda holder: holder.ensure(engine), holders))
+    assert sorted(worker_ids) == list(range(16))
+
+    # A holder keeps its id across renewals; a released id goes to the next claimer
+    holders[3].renewed_at = 0.0
+    assert holders[3].ensure(engine) == worker_ids[3]
+    holders[0].release(engine)
+    assert order_numbers.WorkerLeaseHolder(ttl=60).ensure(engine) == worker_ids[0]
+
+    with TestingSessionLocal() as db:
+        db.query(WorkerLease).filter(WorkerLease.worker_id == worker_ids[5]).update(
+            {"expires_at": datetime.now() - timedelta(seconds=1)}
+        )
+        db.add_all([WorkerLease(worker_id=worker_id, owner="elsewhere", expires_at=datetime.now() + timedelta(hours=1))
+                    for worker_id in range(16, order_numbers.MAX_WORKER_ID + 1)])
+        db.commit()
+    # The lapsed holder finds its id taken over and moves on, never sharing it
+    taker = order_numbers.WorkerLeaseHolder(ttl=60)
+    assert taker.ensure(engine) == worker_ids[5]
+    holders[5].renewed_at = 0.0
+    with pytest.raises(RuntimeError, match="worker ids are leased"):
+        holders[5].ensure(engine)
+
+
+def test_order_lookup_cache_invalidated_by_status_update():
+    order_data = {"customer_name": "Tracker", "customer_phone": "555-0101",
+                  "items": [{"dish_id": create_pizza_dish(), "qty": 1}]}
+    order_number = client.post("/orders/guest", json=order_data).json()["order_number"]
+    before = client.get("/dashboard/manager/cache-stats").json()["orders"]
+
+    first = client.get(f"/orders/number/{order_number}")
+    second = client.get(f"/orders/number/{order_number}")
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["status"] == "pending"
+
+    after = client.get("/dashboard/manager/cache-stats").json()["orders"]
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    client.patch(f"/orders/{order_number}/status", json={"status": "confirmed"})
+    assert client.get(f"/orders/number/{order_number}").json()["status"] == "confirmed"
+    assert client.get("/dashboard/manager/cache-stats").json()["orders"]["invalidations"] > after["invalidations"]
+
+    assert client.get("/orders/number/missing").status_code == 404
+
+
+def place_guest_orders(count):
+    dish_id = create_pizza_dish()
+    order_data = {"customer_name": "Kitchen", "customer_phone": "555-0102", "items": [{"dish_id": dish_id, "qty": 1}]}
+    return [client.post("/orders/guest", json=order_data).json()["order_number"] for _ in range(count)]
+
+
+def test_order_status_transitions_are_conditional():
+    order_number, = place_guest_orders(1)
+    assert client.patch(f"/orders/{order_number}/status", json={"status": "confirmed"}).status_code == 200
+
+    # Skipping ahead, stale expectations and unknown orders are rejected
+    skip = client.patch(f"/orders/{order_number}/status", json={"status": "ready"})
+    assert skip.status_code == 409
+    stale = client.patch(f"/orders/{order_number}/status", json={"status": "cancelled", "expected_status": "pending"})
+    assert stale.status_code == 409
+    assert client.patch("/orders/missing/status", json={"status": "confirmed"}).status_code == 404
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.patch(f"/orders/{order_number}/status",
+                                json={"status": "preparing", "expected_status": "confirmed"})
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+    assert response.status_code == 200
+    # The conditional UPDATE and the order event insert; no SELECT before the write
+    assert len(statements) == 2
+    assert statements[0].lstrip().upper().startswith("UPDATE")
+
+    # A lost compare-and-set costs one lookup after the UPDATE to name the current status
+    statements.clear()
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.patch(f"/orders/{order_number}/status",
+                                json={"status": "cancelled", "expected_status": "confirmed"})
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+    assert response.status_code == 409
+    assert "preparing" in response.json()["detail"]
+    assert [statement.lstrip().split()[0].upper() for statement in statements] == ["UPDATE", "SELECT"]
+    assert client.get(f"/orders/number/{order_number}").json()["status"] == "preparing"
+
+
+def test_bulk_order_status_transition():
+    order_numbers = place_guest_orders(3)
+    client.patch(f"/orders/{order_numbers[2]}/status", json={"status": "cancelled"})
+
+    response = client.patch("/orders/status/batch", json={
+        "order_numbers": order_numbers + ["missing"],
+        "status": "confirmed"
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["updated"] == order_numbers[:2]
+    assert data["conflicts"] == [{"order_number": order_numbers[2], "status": "cancelled"}]
+    assert data["not_found"] == ["missing"]
+
+    for order_number in order_numbers[:2]:
+        assert client.get(f"/orders/number/{order_number}").json()["status"] == "confirmed"
+
+
+def test_archive_finished_orders():
+    order_numbers = place_guest_orders(5)
+    for order_number in order_numbers[:4]:
+        client.patch(f"/orders/{order_number}/status", json={"status": "cancelled"})
+    client.post("/reviews/", json={"order_number": order_numbers[3], "customer_name": "Kitchen", "rating": 5})
+    with TestingSessionLocal() as db:
+        db.query(model.Order).update({model.Order.order_date: datetime.now() - timedelta(days=60)})
+        db.commit()
+
+    with TestingSessionLocal() as db:
+        moved = order_archive.archive_orders(db, older_than_days=30, batch_size=2)
+    # The reviewed order and the unfinished one stay live
+    assert moved == 3
+
+    with TestingSessionLocal() as db:
+        live = {order.order_number for order in db.query(model.Order)}
+        assert live == {order_numbers[3], order_numbers[4]}
+        assert db.query(ArchivedOrder).count() == 3
+        assert db.query(ArchivedOrderDetail).count() == 3
+
+    archived = client.get(f"/orders/number/{order_numbers[0]}")
+    assert archived.status_code == 200
+    assert archived.json()["status"] == "cancelled"
+    assert [item["qty"] for item in archived.json()["items"]] == [1]
+
+    # Analytics see live and archived orders alike
+    assert client.get("/analytics/customers").json()["total_orders"] == 5
+    assert client.get("/analytics/sales", params={"days": 90}).json()["orders_by_status"]["cancelled"] == 4
+    assert client.get("/analytics/popular-dishes").json()[0]["order_count"] == 5
+    # The archive job keeps the archived status counts the dashboard adds to live ones
+    assert client.get("/dashboard/manager/orders-summary").json()["orders_by_status"]["cancelled"] == 4
+
+
+def test_archive_never_reuses_detail_ids():
+    """Test an order holding the newest detail row waits, so SQLite cannot hand its detail id out again"""
+    from ..models.order_details import OrderDetail
+
+    def archive_cancelled(order_numbers):
+        for order_number in order_numbers:
+            client.patch(f"/orders/{order_number}/status", json={"status": "cancelled"})
+        with TestingSessionLocal() as db:
+            db.query(model.Order).update({model.Order.order_date: datetime.now() - timedelta(days=60)})
+            db.commit()
+            return order_archive.archive_orders(db, older_than_days=30)
+
+    dish_id = create_pizza_dish()
+
+    def place(count):
+        order_data = {"customer_name": "Kitchen", "customer_phone": "555-0104", "items": [{"dish_id": dish_id, "qty": 1}]}
+        return [client.post("/orders/guest", json=order_data).json()["order_number"] for _ in range(count)]
+
+    first, newest = place(2)
+    with TestingSessionLocal() as db:
+        # A detail added to the older order after the newer order was placed
+        order = db.query(model.Order).filter(model.Order.order_number == first).one()
+        detail = db.query(OrderDetail).filter(OrderDetail.order_id == order.id).one()
+        db.add(OrderDetail(order_id=order.id, dish_id=detail.dish_id, qty=1,
+                           unit_price_cents=detail.unit_price_cents, line_total_cents=detail.unit_price_cents))
+        db.commit()
+    assert archive_cancelled([first]) == 0
+
+    later, _ = place(2)
+    assert archive_cancelled([first, newest, later]) == 3
+    with TestingSessionLocal() as db:
+        assert db.query(ArchivedOrderDetail).count() == 4
+        assert db.query(OrderDetail).count() == 1
+
+@pytest.fixture
+def fresh_recipe_book():
+    # The recipe book is per process and would outlive this test's database
+    inventory.recipe_book.invalidate()
+    yield
+    inventory.recipe_book.invalidate()
+
+
+def test_confirming_orders_consumes_recipe_stock(fresh_recipe_book):
+    dish_id = create_pizza_dish()
+    dough = client.post("/resources/", json={"name": "Dough", "amount": 5, "unit": "balls"}).json()["id"]
+    cheese = client.post("/resources/", json={"name": "Cheese", "amount": 300, "unit": "g"}).json()["id"]
+    recipe = client.put(f"/menu/dishes/{dish_id}/recipe", json={"items": [
+        {"resource_id": dough, "amount": 1},
+        {"resource_id": cheese, "amount": 100}
+    ]})
+    assert recipe.status_code == 200
+    assert client.get(f"/menu/dishes/{dish_id}/recipe").json()["items"][1] == {"resource_id": cheese, "amount": 100}
+
+    def place(qty):
+        order_data = {"customer_name": "Stock", "customer_phone": "555-0103", "items": [{"dish_id": dish_id, "qty": qty}]}
+        return client.post("/orders/guest", json=order_data).json()["order_number"]
+
+    def stock():
+        return [client.get(f"/resources/{resource_id}").json()["amount"] for resource_id in (dough, cheese)]
+
+    first, second = place(1), place(1)
+    response = client.patch("/orders/status/batch", json={"order_numbers": [first, second], "status": "confirmed"})
+    assert response.json()["updated"] == [first, second]
+    assert stock() == [3, 100]
+
+    # Two more pizzas need 200 g of cheese: rejected, and neither stock nor status changes
+    large = place(2)
+    response = client.patch(f"/orders/{large}/status", json={"status": "confirmed"})
+    assert response.status_code == 409
+    assert "Cheese" in response.json()["detail"]
+    assert stock() == [3, 100]
+    assert client.get(f"/orders/number/{large}").json()["status"] == "pending"
+
+    # Another worker halves the cheese: its version bump reaches this worker's recipe book at once
+    from ..dependencies.cache import bump_version
+    from ..models.recipes import Recipe
+    with TestingSessionLocal() as db:
+        db.query(Recipe).filter(Recipe.dish_id == dish_id, Recipe.resource_id == cheese).update({"amount": 50})
+        bump_version(db, inventory.RECIPES_CATALOG)
+        db.commit()
+    response = client.patch(f"/orders/{large}/status", json={"status": "confirmed"})
+    assert response.status_code == 200
+    assert stock() == [1, 0]
+
+
+def test_group_commit_batches_concurrent_orders(monkeypatch):
+    dish_id = create_pizza_dish()
+    writer = group_commit.GroupCommitWriter(session_factory=TestingSessionLocal, window_ms=50, max_batch=8)
+    monkeypatch.setattr(group_commit, "writer", writer)
+    payload = schema.GuestOrderCreate(customer_name="Rush", customer_phone="555-0104",
+                                      items=[{"dish_id": dish_id, "qty": 2}])
+
+    def place(_):
+        with TestingSessionLocal() as db:
+            return controller.create_guest_order(db, payload)
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            orders = list(pool.map(place, range(16)))
+    finally:
+        writer.stop()
+
+    assert len({order.order_number for order in orders}) == 16
+    assert all(order.total_cents == 2400 and len(order.items) == 1 for order in orders)
+    with TestingSessionLocal() as db:
+        assert db.query(model.Order).count() == 16
+
+    stats = client.get("/dashboard/manager/write-stats").json()
+    assert stats["group_commit"] is True
+    assert stats["operations"] == 16
+    assert stats["batches"] < 16
+    assert stats["max_batch_size"] <= 8
+
+
+def test_group_commit_failure_only_fails_its_caller():
+    writer = group_commit.GroupCommitWriter(session_factory=TestingSessionLocal)
+    order_numbers = place_guest_orders(2)
+
+    def confirm(order_number):
+        return lambda db: controller._transition_orders(db, [order_number], model.OrderStatus.CONFIRMED)
+
+    def reject(db):
+        raise HTTPException(status_code=409, detail="rejected")
+
+    batch = [(confirm(order_numbers[0]), Future()), (reject, Future()), (confirm(order_numbers[1]), Future())]
+    writer._commit_batch(batch)
+
+    assert list(batch[0][1].result()) == [order_numbers[0]]
+    assert batch[1][1].exception().status_code == 409
+    assert list(batch[2][1].result()) == [order_numbers[1]]
+    assert writer.stats()["fallbacks"] == 1
+    with TestingSessionLocal() as db:
+        assert {order.status for order in db.query(model.Order)} == {model.OrderStatus.CONFIRMED}
+
+
+def test_orders_summary_counts_all_orders_in_one_query():
+    statuses = [model.OrderStatus.PENDING] * 40000 + [model.OrderStatus.PREPARING] * 25000 + \
+        [model.OrderStatus.READY] * 5000 + [model.OrderStatus.DELIVERED] * 29000 + [model.OrderStatus.CANCELLED] * 1000 + \
+        [model.OrderStatus.CONFIRMED] * 300 + [model.OrderStatus.OUT_FOR_DELIVERY] * 200
+    order_date = datetime.now()
+    with TestingSessionLocal() as db:
+        db.execute(model.Order.__table__.insert(), [{
+            "order_number": f"SUMMARY{index:06d}",
+            "customer_name": "Summary",
+            "customer_phone": "555-0105",
+            "is_delivery": False,
+            "status": order_status,
+            "total_cents": 1000,
+            "payment_status": "paid",
+            "order_date": order_date
+        } for index, order_status in enumerate(statuses)])
+        # A larger archive of finished orders, with the counts the archive job keeps for it
+        db.execute(ArchivedOrder.__table__.insert(), [{
+            "id": 200000 + index,
+            "order_number": f"ARCHIVED{index:06d}",
+            "customer_name": "Summary",
+            "customer_phone": "555-0105",
+            "is_delivery": False,
+            "status": model.OrderStatus.DELIVERED,
+            "total_cents": 1000,
+            "payment_status": "paid",
+            "order_date": order_date,
+            "archived_at": order_date
+        } for index in range(150000)])
+        order_archive.count_archived(db, model.OrderStatus.DELIVERED, 150000)
+        db.commit()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.get("/dashboard/manager/orders-summary")
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pending_orders"] == 40000
+    assert data["preparing_orders"] == 25000
+    assert data["ready_orders"] == 5000
+    assert data["delivered_orders"] == 179000
+    assert data["total_active_orders"] == 70000
+    assert data["orders_by_status"]["cancelled"] == 1000
+    assert data["orders_by_status"]["confirmed"] == 300
+    assert len(statements) == 1
+    # Live orders are counted from the status index and the archive table is never read
+    with engine.connect() as connection:
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statements[0]}"))
+    assert "ix_orders_status_order_date_id" in plan
+    assert "orders_archive " not in plan + " "
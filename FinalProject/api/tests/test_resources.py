@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from ..dependencies.database import Base, get_db
 from ..main import app
@@ -191,3 +192,37 @@ def test_list_resources():
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 2
+
+
+def test_resource_list_conditional_get():
+    resource_id = client.post("/resources/", json={"name": "Flour", "amount": 50, "unit": "kg"}).json()["id"]
+
+    response = client.get("/resources/")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert "Last-Modified" in response.headers
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        not_modified = client.get("/resources/", headers={"If-None-Match": etag})
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    # Answered from the version row alone
+    assert len(statements) == 1 and "catalog_versions" in statements[0]
+
+    since = client.get("/resources/", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+    client.patch(f"/resources/{resource_id}/amount?amount_change=-5")
+    changed = client.get("/resources/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["amount"] == 45
@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -293,3 +295,202 @@ def test_invalid_payment_status():
     response = client.patch(f"/orders/{order_number}/payment", json=payment_update)
     assert response.status_code == 400
     assert "Invalid payment status" in response.json()["detail"]
+
+
+def test_staff_dashboard_orders_cursor_pagination():
+    """Test keyset pagination of staff dashboard orders"""
+    category_data = {"name": "Sandwiches", "description": "Hot sandwiches"}
+    category_response = client.post("/menu/categories", json=category_data)
+    category_id = category_response.json()["id"]
+
+    dish_data = {
+        "name": "Reuben",
+        "description": "Corned beef on rye",
+        "price_cents": 1100,
+        "category_id": category_id
+    }
+    dish_response = client.post("/menu/dishes", json=dish_data)
+    dish_id = dish_response.json()["id"]
+
+    order_numbers = []
+    for i in range(5):
+        order_data = {
+            "customer_name": f"Customer {i}",
+            "customer_phone": f"555-{i:04d}",
+            "items": [{"dish_id": dish_id, "qty": 1}]
+        }
+        order_numbers.append(client.post("/orders/guest", json=order_data).json()["order_number"])
+
+    # Walk every page by following the cursor header
+    seen = []
+    response = client.get("/dashboard/staff/orders?limit=2")
+    while True:
+        assert response.status_code == 200
+        seen.extend(order["order_number"] for order in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get(f"/dashboard/staff/orders?limit=2&cursor={cursor}")
+
+    assert seen == order_numbers
+
+    # skip/limit still works as before
+    response = client.get("/dashboard/staff/orders?skip=4&limit=2")
+    assert [order["order_number"] for order in response.json()] == order_numbers[4:]
+
+    # Tampered cursors are rejected
+    response = client.get("/dashboard/staff/orders?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_orders_list_cursor_pagination():
+    """Test GET /orders/ walks keyset pages and still returns every order without a limit"""
+    order_ids = [client.post("/orders/", json={"customer_name": f"Customer {i}"}).json()["id"] for i in range(5)]
+
+    seen = []
+    response = client.get("/orders/?limit=2")
+    while True:
+        assert response.status_code == 200
+        seen.extend(order["id"] for order in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get(f"/orders/?limit=2&cursor={cursor}")
+    assert seen == order_ids
+
+    response = client.get("/orders/")
+    assert [order["id"] for order in response.json()] == order_ids
+    assert "X-Next-Cursor" not in response.headers
+    assert [order["id"] for order in client.get("/orders/?status=pending&skip=3").json()] == order_ids[3:]
+    assert client.get("/orders/?status=bogus").status_code == 400
+    assert client.get("/orders/?cursor=not-a-cursor").status_code == 400
+
+
+def test_order_event_stream_filters():
+    """Test that order changes reach stream subscribers by status and by order number"""
+    from ..dependencies.order_stream import OrderEventBroker
+
+    category_data = {"name": "Burgers", "description": "Grilled burgers"}
+    category_response = client.post("/menu/categories", json=category_data)
+    category_id = category_response.json()["id"]
+
+    dish_data = {"name": "Cheeseburger", "price_cents": 900, "category_id": category_id}
+    dish_id = client.post("/menu/dishes", json=dish_data).json()["id"]
+
+    order_numbers = []
+    for i in range(2):
+        order_data = {
+            "customer_name": f"Customer {i}",
+            "customer_phone": f"555-{i:04d}",
+            "items": [{"dish_id": dish_id, "qty": 1}]
+        }
+        order_numbers.append(client.post("/orders/guest", json=order_data).json()["order_number"])
+
+    db = TestingSessionLocal()
+    try:
+        broker = OrderEventBroker(session_factory=TestingSessionLocal)
+        assert broker.fetch(db) == []  # positions the broker at the end of the log
+
+        kitchen = broker.subscribe(statuses=["confirmed"])
+        tracker = broker.subscribe(order_number=order_numbers[0])
+
+        client.patch(f"/orders/{order_numbers[0]}/status", json={"status": "confirmed"})
+        client.patch(f"/orders/{order_numbers[1]}/status", json={"status": "confirmed"})
+        client.patch(f"/orders/{order_numbers[0]}/payment", json={"payment_status": "paid"})
+
+        broker.dispatch(broker.fetch(db))
+    finally:
+        db.close()
+
+    kitchen_events = [kitchen.queue.get_nowait() for _ in range(kitchen.queue.qsize())]
+    assert [(e["order_number"], e["event_type"]) for e in kitchen_events] == [
+        (order_numbers[0], "status"),
+        (order_numbers[1], "status"),
+        (order_numbers[0], "payment")
+    ]
+
+    tracker_events = [tracker.queue.get_nowait() for _ in range(tracker.queue.qsize())]
+    assert [e["event_type"] for e in tracker_events] == ["status", "payment"]
+    assert tracker_events[-1]["payment_status"] == "paid"
+
+    # Unknown statuses are rejected before a stream is opened
+    response = client.get("/orders/stream?status=bogus")
+    assert response.status_code == 400
+
+
+def create_guest_order(phone="555-0100"):
+    category_id = client.post("/menu/categories", json={"name": f"Grill {phone}"}).json()["id"]
+    dish_id = client.post("/menu/dishes", json={"name": f"Burger {phone}", "price_cents": 900,
+                                                "category_id": category_id}).json()["id"]
+    order_data = {"customer_name": "Stream Customer", "customer_phone": phone, "items": [{"dish_id": dish_id, "qty": 1}]}
+    return client.post("/orders/guest", json=order_data).json()["order_number"]
+
+
+def test_order_stream_endpoint_pushes_events(monkeypatch):
+    """Test the SSE endpoint end to end: subscribe, change an order, read the pushed event"""
+    from ..dependencies import order_stream
+    from ..routers.orders import stream_order_events
+
+    order_number = create_guest_order()
+    monkeypatch.setattr(order_stream.broker, "session_factory", TestingSessionLocal)
+    monkeypatch.setattr(order_stream.broker, "poll_interval", 0.01)
+
+    async def listen():
+        response = await stream_order_events(status=["confirmed"], order_number=None)
+        assert response.media_type == "text/event-stream"
+        chunks = response.body_iterator
+        assert await anext(chunks) == "retry: 3000\n\n"
+        while order_stream.broker.last_id is None:  # the first poll positions the broker at the tail
+            await asyncio.sleep(0.01)
+
+        await asyncio.to_thread(client.patch, f"/orders/{order_number}/status", json={"status": "confirmed"})
+        chunk = await asyncio.wait_for(anext(chunks), timeout=5)
+        await chunks.aclose()
+        while order_stream.broker._task is not None:  # the poll loop stops once nobody listens
+            await asyncio.sleep(0.01)
+        return chunk
+
+    chunk = asyncio.run(listen())
+    lines = chunk.splitlines()
+    assert lines[1] == "event: status"
+    assert f'"order_number": "{order_number}"' in lines[2] and '"status": "confirmed"' in lines[2]
+    assert order_stream.broker.subscriptions == set()
+
+
+def test_prune_order_events_without_subscribers():
+    """Test that old order events are deleted by the retention job, not only while someone streams"""
+    from ..controllers.order_events import prune_order_events
+    from ..models.order_events import OrderEvent
+
+    order_number = create_guest_order()
+    client.patch(f"/orders/{order_number}/status", json={"status": "confirmed"})
+    with TestingSessionLocal() as db:
+        old = db.query(OrderEvent).filter(OrderEvent.event_type == "created").one()
+        old.created_at = datetime.now() - timedelta(days=2)
+        db.commit()
+
+        assert prune_order_events(db, older_than_seconds=86400) == 1
+        assert [event.event_type for event in db.query(OrderEvent).all()] == ["status"]
+
+
+def test_order_stream_delivers_events_committed_out_of_id_order():
+    """Test that an event whose id was taken before a streamed one, but committed after it, still arrives once"""
+    from ..controllers.order_events import order_event_row
+    from ..dependencies.order_stream import OrderEventBroker
+    from ..models.order_events import OrderEvent
+
+    def commit_event(event_id, status):
+        with TestingSessionLocal() as db:
+            db.add(OrderEvent(id=event_id, **order_event_row("ORD-LATE", "status", status, "pending")))
+            db.commit()
+
+    commit_event(1, "pending")
+    broker = OrderEventBroker(session_factory=TestingSessionLocal)
+    with TestingSessionLocal() as db:
+        assert broker.fetch(db) == []
+        # Id 3 commits first; the transaction holding id 2 commits after id 3 was streamed
+        commit_event(3, "preparing")
+        assert [event["id"] for event in broker.fetch(db)] == [3]
+        commit_event(2, "confirmed")
+        assert [event["id"] for event in broker.fetch(db)] == [2]
+        assert broker.fetch(db) == []
@@ -1,9 +1,20 @@
+import asyncio
 import pytest
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from ..dependencies.database import Base, get_db
 from ..main import app
+from ..dependencies.periodic import PeriodicTask
+from ..controllers import promotions as promotion_controller
+from ..models.promotions import Promotion
+from ..schemas.promotions import PromotionApply
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -23,6 +34,7 @@ client = TestClient(app)
 @pytest.fixture(autouse=True)
 def setup_database():
     Base.metadata.create_all(bind=engine)
+    promotion_controller.validate_limiter.reset()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -257,3 +269,209 @@ def test_promotion_validation():
     assert response.status_code == 200
     data = response.json()
     assert data["is_valid"] == False
+
+
+def test_promotion_lookups_use_promotion_index(monkeypatch):
+    """Test that validate and apply resolve codes from memory, in any case"""
+    promotion_id = client.post("/promotions/", json={"code": "LUNCH15", "discount_percent": 15}).json()["id"]
+    client.post("/promotions/", json={"code": "SOON5", "discount_percent": 5,
+                                      "expires_at": (datetime.now() + timedelta(hours=1)).isoformat()})
+    client.post("/promotions/", json={"code": "GONE5", "discount_percent": 5,
+                                      "expires_at": (datetime.now() - timedelta(hours=1)).isoformat()})
+    assert client.get("/promotions/validate/lunch15").json()["is_valid"] == True
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        assert client.get("/promotions/validate/Lunch15").json()["is_valid"] == True
+        assert client.get("/promotions/validate/NOPE").json()["is_valid"] == False
+        assert client.post("/promotions/apply", json={"code": "lunch15", "order_total_cents": 2000}).json()[
+            "discount_amount_cents"] == 300
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    assert statements == []
+
+    assert client.get("/promotions/validate/GONE5").json()["is_valid"] == False
+    assert client.get("/promotions/validate/SOON5").json()["is_valid"] == True
+
+    # Expiry is judged from the cached expires_at, without a reload
+    class Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(hours=2)
+
+    monkeypatch.setattr(promotion_controller, "datetime", Later)
+    assert client.get("/promotions/validate/SOON5").json()["is_valid"] == False
+    monkeypatch.undo()
+
+    # Writes through the controllers take effect immediately
+    client.delete(f"/promotions/{promotion_id}")
+    assert client.get("/promotions/validate/LUNCH15").json()["is_valid"] == False
+
+
+def test_redeem_promotion_counts_uses():
+    """Test that redeeming counts a use and stops at the usage limit"""
+    client.post("/promotions/", json={"code": "TWICE", "discount_percent": 10, "usage_limit": 2})
+    redeem = {"code": "twice", "order_total_cents": 1000}
+    etag = client.get("/promotions/").headers["ETag"]
+    assert client.get("/promotions/", headers={"If-None-Match": etag}).status_code == 304
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/promotions/redeem", json=redeem)
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert response.json()["final_total_cents"] == 900
+    # No shared version row is written per redemption, yet the list ETag still moves with times_used
+    assert not any("catalog_versions" in statement and "SELECT" not in statement for statement in statements)
+    changed = client.get("/promotions/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()[0]["times_used"] == 1
+    assert "Last-Modified" not in changed.headers
+    # Same Idempotency-Key: replayed, not counted again
+    first = client.post("/promotions/redeem", json=redeem, headers={"Idempotency-Key": "checkout-1"})
+    replay = client.post("/promotions/redeem", json=redeem, headers={"Idempotency-Key": "checkout-1"})
+    assert first.status_code == replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+
+    response = client.post("/promotions/redeem", json=redeem)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Promotion code usage limit reached"
+    assert client.get("/promotions/validate/TWICE").json()["is_valid"] == False
+    assert client.get("/promotions/").json()[0]["times_used"] == 2
+
+
+def test_concurrent_redemptions_never_exceed_usage_limit():
+    """Stress test: many threads racing for the last uses of one limited code"""
+    usage_limit = 10
+    client.post("/promotions/", json={"code": "RUSH", "discount_percent": 20, "usage_limit": usage_limit})
+    payload = PromotionApply(code="RUSH", order_total_cents=1000)
+
+    def redeem(_):
+        with TestingSessionLocal() as db:
+            try:
+                promotion_controller.redeem_promotion(db, payload)
+                return "redeemed"
+            except HTTPException as e:
+                return e.detail
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        outcomes = list(pool.map(redeem, range(200)))
+
+    assert outcomes.count("redeemed") == usage_limit
+    assert set(outcomes) == {"redeemed", "Promotion code usage limit reached"}
+    with TestingSessionLocal() as db:
+        assert db.query(Promotion).filter(Promotion.code == "RUSH").one().times_used == usage_limit
+
+
+def test_best_promotions_for_cart():
+    """Test ranking every qualifying promotion for a cart total or a list of items"""
+    client.post("/promotions/", json={"code": "TEN", "discount_percent": 10})
+    client.post("/promotions/", json={"code": "BIG30", "discount_percent": 30, "min_order_amount_cents": 5000})
+    client.post("/promotions/", json={"code": "CAPPED50", "discount_percent": 50, "max_discount_cents": 150})
+    client.post("/promotions/", json={"code": "USED", "discount_percent": 40, "usage_limit": 1})
+    client.post("/promotions/redeem", json={"code": "USED", "order_total_cents": 100})
+
+    data = client.post("/promotions/best", json={"order_total_cents": 2000}).json()
+    assert [quote["code"] for quote in data["ranked"]] == ["TEN", "CAPPED50"]
+    assert data["best"] == {"code": "TEN", "discount_percent": 10,
+                            "discount_amount_cents": 200, "final_total_cents": 1800}
+    data = client.post("/promotions/best", json={"order_total_cents": 6000, "limit": 1}).json()
+    assert [quote["code"] for quote in data["ranked"]] == ["BIG30"]
+
+    category_id = client.post("/menu/categories", json={"name": "Mains"}).json()["id"]
+    dish_id = client.post("/menu/dishes", json={"name": "Steak", "price_cents": 2500, "category_id": category_id}).json()["id"]
+    data = client.post("/promotions/best", json={"items": [{"dish_id": dish_id, "qty": 2}]}).json()
+    assert data["order_total_cents"] == 5000
+    assert data["best"]["code"] == "BIG30"
+
+    assert client.post("/promotions/best", json={}).status_code == 422
+    assert client.post("/promotions/best", json={"order_total_cents": 100}).json() == {
+        "order_total_cents": 100, "best": {"code": "CAPPED50", "discount_percent": 50,
+                                           "discount_amount_cents": 50, "final_total_cents": 50},
+        "ranked": [{"code": "CAPPED50", "discount_percent": 50, "discount_amount_cents": 50, "final_total_cents": 50},
+                   {"code": "TEN", "discount_percent": 10, "discount_amount_cents": 10, "final_total_cents": 90}]}
+
+
+
+def test_rank_with_distinct_caps_matches_evaluating_each_code():
+    """Test the rule table ranks codes with all-distinct caps like evaluating every code"""
+    rng = random.Random(7)
+    codes = [SimpleNamespace(code=f"CODE{i}", discount_percent=rng.randint(5, 40),
+                             min_order_amount_cents=rng.randint(0, 10000),
+                             max_discount_cents=rng.choice((None, rng.randint(100, 5000))),
+                             usage_limit=None, expires_at=None) for i in range(2000)]
+    catalog = promotion_controller.PromotionCatalog(codes)
+    for total in (0, 499, 2500, 9999, 20000):
+        expected = sorted(
+            (min(total * code.discount_percent // 100, code.max_discount_cents or total), code.discount_percent)
+            for code in codes if code.min_order_amount_cents <= total
+        )[::-1][:10]
+        assert [quote[:2] for quote in catalog.rank(total, datetime.now(), 10)] == expected
+
+
+def test_sweep_deactivates_expired_and_used_up_promotions():
+    """Test that the lifecycle sweep deactivates spent codes in one pass and leaves the rest alone"""
+    yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+    tomorrow = (datetime.now() + timedelta(days=1)).isoformat()
+    client.post("/promotions/", json={"code": "OLD", "discount_percent": 10, "expires_at": yesterday})
+    client.post("/promotions/", json={"code": "ONCE", "discount_percent": 10, "usage_limit": 1})
+    client.post("/promotions/", json={"code": "FRESH", "discount_percent": 10, "expires_at": tomorrow})
+    client.post("/promotions/", json={"code": "OPEN", "discount_percent": 10, "usage_limit": 5})
+    client.post("/promotions/redeem", json={"code": "ONCE", "order_total_cents": 1000})
+    etag = client.get("/promotions/").headers["ETag"]
+
+    sweeper = PeriodicTask("promotion sweep", promotion_controller.sweep_promotions, 0.01, TestingSessionLocal)
+
+    async def sweep_in_background():
+        sweeper.start()
+        while sweeper.runs < 2:
+            await asyncio.sleep(0.01)
+        await sweeper.stop()
+
+    asyncio.run(sweep_in_background())
+    response = client.get("/promotions/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert sorted(promotion["code"] for promotion in response.json()) == ["FRESH", "OPEN"]
+    assert client.get("/analytics/promotions").json()["active_promotions"] == 2
+    # Nothing left to deactivate on the second run
+    assert sweeper.last_result == 0
+
+
+def test_validate_rate_limit_and_probe_counters(monkeypatch):
+    """Test that code enumeration is answered from memory, counted, and rate limited per client"""
+    client.post("/promotions/", json={"code": "REAL10", "discount_percent": 10})
+    monkeypatch.setattr(promotion_controller, "probe_stats", promotion_controller.PromotionProbeStats())
+    monkeypatch.setattr(promotion_controller.validate_limiter, "burst", 5)
+    monkeypatch.setattr(promotion_controller.validate_limiter, "rate", 0.001)
+    assert client.get("/promotions/validate/REAL10").json()["is_valid"] == True
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        for guess in ("AAAA", "AAAB", "AAAC", "AAAD"):
+            assert client.get(f"/promotions/validate/{guess}").json()["is_valid"] == False
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    assert not any("FROM promotions" in statement for statement in statements)
+
+    response = client.get("/promotions/validate/AAAE")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    stats = client.get("/dashboard/manager/promotion-probes").json()
+    assert stats["validations"] == {"valid": 1, "unknown": 4, "spent": 0}
+    assert stats["rate_limit"]["limited"] >= 1
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Sync vs Async Mode Benchmark
+Drives the same mix of order-tracking, staff-dashboard and menu reads against
+an app wired with the sync routes and one wired with the async routes in
+front (what USE_ASYNC_DB=true does), under identical concurrency.
+
+Usage: python benchmarks/bench_async_mode.py [--requests 2000] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from api.dependencies.database import Base, get_db, use_sqlite_wal
+from api.dependencies.async_database import get_async_db
+from api.routers import index as indexRoute
+from api.models.categories import Category
+from api.models.dishes import Dish
+from api.controllers import orders as order_controller
+from api.schemas.orders import GuestOrderCreate
+
+
+def seed(Session, orders=500):
+    db = Session()
+    category = Category(name="Bench")
+    db.add(category)
+    db.flush()
+    db.add_all([Dish(name=f"Dish {i}", price_cents=500 + i, category_id=category.id) for i in range(20)])
+    db.commit()
+    numbers = []
+    for i in range(orders):
+        payload = GuestOrderCreate(
+            customer_name=f"Customer {i}",
+            customer_phone="555-0000",
+            items=[{"dish_id": i % 20 + 1, "qty": 1}, {"dish_id": (i + 7) % 20 + 1, "qty": 2}]
+        )
+        numbers.append(order_controller.create_guest_order(db, payload).order_number)
+    db.close()
+    return numbers
+
+
+def build_app(path, use_async, pool_size):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, pool_size=pool_size)
+    use_sqlite_wal(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=pool_size)
+    use_sqlite_wal(async_engine.sync_engine)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+    if use_async:
+        indexRoute.load_async_routes(app)
+    indexRoute.load_routes(app)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app, Session
+
+
+async def drive(app, paths, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = list(reversed(paths))
+        latencies = []
+
+        async def worker():
+            while queue:
+                path = queue.pop()
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, (path, response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return len(paths) / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "bench.db")
+        sync_app, Session = build_app(path, use_async=False, pool_size=args.concurrency)
+        async_app, _ = build_app(path, use_async=True, pool_size=args.concurrency)
+        Base.metadata.create_all(Session.kw["bind"])
+        numbers = seed(Session)
+
+        mix = ["/orders/number/{}", "/dashboard/staff/orders?limit=20", "/menu/dishes"]
+        paths = [mix[i % 3].format(numbers[i % len(numbers)]) for i in range(args.requests)]
+
+        print(f"{'mode':>6} | {'req/s':>8} | {'p50 ms':>7} | {'p99 ms':>7}")
+        for name, app in (("sync", sync_app), ("async", async_app)):
+            throughput, p50, p99 = asyncio.run(drive(app, paths, args.concurrency))
+            print(f"{name:>6} | {throughput:>8.0f} | {p50:>7.2f} | {p99:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
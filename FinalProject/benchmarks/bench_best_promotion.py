@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Best Promotion Benchmark
+Creates thousands of active promotion codes with random thresholds, usage
+limits and caps (nearly every capped code has its own cap, as real campaigns do) and times best_promotions for random cart totals: the in-memory
+ranking alone and the whole controller call (catalog version check and live
+usage reads included), against loading the active promotions and evaluating
+each one through _discount.
+
+Usage: python benchmarks/bench_best_promotion.py [--codes 5000] [--repeat 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from api.dependencies.database import Base, use_sqlite_wal
+from api.models import model_loader  # noqa: F401 - registers every table on Base
+from api.models.promotions import Promotion
+from api.controllers import promotions
+from api.schemas.promotions import PromotionCart, PromotionOut
+
+
+def build_session_factory(path, code_count, rng):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    use_sqlite_wal(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    now = datetime.now()
+    with Session() as db:
+        db.execute(insert(Promotion.__table__), [{
+            "code": f"CODE{i:05d}",
+            "discount_percent": rng.randint(5, 40),
+            "min_order_amount_cents": rng.choice((0, 1000, 2500, 5000, 10000)) + rng.randint(0, 500),
+            "max_discount_cents": rng.choice((None, rng.randint(100, 5000))),
+            "usage_limit": rng.choice((None, None, None, 100)),
+            "times_used": 0,
+            "is_active": True,
+            "expires_at": rng.choice((None, now + timedelta(days=rng.randint(1, 60))))
+        } for i in range(code_count)])
+        db.commit()
+    return Session
+
+
+def evaluate_each(db, total):
+    """Load the active promotions and run every eligible one through _discount"""
+    now = datetime.now()
+    quotes = []
+    for promotion in db.query(Promotion).filter(Promotion.is_active == True).all():
+        if promotion.expires_at and promotion.expires_at < now:
+            continue
+        if total < promotion.min_order_amount_cents:
+            continue
+        if promotion.usage_limit and promotion.times_used >= promotion.usage_limit:
+            continue
+        quotes.append(promotions._discount(PromotionOut.model_validate(promotion.__dict__), total))
+    return sorted(quotes, key=lambda quote: quote["discount_amount_cents"], reverse=True)
+
+
+def time_calls(call, totals, repeat):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        call(totals[i % len(totals)])
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--codes", type=int, default=5000, help="active promotion codes")
+    parser.add_argument("--repeat", type=int, default=2000, help="evaluations timed per mode")
+    args = parser.parse_args()
+    rng = random.Random(1)
+    totals = [rng.randint(500, 20000) for _ in range(500)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        Session = build_session_factory(os.path.join(directory, "promotions.db"), args.codes, rng)
+        with Session() as db:
+            promotions.promotion_catalog.invalidate()
+            start = time.perf_counter()
+            catalog = promotions.promotion_catalog.get(db)
+            caps = len({promotion.max_discount_cents for promotion in catalog.by_code.values()})
+            print(f"{args.codes:,} codes ({caps:,} distinct caps), rule table built in "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms")
+            now = datetime.now()
+            modes = {
+                "rule table": lambda total: catalog.rank(total, now, 10),
+                "best_promotions": lambda total: promotions.best_promotions(db, PromotionCart(order_total_cents=total)),
+                "evaluate each": lambda total: evaluate_each(db, total),
+            }
+            print(f"{'mode':>16} {'p50 ms':>8} {'p99 ms':>8}")
+            for name, call in modes.items():
+                p50, p99 = time_calls(call, totals, args.repeat if name != "evaluate each" else args.repeat // 20)
+                print(f"{name:>16} {p50:>8.3f} {p99:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Group Commit Benchmark
+Places guest orders from many concurrent threads through create_guest_order,
+committing each order on its own and through the group-commit writer, on a
+SQLite database in WAL mode.
+
+Usage: python benchmarks/bench_group_commit.py [--orders 4000] [--threads 32] [--synchronous NORMAL]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from api.dependencies.database import Base
+from api.dependencies import group_commit
+from api.models import model_loader  # noqa: F401 - registers every table on Base
+from api.models.categories import Category
+from api.models.dishes import Dish
+from api.controllers import orders as controller
+from api.schemas.orders import GuestOrderCreate
+
+DISH_COUNT = 50
+
+
+def build_session_factory(path, synchronous):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 60},
+                           pool_size=64, max_overflow=0)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.close()
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        category = Category(name="Bench")
+        db.add(category)
+        db.flush()
+        db.add_all([Dish(name=f"Dish {i}", price_cents=500 + i, category_id=category.id) for i in range(DISH_COUNT)])
+        db.commit()
+    return Session
+
+
+def run(Session, orders, threads, writer):
+    group_commit.writer = writer
+    rng = random.Random(1)
+    payloads = [GuestOrderCreate(
+        customer_name=f"Guest {i}",
+        customer_phone="555-0000",
+        items=[{"dish_id": rng.randint(1, DISH_COUNT), "qty": rng.randint(1, 3)} for _ in range(rng.randint(1, 4))]
+    ) for i in range(orders)]
+
+    latencies = []
+
+    def place(payload):
+        start = time.perf_counter()
+        with Session() as db:
+            controller.create_guest_order(db, payload)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(place, payloads))
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        writer.stop()
+    latencies.sort()
+    return orders / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=4000, help="orders placed per mode")
+    parser.add_argument("--threads", type=int, default=32, help="concurrent request threads")
+    parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"], help="SQLite fsync level")
+    parser.add_argument("--window-ms", type=float, default=None, help="group commit window (default: conf)")
+    parser.add_argument("--max-batch", type=int, default=None, help="group commit batch limit (default: conf)")
+    args = parser.parse_args()
+
+    print(f"{args.orders} orders from {args.threads} threads, synchronous={args.synchronous}")
+    with tempfile.TemporaryDirectory() as directory:
+        Session = build_session_factory(os.path.join(directory, "each.db"), args.synchronous)
+        rate, p50, p99 = run(Session, args.orders, args.threads, None)
+        print(f"commit per order: {rate:>8,.0f} orders/s  p50 {p50:6.1f} ms  p99 {p99:6.1f} ms")
+
+        Session = build_session_factory(os.path.join(directory, "group.db"), args.synchronous)
+        writer = group_commit.GroupCommitWriter(Session, window_ms=args.window_ms, max_batch=args.max_batch)
+        rate, p50, p99 = run(Session, args.orders, args.threads, writer)
+        stats = writer.stats()
+        print(f"group commit:     {rate:>8,.0f} orders/s  p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  "
+              f"avg batch {stats['average_batch_size']}  avg commit {stats['average_commit_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
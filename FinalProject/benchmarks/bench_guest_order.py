@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Guest Order Benchmark
+Measures create_guest_order latency as the cart grows, comparing the original
+per-item lookup / two-commit path with the batched single-transaction path.
+
+Usage: python benchmarks/bench_guest_order.py [--runs 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from api.dependencies.database import Base
+from api.models import model_loader  # noqa: F401 - registers every table on Base
+from api.models.categories import Category
+from api.models.dishes import Dish
+from api.models.orders import Order
+from api.models.order_details import OrderDetail
+from api.controllers import orders as controller
+from api.schemas.orders import GuestOrderCreate
+
+CART_SIZES = [1, 3, 6, 12, 24, 48]
+
+
+def legacy_create_guest_order(db, payload):
+    """The pre-batching implementation: one SELECT per line and two commits"""
+    dishes = {}
+    total_cents = 0
+    for item in payload.items:
+        dish = db.query(Dish).filter(Dish.id == item.dish_id, Dish.is_active == True).first()
+        dishes[item.dish_id] = dish
+        total_cents += dish.price_cents * item.qty
+
+    order = Order(
+        order_number=uuid.uuid4().hex[:12],
+        customer_name=payload.customer_name,
+        customer_phone=payload.customer_phone,
+        total_cents=total_cents
+    )
+    db.add(order)
+    db.commit()
+    db.refresh(order)
+
+    for item in payload.items:
+        dish = dishes[item.dish_id]
+        db.add(OrderDetail(
+            order_id=order.id,
+            dish_id=item.dish_id,
+            qty=item.qty,
+            unit_price_cents=dish.price_cents,
+            line_total_cents=dish.price_cents * item.qty
+        ))
+    db.commit()
+    return order
+
+
+def build_session_factory(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*args):
+        statements["count"] += 1
+
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    category = Category(name="Bench")
+    db.add(category)
+    db.flush()
+    db.add_all([
+        Dish(name=f"Dish {i}", price_cents=500 + i, category_id=category.id)
+        for i in range(max(CART_SIZES))
+    ])
+    db.commit()
+    db.close()
+    return Session, statements
+
+
+def measure(Session, statements, create, cart_size, runs):
+    payload = GuestOrderCreate(
+        customer_name="Bench",
+        customer_phone="555-0000",
+        items=[{"dish_id": i + 1, "qty": 1} for i in range(cart_size)]
+    )
+    timings = []
+    statements["count"] = 0
+    for _ in range(runs):
+        db = Session()
+        started = time.perf_counter()
+        create(db, payload)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.close()
+    return statistics.median(timings), statements["count"] / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="orders placed per cart size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        Session, statements = build_session_factory(os.path.join(workdir, "bench.db"))
+
+        print(f"{'cart':>5} | {'before ms':>10} {'stmts':>6} | {'after ms':>9} {'stmts':>6} | {'speedup':>7}")
+        for cart_size in CART_SIZES:
+            before_ms, before_stmts = measure(Session, statements, legacy_create_guest_order, cart_size, args.runs)
+            after_ms, after_stmts = measure(Session, statements, controller.create_guest_order, cart_size, args.runs)
+            print(f"{cart_size:>5} | {before_ms:>10.3f} {before_stmts:>6.1f} | "
+                  f"{after_ms:>9.3f} {after_stmts:>6.1f} | {before_ms / after_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Guest Order Batch Benchmark
+Measures sustained ingestion through create_guest_orders_batch on a SQLite
+database in WAL mode, the path behind POST /orders/guest/batch.
+
+Usage: python benchmarks/bench_guest_order_batch.py [--orders 20000] [--batch-size 250]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from api.dependencies.database import Base, use_sqlite_wal
+from api.models import model_loader  # noqa: F401 - registers every table on Base
+from api.models.categories import Category
+from api.models.dishes import Dish
+from api.controllers import orders as controller
+from api.schemas.orders import GuestOrderBatchCreate, GuestOrderCreate
+
+DISH_COUNT = 50
+
+
+def build_session_factory(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    use_sqlite_wal(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    category = Category(name="Bench")
+    db.add(category)
+    db.flush()
+    db.add_all([Dish(name=f"Dish {i}", price_cents=500 + i, category_id=category.id) for i in range(DISH_COUNT)])
+    db.commit()
+    db.close()
+    return Session
+
+
+def random_order(rng, index):
+    return GuestOrderCreate(
+        customer_name=f"Aggregator {index}",
+        customer_phone="555-0000",
+        is_delivery=rng.random() < 0.5,
+        payment_method="online",
+        items=[{"dish_id": rng.randint(1, DISH_COUNT), "qty": rng.randint(1, 3)} for _ in range(rng.randint(1, 5))]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=20000, help="total orders to ingest")
+    parser.add_argument("--batch-size", type=int, default=250, help="orders per batch request")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    batches = []
+    for start in range(0, args.orders, args.batch_size):
+        count = min(args.batch_size, args.orders - start)
+        batches.append(GuestOrderBatchCreate(orders=[random_order(rng, start + i) for i in range(count)]))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        Session = build_session_factory(os.path.join(workdir, "bench.db"))
+
+        created = 0
+        started = time.perf_counter()
+        for batch in batches:
+            db = Session()
+            created += controller.create_guest_orders_batch(db, batch).created
+            db.close()
+        elapsed = time.perf_counter() - started
+
+    print(f"orders: {created}  batch size: {args.batch_size}")
+    print(f"elapsed: {elapsed:.2f}s  throughput: {created / elapsed:,.0f} orders/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Menu Search Benchmark
+Builds a synthetic catalog of dishes with random names and descriptions, indexes
+it in the dish_search full-text table and times GET /menu/search style lookups
+(whole words, prefixes, multi-word, category names) through search_dishes
+against a LIKE '%word%' scan collecting every match (needed before any ranking).
+
+Usage: python benchmarks/bench_menu_search.py [--dishes 50000] [--categories 40] [--repeat 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, or_
+from sqlalchemy.orm import sessionmaker
+from api.dependencies.database import Base, use_sqlite_wal
+from api.models import model_loader  # noqa: F401 - registers every table on Base
+from api.models.categories import Category
+from api.models.dishes import Dish
+from api.controllers import menu
+from api.controllers.menu_search import index_dishes
+
+WORDS = (
+    "chicken beef pork tofu shrimp salmon tuna lamb duck turkey mushroom spinach tomato basil garlic "
+    "onion pepper chili lemon lime ginger curry coconut peanut sesame honey maple vanilla chocolate "
+    "caramel cheese cheddar mozzarella parmesan feta ricotta cream butter bacon sausage ham egg rice "
+    "noodle pasta spaghetti penne ravioli lasagna pizza burger sandwich wrap taco burrito salad soup "
+    "stew roast grilled fried baked smoked spicy sweet sour crispy tender fresh house special classic"
+).split()
+INSERT_BATCH = 5000
+
+
+def build_session_factory(path, dish_count, category_count, rng):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    use_sqlite_wal(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        db.execute(insert(Category.__table__), [{"name": f"Category {i} {rng.choice(WORDS)}"} for i in range(category_count)])
+        for start in range(0, dish_count, INSERT_BATCH):
+            db.execute(insert(Dish.__table__), [{
+                "name": " ".join(rng.sample(WORDS, 3)).title(),
+                "description": " ".join(rng.sample(WORDS, 8)),
+                "price_cents": rng.randint(300, 3000),
+                "category_id": rng.randint(1, category_count)
+            } for _ in range(min(INSERT_BATCH, dish_count - start))])
+        start = time.perf_counter()
+        index_dishes(db)
+        db.commit()
+        print(f"indexed {dish_count:,} dishes in {time.perf_counter() - start:.2f} s")
+    return Session
+
+
+def like_scan(db, q):
+    """Every dish containing each word, which is what ranking without an index has to read"""
+    terms = q.lower().split()
+    statement = select(Dish.id).where(Dish.is_active == True)
+    for term in terms:
+        pattern = f"%{term}%"
+        statement = statement.where(or_(Dish.name.ilike(pattern), Dish.description.ilike(pattern)))
+    return db.execute(statement).scalars().all()
+
+
+def time_queries(call, queries, repeat):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        call(queries[i % len(queries)])
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dishes", type=int, default=50000, help="dishes in the synthetic catalog")
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=200, help="lookups timed per query kind")
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        Session = build_session_factory(os.path.join(directory, "search.db"), args.dishes, args.categories, rng)
+        kinds = {
+            "one word": [rng.choice(WORDS) for _ in range(50)],
+            "prefix": [rng.choice(WORDS)[:3] for _ in range(50)],
+            "two words": [" ".join(rng.sample(WORDS, 2)) for _ in range(50)],
+            "rare combo": [" ".join(rng.sample(WORDS, 3)) for _ in range(50)],
+        }
+        with Session() as db:
+            menu.menu_catalog.invalidate()
+            menu.menu_catalog.get(db)  # warm the catalog, as a running worker would have it
+            print(f"{'query':>12} {'search p50 ms':>14} {'p99 ms':>8} {'LIKE p50 ms':>12} {'p99 ms':>8}")
+            for name, queries in kinds.items():
+                search_p50, search_p99 = time_queries(lambda q: menu.search_dishes(db, q, 20), queries, args.repeat)
+                like_p50, like_p99 = time_queries(lambda q: like_scan(db, q), queries, args.repeat)
+                print(f"{name:>12} {search_p50:>14.2f} {search_p99:>8.2f} {like_p50:>12.2f} {like_p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
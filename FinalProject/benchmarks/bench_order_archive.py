@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Order Archive Benchmark
+Grows the order history step by step and times the staff dashboard queries
+(unfiltered order list, per-status summary, today's sales) on a database that
+keeps every order live and on one where the archive job moves finished
+orders out of the live tables after each step.
+
+Usage: python benchmarks/bench_order_archive.py [--steps 25000,100000,400000] [--active 200] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, func
+from sqlalchemy.orm import sessionmaker
+from api.dependencies.database import Base, use_sqlite_wal
+from api.dependencies.order_numbers import TimeOrderedOrderNumbers
+from api.models import model_loader  # noqa: F401 - registers every table on Base
+from api.models.categories import Category
+from api.models.dishes import Dish
+from api.models.orders import Order, OrderStatus
+from api.models.order_details import OrderDetail
+from api.controllers import orders as order_controller
+from api.controllers import analytics
+from api.controllers.order_archive import archive_orders
+
+DISH_COUNT = 50
+INSERT_BATCH = 5000
+
+
+def build_session_factory(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    use_sqlite_wal(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as db:
+        category = Category(name="Bench")
+        db.add(category)
+        db.flush()
+        db.add_all([Dish(name=f"Dish {i}", price_cents=500 + i, category_id=category.id) for i in range(DISH_COUNT)])
+        db.commit()
+    return Session
+
+
+def add_orders(Session, numbers, rng, count, status, age_days):
+    """Insert `count` orders with two line items each, placed `age_days` ago"""
+    with Session() as db:
+        for start in range(0, count, INSERT_BATCH):
+            size = min(INSERT_BATCH, count - start)
+            order_date = datetime.now() - timedelta(days=age_days)
+            next_id = (db.execute(select(func.max(Order.id))).scalar() or 0) + 1
+            db.execute(insert(Order.__table__), [{
+                "id": next_id + i,
+                "order_number": numbers.next(),
+                "customer_name": f"Customer {rng.randint(1, 5000)}",
+                "customer_phone": "555-0000",
+                "is_delivery": rng.random() < 0.5,
+                "status": status,
+                "total_cents": 2000,
+                "payment_status": "paid",
+                "order_date": order_date
+            } for i in range(size)])
+            db.execute(insert(OrderDetail.__table__), [{
+                "order_id": next_id + i,
+                "dish_id": rng.randint(1, DISH_COUNT),
+                "qty": 1,
+                "unit_price_cents": 1000,
+                "line_total_cents": 1000
+            } for i in range(size) for _ in range(2)])
+            db.commit()
+
+
+def dashboard(db):
+    order_controller.get_orders_by_status(db, limit=100)
+    for status in ("pending", "preparing", "ready", "delivered"):
+        order_controller.get_orders_by_status(db, status=status, limit=100)
+    analytics.get_sales_analytics(db, days=1)
+
+
+def time_dashboard(Session, repeat):
+    timings = []
+    with Session() as db:
+        dashboard(db)  # warm the page cache
+        for _ in range(repeat):
+            start = time.perf_counter()
+            dashboard(db)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", default="25000,100000,400000", help="total historical orders after each step")
+    parser.add_argument("--active", type=int, default=200, help="live orders in progress, placed today")
+    parser.add_argument("--repeat", type=int, default=20, help="dashboard refreshes timed per step")
+    args = parser.parse_args()
+    steps = [int(step) for step in args.steps.split(",")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        databases = {
+            "live only": build_session_factory(os.path.join(directory, "live.db")),
+            "archived": build_session_factory(os.path.join(directory, "archived.db")),
+        }
+        numbers = TimeOrderedOrderNumbers(worker_id=1)
+        for Session in databases.values():
+            add_orders(Session, numbers, random.Random(1), args.active, OrderStatus.PENDING, 0)
+
+        print(f"{'history':>10} {'live only ms':>13} {'archived ms':>12} {'archive job s':>14}")
+        history = 0
+        for step in steps:
+            for name, Session in databases.items():
+                add_orders(Session, numbers, random.Random(step), step - history, OrderStatus.DELIVERED, 90)
+            start = time.perf_counter()
+            with databases["archived"]() as db:
+                archive_orders(db, older_than_days=30)
+            archive_seconds = time.perf_counter() - start
+            history = step
+            live_ms = time_dashboard(databases["live only"], args.repeat)
+            archived_ms = time_dashboard(databases["archived"], args.repeat)
+            print(f"{step:>10,} {live_ms:>13.1f} {archived_ms:>12.1f} {archive_seconds:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
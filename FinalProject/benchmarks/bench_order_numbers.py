@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Order Number Insert Benchmark
+Inserts orders into a SQLite database in WAL mode with the legacy random
+order numbers and with the time-ordered ones, and reports throughput per
+segment as the unique index on orders.order_number grows.
+
+Usage: python benchmarks/bench_order_numbers.py [--orders 1000000] [--batch-size 1000] [--segment 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from api.dependencies.database import use_sqlite_wal
+from api.dependencies.order_numbers import RandomOrderNumbers, TimeOrderedOrderNumbers
+from api.models.orders import Order
+
+SCHEMES = {
+    "random": RandomOrderNumbers,
+    "time": lambda: TimeOrderedOrderNumbers(worker_id=1),
+}
+
+
+def order_rows(generator, count):
+    now = datetime.now()
+    return [{
+        "order_number": generator.next(),
+        "customer_name": "Bench",
+        "customer_phone": "555-0000",
+        "is_delivery": False,
+        "status": "PENDING",
+        "total_cents": 1200,
+        "payment_status": "pending",
+        "order_date": now
+    } for _ in range(count)]
+
+
+def run(scheme, path, orders, batch_size, segment):
+    engine = create_engine(f"sqlite:///{path}")
+    use_sqlite_wal(engine)
+    Order.__table__.create(engine)
+    generator = SCHEMES[scheme]()
+    statement = insert(Order.__table__)
+
+    segments = []
+    inserted = 0
+    segment_inserted = 0
+    segment_start = time.perf_counter()
+    total_start = segment_start
+    with engine.connect() as connection:
+        while inserted < orders:
+            count = min(batch_size, orders - inserted)
+            rows = order_rows(generator, count)
+            connection.execute(statement, rows)
+            connection.commit()
+            inserted += count
+            segment_inserted += count
+            if segment_inserted >= segment or inserted == orders:
+                now = time.perf_counter()
+                segments.append((inserted, segment_inserted / (now - segment_start)))
+                segment_inserted = 0
+                segment_start = now
+    elapsed = time.perf_counter() - total_start
+    engine.dispose()
+    return elapsed, segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000000, help="orders inserted per scheme")
+    parser.add_argument("--batch-size", type=int, default=1000, help="orders per transaction")
+    parser.add_argument("--segment", type=int, default=100000, help="report throughput every N orders")
+    args = parser.parse_args()
+
+    print(f"Inserting {args.orders:,} orders per scheme, {args.batch_size} per transaction")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for scheme in SCHEMES:
+            path = os.path.join(directory, f"{scheme}.db")
+            elapsed, segments = run(scheme, path, args.orders, args.batch_size, args.segment)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            results[scheme] = (elapsed, segments, size_mb)
+
+    print(f"{'orders':>10} " + " ".join(f"{scheme + ' /s':>12}" for scheme in SCHEMES))
+    for index, (inserted, _) in enumerate(results["random"][1]):
+        rates = " ".join(f"{results[scheme][1][index][1]:>12,.0f}" for scheme in SCHEMES)
+        print(f"{inserted:>10,} {rates}")
+    for scheme, (elapsed, _, size_mb) in results.items():
+        print(f"{scheme:>6}: {args.orders / elapsed:,.0f} orders/s overall, {elapsed:.1f}s, {size_mb:.0f} MB database")
+
+
+if __name__ == "__main__":
+    main()